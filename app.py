@@ -2,10 +2,11 @@ import argparse
 import sys
 from datetime import datetime
 
-from config.config import FETCH_INTERVAL
+from config.config import FETCH_INTERVAL, METRICS_HOST, METRICS_PORT
 from controllers.etl_controllers import ETLControllers
 from database.database import init_db
 from utils.logger import get_logger
+from utils.metrics import start_metrics_server
 
 logger = get_logger(__name__)
 
@@ -15,12 +16,29 @@ def main():
     parser.add_argument('--run-once', action='store_true', help='Run the ETL process once')
     parser.add_argument('--interval', type=int, default=FETCH_INTERVAL,
                         help=f'Interval between ETL runs in seconds (default is {FETCH_INTERVAL})')
-    parser.add_argument('--export', type=str, help='Export data for the specified city to a CSV file')
+    parser.add_argument('--pipelined', action='store_true',
+                        help='Run extract, transform and load as overlapping stages')
+    parser.add_argument('--export', type=str, nargs='+', metavar='CITY',
+                        help='Export data for the specified cities to a CSV or Parquet file')
     parser.add_argument('--export-path', type=str, default='./exported_data.csv',
                         help='Path to the export file (default is ./exported_data.csv)')
-    parser.add_argument('--historical', type=str, help='Fetch historical data for the specified city')
-    parser.add_argument('--from-date', type=str, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--export-format', type=str, choices=['csv', 'parquet'],
+                        help='Export file format (default is inferred from --export-path)')
+    parser.add_argument('--historical', type=str, nargs='+', metavar='CITY',
+                        help='Backfill historical data for the specified cities (resumes interrupted runs)')
+    parser.add_argument('--stream', action='store_true',
+                        help='With --historical, fetch each city in one request and save it while it downloads')
+    parser.add_argument('--from-date', type=str,
+                        help='Start date in YYYY-MM-DD format (for --export the default is 30 days ago)')
     parser.add_argument('--to-date', type=str, help='End date in YYYY-MM-DD format (default is today)')
+    parser.add_argument('--rebuild-rollups', action='store_true',
+                        help='Recompute the hourly and daily rollup tables from raw weather data')
+    parser.add_argument('--retention', action='store_true',
+                        help='Fold aged raw rows and hourly rollups into coarser rollups and delete them')
+    parser.add_argument('--archive', type=str, nargs='*', metavar='CITY',
+                        help='Write every complete month to the Parquet archive (all cities when none are given)')
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT,
+                        help='Serve Prometheus metrics on this port at /metrics (default from .env, 0 disables)')
     
     args = parser.parse_args()
     
@@ -32,8 +50,41 @@ def main():
         logger.error(f"Error while initializing the database: {str(e)}")
         sys.exit(1)
     
+    if args.rebuild_rollups:
+        logger.info("Rebuilding rollup tables...")
+        success = ETLControllers.rebuild_rollups()
+
+        if success:
+            logger.info("Rollup tables rebuilt successfully.")
+            sys.exit(0)
+        else:
+            logger.error("Failed to rebuild rollup tables.")
+            sys.exit(1)
+
+    if args.retention:
+        logger.info("Applying retention...")
+        success = ETLControllers.apply_retention()
+
+        if success:
+            logger.info("Retention applied successfully.")
+            sys.exit(0)
+        else:
+            logger.error("Failed to apply retention.")
+            sys.exit(1)
+
+    if args.archive is not None:
+        logger.info("Archiving complete months to Parquet...")
+        success = ETLControllers.archive_data(args.archive or None)
+
+        if success:
+            logger.info("Archive written successfully.")
+            sys.exit(0)
+        else:
+            logger.error("Failed to write the archive.")
+            sys.exit(1)
+
     if args.historical:
-        city_name = args.historical
+        city_names = args.historical
         from_date = args.from_date
         to_date = args.to_date or datetime.now().strftime('%Y-%m-%d')
         
@@ -41,22 +92,24 @@ def main():
             logger.error("You must provide a start date (--from-date) in YYYY-MM-DD format")
             sys.exit(1)
             
-        logger.info(f"Fetching historical data for {city_name} from {from_date} to {to_date}...")
-        success = ETLControllers.fetch_historical_data(city_name, from_date, to_date)
+        logger.info(f"Fetching historical data for {', '.join(city_names)} from {from_date} to {to_date}...")
+        success = ETLControllers.fetch_historical_data(city_names, from_date, to_date, stream=args.stream)
         
         if success:
-            logger.info(f"Historical data for {city_name} fetched successfully.")
+            logger.info(f"Historical data for {', '.join(city_names)} fetched successfully.")
             sys.exit(0)
         else:
-            logger.error(f"Failed to fetch historical data for {city_name}.")
+            logger.error(f"Failed to fetch historical data for {', '.join(city_names)}.")
             sys.exit(1)
     
     if args.export:
-        city_name = args.export
+        city_names = args.export
         export_path = args.export_path
         
-        logger.info(f"Exporting data for {city_name} to {export_path}...")
-        success = ETLControllers.export_city_data(city_name, export_path)
+        logger.info(f"Exporting data for {', '.join(city_names)} to {export_path}...")
+        success = ETLControllers.export_city_data(
+            city_names, export_path, args.from_date, args.to_date, args.export_format
+        )
         
         if success:
             logger.info(f"Data exported successfully to {export_path}")
@@ -67,7 +120,7 @@ def main():
     
     if args.run_once:
         logger.info("Running a single ETL process...")
-        success = ETLControllers.run_etl_pipeline()
+        success = ETLControllers.run_etl_pipeline(pipelined=args.pipelined)
         
         if success:
             logger.info("ETL process completed successfully.")
@@ -76,11 +129,14 @@ def main():
             logger.error("ETL process finished with errors.")
             sys.exit(1)
     
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port, METRICS_HOST)
+
     interval = args.interval
     logger.info(f"Running scheduled ETL process every {interval} seconds...")
     
     try:
-        ETLControllers.schedule_etl_job(interval)
+        ETLControllers.schedule_etl_job(interval, pipelined=args.pipelined)
     except KeyboardInterrupt:
         logger.info("Application stopped by user.")
         sys.exit(0)
@@ -0,0 +1,65 @@
+"""Rows per second of LoadService.batch_save_weather_data, per-row versus bulk.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bulk_insert --rows 8760
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_workdir = tempfile.mkdtemp(prefix="weather-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+
+from database.database import Base, engine, init_db
+from models.weather_data import WeatherData
+from services.load_services import LoadService
+
+def make_records(rows: int, city_name: str = "Warsaw"):
+    start = datetime(2024, 1, 1)
+
+    return [
+        WeatherData(
+            city_name=city_name,
+            country="PL",
+            temperature=10.0 + (i % 24) * 0.5,
+            feels_like=9.0,
+            humidity=70,
+            pressure=1013,
+            wind_speed=3.5,
+            wind_direction=180,
+            weather_condition="Overcast",
+            weather_description="Overcast",
+            clouds=80,
+            rain_1h=None,
+            snow_1h=None,
+            timestamp=start + timedelta(hours=i)
+        )
+        for i in range(rows)
+    ]
+
+def measure(rows: int, bulk: bool) -> float:
+    Base.metadata.drop_all(engine)
+    init_db()
+
+    records = make_records(rows)
+    started = time.perf_counter()
+    saved = LoadService.batch_save_weather_data(records, bulk=bulk)
+    elapsed = time.perf_counter() - started
+
+    assert len(saved) == rows, f"expected {rows} saved rows, got {len(saved)}"
+
+    return rows / elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-row versus bulk inserts")
+    parser.add_argument("--rows", type=int, default=8760, help="Rows to insert (default is one year of hourly data)")
+    args = parser.parse_args()
+
+    per_row = measure(args.rows, bulk=False)
+    bulk = measure(args.rows, bulk=True)
+
+    print(f"per-row: {per_row:,.0f} rows/s")
+    print(f"bulk:    {bulk:,.0f} rows/s ({bulk / per_row:.1f}x)")
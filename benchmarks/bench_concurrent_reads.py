@@ -0,0 +1,170 @@
+"""Dashboard read latency while a backfill is writing.
+
+A writer process saves a multi-month backfill through LoadService, as app.py would, while
+reader threads issue the dashboard's queries, as Streamlit sessions would. Each configuration
+runs on a fresh database:
+
+- rollback-journal: journal_mode=DELETE, readers share the writer engine (the old setup)
+- wal-shared:       WAL, readers share the writer engine and its pool
+- wal-read-only:    WAL, readers use the read-only engine (the default)
+
+Run from the repository root:
+
+    python -m benchmarks.bench_concurrent_reads --readers 32
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+MODES = {
+    "rollback-journal": {"SQLITE_JOURNAL_MODE": "DELETE", "shared": True},
+    "wal-shared": {"SQLITE_JOURNAL_MODE": "WAL", "shared": True},
+    "wal-read-only": {"SQLITE_JOURNAL_MODE": "WAL", "shared": False}
+}
+
+def percentile(ordered, fraction: float) -> float:
+
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else float("nan")
+
+SEED_END = date(2024, 12, 31)
+
+def configure(mode: str, database_path: str) -> None:
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    os.environ["SQLITE_JOURNAL_MODE"] = MODES[mode]["SQLITE_JOURNAL_MODE"]
+
+def build_batch(city_name: str, start_date: date, end_date: date):
+    from benchmarks.stub_api import build_timeline_payload
+    from services.parse_services import ParseService
+
+    raw_data = build_timeline_payload(city_name, start_date, end_date)
+
+    return ParseService.to_weather_batch(ParseService.hourly_frame(raw_data), {"name": city_name, "country": "XX"})
+
+def run_writer(mode: str, database_path: str, backfill_days: int) -> None:
+    configure(mode, database_path)
+
+    from services.load_services import LoadService
+
+    # Build the backfill up front so the timed part only spends time in the database.
+    backfill = [
+        build_batch("Berlin", SEED_END - timedelta(days=offset + 29), SEED_END - timedelta(days=offset))
+        for offset in range(0, backfill_days, 30)
+    ]
+
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    started = time.perf_counter()
+
+    for weather_batch in backfill:
+        LoadService.batch_save_weather_data(weather_batch)
+
+    print(time.perf_counter() - started, flush=True)
+
+def run_mode(mode: str, readers: int, backfill_days: int, think_time: float) -> None:
+    database_path = os.path.join(tempfile.mkdtemp(prefix="weather-bench-"), "bench.db")
+    configure(mode, database_path)
+
+    import database.database as database
+    from repositories.weather_repositories import WeatherRepository
+    from services.load_services import LoadService
+    from services.transform_services import TransformService
+
+    if MODES[mode]["shared"]:
+        database.ReadSessionFactory = database.SessionFactory
+
+    database.init_db()
+    LoadService.batch_save_weather_data(build_batch("Warsaw", SEED_END - timedelta(days=89), SEED_END))
+
+    writer = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_concurrent_reads", "--writer", database_path,
+         "--mode", mode, "--backfill-days", str(backfill_days)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    writer.stdout.readline()
+
+    latencies = []
+    errors = []
+
+    def reader(seed: int):
+        rng = random.Random(seed)
+
+        while writer.poll() is None:
+            end = datetime(2024, 12, 31) - timedelta(days=rng.randint(0, 80))
+            started = time.perf_counter()
+
+            try:
+                if rng.random() < 0.5:
+                    WeatherRepository.get_weather_dataframe("Warsaw", end - timedelta(days=7), end)
+                else:
+                    TransformService.calculate_weather_statistics("Warsaw")
+
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(str(e).splitlines()[0])
+
+            time.sleep(rng.uniform(0, 2 * think_time))
+
+    threads = [threading.Thread(target=reader, args=(index,)) for index in range(readers)]
+
+    for thread in threads:
+        thread.start()
+
+    writer.stdin.write("go\n")
+    writer.stdin.flush()
+    write_seconds = float(writer.stdout.readline())
+
+    for thread in threads:
+        thread.join()
+
+    ordered = sorted(latencies)
+
+    print(json.dumps({
+        "mode": mode,
+        "reads": len(ordered),
+        "errors": len(errors),
+        "write_seconds": write_seconds,
+        "p50_ms": percentile(ordered, 0.5) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "max_ms": (ordered[-1] if ordered else float("nan")) * 1000
+    }))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dashboard reads during a backfill")
+    parser.add_argument("--readers", type=int, default=32, help="Concurrent simulated dashboard readers")
+    parser.add_argument("--backfill-days", type=int, default=1095, help="Days of hourly data the writer saves")
+    parser.add_argument("--think-time", type=float, default=0.5,
+                        help="Mean pause between one reader's queries in seconds, like a user clicking around")
+    parser.add_argument("--mode", choices=list(MODES), help=argparse.SUPPRESS)
+    parser.add_argument("--writer", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.writer:
+        run_writer(args.mode, args.writer, args.backfill_days)
+        sys.exit(0)
+
+    if args.mode:
+        run_mode(args.mode, args.readers, args.backfill_days, args.think_time)
+        sys.exit(0)
+
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_concurrent_reads", "--mode", mode,
+             "--readers", str(args.readers), "--backfill-days", str(args.backfill_days),
+             "--think-time", str(args.think_time)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        print(
+            f"{mode:<17} {result['reads']:>6,} reads, {result['errors']} errors, "
+            f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, max {result['max_ms']:.0f} ms, "
+            f"backfill {result['write_seconds']:.1f}s"
+        )
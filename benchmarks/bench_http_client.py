@@ -0,0 +1,70 @@
+"""Compare per-request latency of bare requests.get against the pooled http_client.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_http_client --requests 50 --handshake-latency 0.05
+"""
+import argparse
+import statistics
+import time
+from typing import List, Dict
+
+import requests
+
+from benchmarks.stub_api import start_stub_server
+from utils import http_client
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+
+    return {
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+    }
+
+def measure(fetch, url: str, count: int) -> List[float]:
+    latencies = []
+
+    for _ in range(count):
+        started = time.perf_counter()
+        response = fetch(url)
+        response.raise_for_status()
+        response.json()
+        latencies.append(time.perf_counter() - started)
+
+    return latencies
+
+def run(count: int, latency: float, handshake_latency: float) -> Dict[str, Dict[str, float]]:
+    server, state, base_url = start_stub_server(latency=latency, handshake_latency=handshake_latency)
+    url = f"{base_url}Warsaw"
+
+    try:
+        bare = measure(lambda target: requests.get(target, headers={"Connection": "close"}), url, count)
+        bare_connections = state.connections
+
+        http_client.close_session()
+        pooled = measure(lambda target: http_client.get(target), url, count)
+        pooled_connections = state.connections - bare_connections
+    finally:
+        server.shutdown()
+        http_client.close_session()
+
+    return {
+        "bare_requests": dict(summarize(bare), connections=bare_connections),
+        "pooled_client": dict(summarize(pooled), connections=pooled_connections)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pooled HTTP client against bare requests.get")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub server latency per request in seconds")
+    parser.add_argument("--handshake-latency", type=float, default=0.02,
+                        help="Stub server latency per new connection, standing in for TCP/TLS setup")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.latency, args.handshake_latency)
+
+    for name, result in results.items():
+        print(f"{name:15s} mean={result['mean_ms']:.2f}ms p50={result['p50_ms']:.2f}ms "
+              f"p95={result['p95_ms']:.2f}ms connections={result['connections']}")
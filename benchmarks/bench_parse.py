@@ -0,0 +1,82 @@
+"""Hourly rows per second when parsing a timeline response, per-row versus columnar.
+
+The per-row baseline is the loop HistoricalService.process_historical_data used before
+ParseService: one strptime and one conditions split per hour.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parse --years 5
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.stub_api import build_timeline_payload
+from models.weather_data import WeatherData
+from services.parse_services import ParseService
+
+CITY = {"name": "Warsaw", "country": "PL"}
+
+def parse_per_row(raw_data, city):
+    weather_data_list = []
+
+    for day in raw_data.get("days", []):
+        for hour in day.get("hours", []):
+            timestamp = datetime.strptime(f"{day['datetime']} {hour['datetime']}", "%Y-%m-%d %H:%M:%S")
+
+            weather_data_list.append(WeatherData(
+                city_name=city['name'],
+                country=city['country'],
+                temperature=hour.get('temp', 0),
+                feels_like=hour.get('feelslike', 0),
+                humidity=hour.get('humidity', 0),
+                pressure=hour.get('pressure', 0),
+                wind_speed=hour.get('windspeed', 0),
+                wind_direction=hour.get('winddir', 0),
+                weather_condition=hour.get('conditions', '').split(',')[0].strip(),
+                weather_description=hour.get('conditions', ''),
+                clouds=hour.get('cloudcover', 0),
+                rain_1h=hour.get('precip', 0) if hour.get('precip', 0) > 0 else None,
+                snow_1h=None,
+                timestamp=timestamp
+            ))
+
+    return weather_data_list
+
+def parse_columnar(raw_data, city):
+
+    return ParseService.to_weather_batch(ParseService.hourly_frame(raw_data), city)
+
+def parse_frame_only(raw_data, city):
+
+    return ParseService.hourly_frame(raw_data)
+
+def measure(parse, raw_data, rows: int) -> float:
+    started = time.perf_counter()
+    result = parse(raw_data, CITY)
+    elapsed = time.perf_counter() - started
+
+    assert len(result) == rows, f"expected {rows} rows, got {len(result)}"
+
+    return rows / elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-row versus columnar timeline parsing")
+    parser.add_argument("--years", type=int, default=5, help="Years of hourly data in the synthetic payload")
+    args = parser.parse_args()
+
+    end_date = date(2024, 12, 31)
+    start_date = end_date - timedelta(days=365 * args.years - 1)
+    raw_data = build_timeline_payload(CITY["name"], start_date, end_date)
+    rows = sum(len(day["hours"]) for day in raw_data["days"])
+
+    per_row = measure(parse_per_row, raw_data, rows)
+    columnar = measure(parse_columnar, raw_data, rows)
+    frame_only = measure(parse_frame_only, raw_data, rows)
+
+    assert parse_per_row(raw_data, CITY) == list(parse_columnar(raw_data, CITY)), "parsers disagree"
+
+    print(f"{rows:,} hourly rows")
+    print(f"per-row:             {per_row:,.0f} rows/s")
+    print(f"columnar batch:      {columnar:,.0f} rows/s ({columnar / per_row:.1f}x)")
+    print(f"columnar frame only: {frame_only:,.0f} rows/s ({frame_only / per_row:.1f}x)")
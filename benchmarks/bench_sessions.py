@@ -0,0 +1,94 @@
+"""Per-query and per-write overhead of the session layer.
+
+Compares the old pattern (a new sessionmaker per call on a default engine, one transaction
+per write) with the module-level SessionFactory, the tuned SQLite engine and session_scope().
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sessions --queries 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="weather-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_bulk_insert import make_records
+from database.database import Base, SessionFactory, WeatherDataTable, get_session, init_db, session_scope, upsert_rows
+from models.weather_batch import WeatherBatch
+from repositories.weather_repositories import WeatherRepository
+
+def per_call(stage, count: int) -> float:
+    started = time.perf_counter()
+
+    for index in range(count):
+        stage(index)
+
+    return (time.perf_counter() - started) / count * 1e6
+
+def read(open_session):
+    def stage(index):
+        session = open_session()
+
+        try:
+            session.execute(WeatherRepository.latest_query("Warsaw")).first()
+        finally:
+            session.close()
+
+    return stage
+
+def write(open_session, rows):
+    def stage(index):
+        session = open_session()
+
+        try:
+            upsert_rows(
+                session.connection(), WeatherDataTable.__table__, [rows[index]], ['city_name', 'timestamp'],
+                returning=WeatherDataTable.__table__.c.id
+            )
+            session.commit()
+        finally:
+            session.close()
+
+    return stage
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark session and engine overhead")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries and single-row writes per variant")
+    args = parser.parse_args()
+
+    init_db()
+    WeatherRepository.upsert_weather_data(make_records(1000))
+
+    # The engine as it was created before: default pool, no pragmas (rollback journal, synchronous=FULL).
+    default_engine = create_engine(f"sqlite:///{os.path.join(_workdir, 'bench_default.db')}")
+    Base.metadata.create_all(default_engine)
+
+    def legacy_session():
+
+        return sessionmaker(bind=default_engine)()
+
+    rows = {
+        variant: WeatherBatch.from_records(make_records(args.queries, city_name=variant)).to_params()
+        for variant in ("legacy", "tuned", "scoped")
+    }
+
+    results = [
+        ("read, sessionmaker per call", read(legacy_session), "query"),
+        ("read, module SessionFactory", read(SessionFactory), "query"),
+        ("write, default engine", write(legacy_session, rows["legacy"]), "row"),
+        ("write, tuned SQLite engine", write(SessionFactory, rows["tuned"]), "row")
+    ]
+
+    for label, stage, unit in results:
+        print(f"{label + ':':<32} {per_call(stage, args.queries):>8,.0f} us/{unit}")
+
+    with session_scope():
+        scoped = per_call(write(get_session, rows["scoped"]), args.queries)
+
+    print(f"{'write, inside session_scope:':<32} {scoped:>8,.0f} us/row")
@@ -0,0 +1,83 @@
+"""Throughput and peak RSS of historical ingestion, materialized response versus streamed.
+
+Each mode runs in its own process so peak RSS is measured independently; the stub API
+runs in the parent process and serves a synthetic multi-year days+hours payload.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_stream_ingest --years 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+END_DATE = date(2024, 12, 31)
+
+def run_mode(mode: str, base_url: str, years: int) -> None:
+    workdir = tempfile.mkdtemp(prefix="weather-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+    import services.timeline_services as timeline_services
+    from database.database import init_db
+    from services.historical_services import HistoricalService, peak_rss_mb
+
+    timeline_services.WEATHER_API_BASE_URL = base_url
+    init_db()
+
+    start_date = END_DATE - timedelta(days=365 * years - 1)
+    started = time.perf_counter()
+
+    if mode == "stream":
+        saved = HistoricalService.stream_and_save_historical_data("Warsaw", start_date, END_DATE)
+    else:
+        saved = HistoricalService.fetch_and_save_historical_data("Warsaw", start_date, END_DATE)
+
+    print(json.dumps({
+        "mode": mode,
+        "saved": saved,
+        "seconds": time.perf_counter() - started,
+        "peak_rss_mb": peak_rss_mb()
+    }))
+
+def measure(mode: str, base_url: str, years: int, state) -> dict:
+    bytes_before = state.payload_bytes
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_stream_ingest", "--mode", mode, "--base-url", base_url, "--years", str(years)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["megabytes"] = (state.payload_bytes - bytes_before) / (1024 * 1024)
+
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark materialized versus streamed historical ingestion")
+    parser.add_argument("--years", type=int, default=5, help="Years of hourly data in the synthetic payload")
+    parser.add_argument("--mode", choices=["materialize", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.base_url, args.years)
+        sys.exit(0)
+
+    from benchmarks.stub_api import start_stub_server
+
+    server, state, base_url = start_stub_server()
+
+    try:
+        for mode in ("materialize", "stream"):
+            result = measure(mode, base_url, args.years, state)
+            print(
+                f"{mode:<12} {result['saved']:,} rows in {result['seconds']:.1f}s, "
+                f"{result['megabytes'] / result['seconds']:.1f} MB/s of JSON, "
+                f"peak RSS {result['peak_rss_mb']:.0f} MB"
+            )
+    finally:
+        server.shutdown()
@@ -0,0 +1,69 @@
+"""Memory per record and per-stage overhead of WeatherBatch versus lists of WeatherData.
+
+The baseline is WeatherData as it was before WeatherBatch: a regular @dataclass with a
+per-instance __dict__, serialized with asdict.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_weather_batch --rows 100000
+"""
+import argparse
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, fields
+from datetime import date, timedelta
+
+from benchmarks.stub_api import build_timeline_payload
+from models.weather_batch import WeatherBatch
+from models.weather_data import WeatherData
+from services.parse_services import ParseService
+from services.transform_services import TransformService
+
+CITY = {"name": "Warsaw", "country": "PL"}
+
+LegacyWeatherData = dataclass(type("LegacyWeatherData", (), {
+    "__annotations__": {field.name: field.type for field in fields(WeatherData)},
+    **{field.name: field.default for field in fields(WeatherData) if field.default is not field.default_factory}
+}))
+
+def allocated(build):
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    result = build()
+    size = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, "filename"))
+    tracemalloc.stop()
+
+    return result, size
+
+def timed(stage):
+    started = time.perf_counter()
+    stage()
+
+    return time.perf_counter() - started
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark WeatherBatch against lists of WeatherData")
+    parser.add_argument("--rows", type=int, default=100000, help="Approximate number of hourly records")
+    args = parser.parse_args()
+
+    end_date = date(2024, 12, 31)
+    raw_data = build_timeline_payload(CITY["name"], end_date - timedelta(days=args.rows // 24 - 1), end_date)
+    batch = ParseService.to_weather_batch(ParseService.hourly_frame(raw_data), CITY)
+    rows = len(batch)
+
+    # Each container is built from freshly materialized rows, so the Python objects it keeps
+    # alive (boxed floats, datetimes) are counted against it.
+    legacy, legacy_bytes = allocated(lambda: [LegacyWeatherData(*row) for row in batch.to_tuples()])
+    slotted, slotted_bytes = allocated(lambda: list(batch))
+    columnar, batch_bytes = allocated(lambda: WeatherBatch.from_records(batch))
+
+    print(f"{rows:,} hourly records, memory per record:")
+    print(f"  dataclass list:         {legacy_bytes / rows:,.0f} B")
+    print(f"  slotted dataclass list: {slotted_bytes / rows:,.0f} B")
+    print(f"  WeatherBatch:           {batch_bytes / rows:,.0f} B")
+
+    print("per-stage time:")
+    print(f"  transform, from list: {timed(lambda: TransformService.batch_process_cities(slotted)) * 1000:,.0f} ms")
+    print(f"  transform, batch:     {timed(lambda: TransformService.batch_process_cities(columnar)) * 1000:,.0f} ms")
+    print(f"  SQL params, asdict:       {timed(lambda: [asdict(record) for record in legacy]) * 1000:,.0f} ms")
+    print(f"  SQL params, WeatherBatch: {timed(lambda: columnar.to_params()) * 1000:,.0f} ms")
@@ -0,0 +1,106 @@
+"""Query-plan regression check for the repository reads.
+
+Builds a scratch SQLite database, optionally seeds it, and asserts through EXPLAIN QUERY PLAN
+that every repository read is served by the (city_name, timestamp) index or, for rollup reads,
+the rollup primary key. Exits non-zero on a
+regression. Run from the repository root:
+
+    python -m benchmarks.check_query_plans --rows 2000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_workdir = tempfile.mkdtemp(prefix="weather-plans-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'plans.db')}"
+
+from sqlalchemy import text
+
+from benchmarks.bench_bulk_insert import make_records
+from database.database import engine, init_db
+from repositories.rollup_repositories import RollupRepository
+from repositories.weather_repositories import WeatherRepository
+
+RAW_INDEX = "uq_weather_data_city_timestamp"
+HOURLY_ROLLUP_INDEX = "sqlite_autoindex_weather_rollup_hourly_1"
+DAILY_ROLLUP_INDEX = "sqlite_autoindex_weather_rollup_daily_1"
+CONDITION_ROLLUP_INDEX = "sqlite_autoindex_weather_rollup_hourly_conditions_1"
+
+def seed(rows: int, cities: int) -> None:
+    per_city = rows // cities
+
+    for city_index in range(cities):
+        records = make_records(per_city, city_name=f"City{city_index:03d}")
+
+        for start in range(0, len(records), 10000):
+            WeatherRepository.upsert_weather_data(records[start:start + 10000])
+
+def explain(connection, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    plan = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+
+    return " | ".join(row[-1] for row in plan)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Assert repository reads are served by an index")
+    parser.add_argument("--rows", type=int, default=0, help="Synthetic rows to seed before timing the queries")
+    parser.add_argument("--cities", type=int, default=10)
+    args = parser.parse_args()
+
+    init_db()
+
+    if args.rows:
+        seed(args.rows, args.cities)
+        RollupRepository.rebuild_rollups()
+
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+
+    start_date = datetime(2024, 1, 1)
+    end_date = start_date + timedelta(days=30)
+
+    statements = {
+        "get_weather_data_by_data_range": (
+            WeatherRepository.range_query("City000", start_date, end_date), RAW_INDEX),
+        "get_latest_weather_data_by_city": (
+            WeatherRepository.latest_query("City000"), RAW_INDEX),
+        "get_cities_with_data": (
+            WeatherRepository.cities_query(), RAW_INDEX),
+        "get_bucketed_dataframe": (
+            WeatherRepository.bucketed_query(["City000"], start_date, end_date, 3600, "sqlite"), RAW_INDEX),
+        "get_weather_statistics": (
+            WeatherRepository.statistics_query("City000", start_date, end_date), RAW_INDEX),
+        "get_weather_statistics (conditions)": (
+            WeatherRepository.condition_counts_query("City000", start_date, end_date), RAW_INDEX),
+        "get_daily_avg_temperature": (
+            WeatherRepository.daily_avg_query("City000", start_date, end_date), DAILY_ROLLUP_INDEX),
+        "rollup get_weather_statistics": (
+            RollupRepository.statistics_query("City000", start_date, end_date), HOURLY_ROLLUP_INDEX),
+        "rollup get_weather_statistics (conditions)": (
+            RollupRepository.condition_counts_query("City000", start_date, end_date), CONDITION_ROLLUP_INDEX),
+        "rollup get_weather_statistics (edge hours)": (
+            RollupRepository.raw_statistics_query("City000", start_date, end_date), RAW_INDEX)
+    }
+
+    failures = 0
+
+    with engine.connect() as connection:
+        for name, (statement, index_name) in statements.items():
+            plan = explain(connection, statement)
+            uses_index = index_name in plan
+
+            started = time.perf_counter()
+            connection.execute(statement).all()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            status = "ok" if uses_index else "FAIL"
+            failures += 0 if uses_index else 1
+            print(f"[{status}] {name}: {elapsed_ms:.2f}ms\n       {plan}")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
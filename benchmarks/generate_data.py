@@ -0,0 +1,126 @@
+"""Fill weather_data with synthetic history for benchmarking.
+
+Run from the repository root (the target defaults to a throwaway file, never your DATABASE_URL):
+
+    python -m benchmarks.generate_data --cities 20 --years 3 --per-hour 4 --database-url sqlite:///./bench_data.db
+"""
+import argparse
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models.weather_batch import WeatherBatch
+
+CONDITIONS = np.array(["Clear", "Partially cloudy", "Overcast", "Rain", "Snow"], dtype=object)
+DESCRIPTIONS = np.array([
+    "Clear conditions throughout the day.",
+    "Partly cloudy throughout the day.",
+    "Cloudy skies throughout the day.",
+    "Rain in the afternoon.",
+    "Snow showers in the morning."
+], dtype=object)
+
+def synthetic_cities(count: int) -> List[Dict[str, str]]:
+
+    return [{"name": f"City{index:04d}", "country": "XX"} for index in range(count)]
+
+def generate_batch(
+    city_name: str,
+    start: datetime,
+    end: datetime,
+    per_hour: int = 1,
+    country: str = "XX",
+    seed: int = 0
+) -> WeatherBatch:
+    """Rows every 60/per_hour minutes in [start, end), with daily and yearly temperature cycles."""
+
+    rng = np.random.default_rng([zlib.crc32(city_name.encode()), seed])
+    step = np.timedelta64(3600 // per_hour, "s")
+    timestamps = np.arange(np.datetime64(start, "s"), np.datetime64(end, "s"), step).astype("datetime64[us]")
+    length = len(timestamps)
+
+    hours = (timestamps - timestamps.astype("datetime64[D]")) / np.timedelta64(1, "h")
+    day_of_year = (timestamps.astype("datetime64[D]") - timestamps.astype("datetime64[Y]")).astype(np.int64)
+
+    temperature = (
+        10
+        - 12 * np.cos(2 * np.pi * day_of_year / 365.25)
+        - 4 * np.cos(2 * np.pi * hours / 24)
+        + rng.normal(0, 2, length)
+    ).round(1)
+    condition_index = rng.choice(len(CONDITIONS), length, p=[0.3, 0.3, 0.2, 0.15, 0.05])
+    rain = np.where(condition_index == 3, rng.uniform(0.1, 4, length).round(1), np.nan)
+    snow = np.where(condition_index == 4, rng.uniform(0.1, 2, length).round(1), np.nan)
+
+    return WeatherBatch.from_columns(
+        length,
+        city_name=city_name,
+        country=country,
+        temperature=temperature,
+        feels_like=(temperature - rng.uniform(0, 3, length)).round(1),
+        humidity=rng.uniform(30, 100, length).round(),
+        pressure=rng.normal(1013, 8, length).round(),
+        wind_speed=rng.gamma(2, 2, length).round(1),
+        wind_direction=rng.uniform(0, 360, length).round(),
+        weather_condition=CONDITIONS[condition_index],
+        weather_description=DESCRIPTIONS[condition_index],
+        clouds=rng.uniform(0, 100, length).round(),
+        rain_1h=rain,
+        snow_1h=snow,
+        timestamp=timestamps
+    )
+
+def fill_database(
+    cities: List[Dict[str, str]],
+    years: float,
+    per_hour: int = 1,
+    end: Optional[datetime] = None,
+    chunk_days: int = 31,
+    seed: int = 0
+) -> int:
+    """Upsert `years` of history ending at `end` (default: the current hour) for every city, then rebuild rollups."""
+
+    from repositories.rollup_repositories import RollupRepository
+    from repositories.weather_repositories import WeatherRepository
+
+    end = end or datetime.now().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=round(365 * years))
+    rows = 0
+
+    for city in cities:
+        chunk_start = start
+
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+            batch = generate_batch(city["name"], chunk_start, chunk_end, per_hour, city["country"], seed)
+            rows += len(WeatherRepository.upsert_weather_data(batch))
+            chunk_start = chunk_end
+
+    RollupRepository.rebuild_rollups([city["name"] for city in cities])
+
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill weather_data with synthetic history")
+    parser.add_argument("--cities", type=int, default=5, help="Number of synthetic cities")
+    parser.add_argument("--years", type=float, default=1, help="Years of history per city, ending now")
+    parser.add_argument("--per-hour", type=int, default=1, choices=[1, 2, 4, 6, 12, 60], help="Rows per city per hour")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default="sqlite:///./bench_data.db", help="Target database (default ./bench_data.db)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from database.database import init_db
+
+    init_db()
+
+    started = time.perf_counter()
+    rows = fill_database(synthetic_cities(args.cities), args.years, args.per_hour, seed=args.seed)
+    elapsed = time.perf_counter() - started
+
+    print(f"Generated {rows} rows for {args.cities} cities in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s) into {args.database_url}")
@@ -0,0 +1,203 @@
+"""Repeatable benchmark suite for the ETL, repository queries, statistics and export.
+
+Seeds a throwaway database with synthetic history, points the extract services at the stub
+API and times each case. Results are saved as JSON under benchmarks/results/ (tagged with the
+git commit) and can be compared against an earlier run to spot regressions:
+
+    python -m benchmarks.run_suite --cities 5 --years 2 --per-hour 4
+    python -m benchmarks.run_suite --compare benchmarks/results/<earlier>.json
+    python -m benchmarks.run_suite --only repository --repeat 20
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+_workdir = tempfile.mkdtemp(prefix="weather-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+import services.extract_services as extract_services
+from benchmarks.generate_data import fill_database, generate_batch, synthetic_cities
+from benchmarks.stub_api import build_timeline_payload, start_stub_server
+from database.database import init_db
+from repositories.weather_repositories import WeatherRepository
+from services.extract_services import ExtractService
+from services.historical_services import HistoricalService
+from services.load_services import LoadService
+from services.transform_services import TransformService
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def git_commit() -> Optional[str]:
+    try:
+
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+
+        return None
+
+def measure(run: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    for _ in range(warmup):
+        run()
+
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "repeat": repeat,
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0
+    }
+
+def build_cases(args, base_url: str) -> Dict[str, Callable[[], Any]]:
+    """Name -> zero-argument callable. Names are grouped by prefix so --only can select a family."""
+
+    city = synthetic_cities(1)[0]["name"]
+    now = datetime.now()
+    month_ago = now - timedelta(days=30)
+    year_ago = now - timedelta(days=365)
+
+    extract_cities = [{"name": f"Remote{index:03d}", "country": "XX"} for index in range(args.extract_cities)]
+    historical_city = {"name": "Historical", "country": "XX"}
+    historical_payload = build_timeline_payload(historical_city["name"], date.today() - timedelta(days=365), date.today())
+    save_rows = args.save_rows
+    save_runs = iter(range(10 ** 6))
+    export_path = os.path.join(_workdir, "export.csv")
+
+    def extract_all_cities():
+        extract_services.WEATHER_API_BASE_URL = base_url
+        ExtractService.extract_all_cities(extract_cities)
+
+    def batch_save_weather_data():
+        # A new city each run, so every run inserts (and refreshes rollups for) fresh rows.
+        batch = generate_batch(f"Save{next(save_runs):06d}", now - timedelta(hours=save_rows), now)
+        LoadService.batch_save_weather_data(batch)
+
+    def iter_weather_dataframes():
+        for _ in WeatherRepository.iter_weather_dataframes(city, year_ago, now):
+            pass
+
+    return {
+        "etl.extract_all_cities": extract_all_cities,
+        "etl.process_historical_data": lambda: HistoricalService.process_historical_data(historical_payload, historical_city),
+        "etl.batch_save_weather_data": batch_save_weather_data,
+        "repository.get_latest_weather_data_by_city": lambda: WeatherRepository.get_latest_weather_data_by_city(city),
+        "repository.get_weather_data_by_data_range": lambda: WeatherRepository.get_weather_data_by_data_range(city, month_ago, now),
+        "repository.get_weather_dataframe": lambda: WeatherRepository.get_weather_dataframe(city, year_ago, now),
+        "repository.iter_weather_dataframes": iter_weather_dataframes,
+        "repository.get_weather_arrays": lambda: WeatherRepository.get_weather_arrays(city, year_ago, now),
+        "repository.get_weather_statistics": lambda: WeatherRepository.get_weather_statistics(city, month_ago, now),
+        "repository.get_daily_avg_temperature": lambda: WeatherRepository.get_daily_avg_temperature(city, 30),
+        "repository.get_cities_with_data": WeatherRepository.get_cities_with_data,
+        "transform.calculate_weather_statistics": lambda: TransformService.calculate_weather_statistics(city),
+        "load.export_to_csv": lambda: LoadService.export_to_csv(city, export_path)
+    }
+
+def compare(results: Dict[str, Any], baseline_path: str, threshold: float) -> List[str]:
+    """Print median ratios against a saved run; returns the names slower by more than `threshold`."""
+
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+
+    for name, result in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+
+        if previous is None:
+            print(f"  {name:<48} new")
+            continue
+
+        ratio = result["median"] / previous["median"] if previous["median"] else float("inf")
+        flag = ""
+
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+
+        print(f"  {name:<48} {previous['median'] * 1000:10.2f}ms -> {result['median'] * 1000:10.2f}ms  x{ratio:.2f}{flag}")
+
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and save the results as JSON")
+    parser.add_argument("--cities", type=int, default=5, help="Cities of synthetic history to seed")
+    parser.add_argument("--years", type=float, default=1, help="Years of history per city")
+    parser.add_argument("--per-hour", type=int, default=1, help="Rows per city per hour")
+    parser.add_argument("--extract-cities", type=int, default=50, help="Cities fetched per extract_all_cities run")
+    parser.add_argument("--save-rows", type=int, default=8760, help="Rows per batch_save_weather_data run")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub API latency per request in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.2, help="Stub latency spread as a fraction")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--only", nargs="+", metavar="PREFIX", help="Only run cases whose name starts with a prefix")
+    parser.add_argument("--output", help="Result file (default benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier result file to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    init_db()
+
+    seeded_at = time.perf_counter()
+    rows = fill_database(synthetic_cities(args.cities), args.years, args.per_hour)
+    print(f"Seeded {rows} rows ({args.cities} cities x {args.years:g} years x {args.per_hour}/hour) "
+          f"in {time.perf_counter() - seeded_at:.1f}s")
+
+    server, state, base_url = start_stub_server(
+        latency=args.latency, latency_jitter=args.latency_jitter, body_cache_size=args.extract_cities
+    )
+
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": {name: value for name, value in vars(args).items() if name not in ("output", "compare")},
+        "cases": {}
+    }
+
+    try:
+        for name, run in build_cases(args, base_url).items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+
+            result = measure(run, args.repeat)
+            results["cases"][name] = result
+            print(f"{name:<48} median {result['median'] * 1000:10.2f}ms  min {result['min'] * 1000:10.2f}ms")
+    finally:
+        server.shutdown()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{results['commit'] or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
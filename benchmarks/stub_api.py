@@ -0,0 +1,265 @@
+"""Local stand-in for the Visual Crossing timeline endpoint, used by the benchmarks."""
+import argparse
+import gzip
+import json
+import random
+import socket
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, unquote
+
+CONDITIONS = ["Clear", "Partially cloudy", "Overcast", "Rain, Overcast", "Rain, Partially cloudy", "Snow, Overcast"]
+
+def build_hour(day: date, hour: int, rng: random.Random) -> Dict[str, Any]:
+    temp = round(10 + 8 * rng.uniform(-1, 1) + 4 * ((hour - 12) / 12), 1)
+    precip = round(rng.uniform(0, 2), 1) if rng.random() < 0.2 else 0.0
+
+    return {
+        "datetime": f"{hour:02d}:00:00",
+        "datetimeEpoch": int(datetime(day.year, day.month, day.day, hour).timestamp()),
+        "temp": temp,
+        "feelslike": round(temp - rng.uniform(0, 3), 1),
+        "humidity": round(rng.uniform(30, 100), 1),
+        "dew": round(temp - rng.uniform(1, 8), 1),
+        "precip": precip,
+        "precipprob": 100.0 if precip else 0.0,
+        "snow": 0.0,
+        "windgust": round(rng.uniform(5, 40), 1),
+        "windspeed": round(rng.uniform(0, 30), 1),
+        "winddir": round(rng.uniform(0, 360), 1),
+        "pressure": round(rng.uniform(990, 1030), 1),
+        "visibility": round(rng.uniform(5, 25), 1),
+        "cloudcover": round(rng.uniform(0, 100), 1),
+        "solarradiation": round(rng.uniform(0, 600), 1),
+        "uvindex": rng.randint(0, 8),
+        "conditions": rng.choice(CONDITIONS),
+        "icon": "partly-cloudy-day",
+        "stations": ["EPWA"],
+        "source": "obs"
+    }
+
+def build_day(day: date, rng: random.Random, include_hours: bool = True) -> Dict[str, Any]:
+    hours = [build_hour(day, hour, rng) for hour in range(24)]
+    temps = [hour["temp"] for hour in hours]
+
+    payload = {
+        "datetime": day.strftime("%Y-%m-%d"),
+        "datetimeEpoch": int(datetime(day.year, day.month, day.day).timestamp()),
+        "tempmax": max(temps),
+        "tempmin": min(temps),
+        "temp": round(sum(temps) / len(temps), 1),
+        "feelslike": round(sum(hour["feelslike"] for hour in hours) / 24, 1),
+        "humidity": round(sum(hour["humidity"] for hour in hours) / 24, 1),
+        "precip": round(sum(hour["precip"] for hour in hours), 1),
+        "windspeed": max(hour["windspeed"] for hour in hours),
+        "winddir": hours[12]["winddir"],
+        "pressure": round(sum(hour["pressure"] for hour in hours) / 24, 1),
+        "cloudcover": round(sum(hour["cloudcover"] for hour in hours) / 24, 1),
+        "conditions": hours[12]["conditions"],
+        "description": "Synthetic day generated by the benchmark stub.",
+        "icon": "partly-cloudy-day",
+        "source": "obs"
+    }
+
+    if include_hours:
+        payload["hours"] = hours
+
+    return payload
+
+def build_timeline_payload(
+    city_name: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    include_hours: bool = True,
+    seed: int = 0
+) -> Dict[str, Any]:
+    rng = random.Random(f"{city_name}-{seed}")
+    today = date.today()
+    start_date = start_date or today
+    end_date = end_date or start_date
+
+    days = []
+    day = start_date
+    while day <= end_date:
+        days.append(build_day(day, rng, include_hours))
+        day += timedelta(days=1)
+
+    current = build_hour(today, datetime.now().hour, rng)
+
+    return {
+        "queryCost": len(days),
+        "latitude": 52.2297,
+        "longitude": 21.0122,
+        "resolvedAddress": city_name,
+        "address": city_name,
+        "timezone": "Europe/Warsaw",
+        "tzoffset": 1.0,
+        "days": days,
+        "currentConditions": current
+    }
+
+class StubState:
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        handshake_latency: float = 0.0,
+        fail_first: int = 0,
+        latency_jitter: float = 0.0,
+        body_cache_size: int = 0
+    ):
+        self.latency = latency
+        self.handshake_latency = handshake_latency
+        self.fail_first = fail_first
+        self.latency_jitter = latency_jitter
+        self.body_cache_size = body_cache_size
+        self.requests = 0
+        self.connections = 0
+        self.payload_bytes = 0
+        self.lock = threading.Lock()
+        self.rng = random.Random(0)
+        self.bodies: OrderedDict = OrderedDict()
+
+    def delay(self) -> float:
+        """Per-request latency, spread uniformly by +/- latency_jitter (a fraction of latency)."""
+
+        if not self.latency_jitter:
+
+            return self.latency
+
+        with self.lock:
+            factor = 1 + self.rng.uniform(-self.latency_jitter, self.latency_jitter)
+
+        return self.latency * factor
+
+    def body(self, city_name: str, start_date: Optional[date], end_date: Optional[date]) -> bytes:
+        """Encoded payload, reused for repeated requests when body_cache_size > 0 so the stub's
+        own JSON encoding does not dominate client-side benchmarks."""
+
+        key = (city_name, start_date, end_date)
+
+        with self.lock:
+            body = self.bodies.get(key)
+
+            if body is not None:
+                self.bodies.move_to_end(key)
+
+                return body
+
+        body = json.dumps(build_timeline_payload(city_name, start_date, end_date)).encode()
+
+        if self.body_cache_size:
+            with self.lock:
+                self.bodies[key] = body
+
+                while len(self.bodies) > self.body_cache_size:
+                    self.bodies.popitem(last=False)
+
+        return body
+
+def make_handler(state: StubState):
+
+    class TimelineHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            with state.lock:
+                state.connections += 1
+
+            if state.handshake_latency:
+                time.sleep(state.handshake_latency)
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            with state.lock:
+                state.requests += 1
+                failing = state.requests <= state.fail_first
+
+            if state.latency:
+                time.sleep(state.delay())
+
+            if failing:
+                self._send(503, b'{"error": "stub failure"}', {"Retry-After": "0"})
+
+                return
+
+            parts = [unquote(part) for part in urlparse(self.path).path.split("/") if part]
+            location = parts[parts.index("timeline") + 1:] if "timeline" in parts else parts[-1:]
+            city_name = location[0] if location else "Unknown"
+            start_date = date.fromisoformat(location[1]) if len(location) > 1 else None
+            end_date = date.fromisoformat(location[2]) if len(location) > 2 else start_date
+
+            body = state.body(city_name, start_date, end_date)
+
+            with state.lock:
+                state.payload_bytes += len(body)
+
+            self._send(200, body)
+
+        def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, compresslevel=5)
+                headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+
+            self.end_headers()
+            self.wfile.write(body)
+
+    return TimelineHandler
+
+def start_stub_server(
+    port: int = 0,
+    latency: float = 0.0,
+    handshake_latency: float = 0.0,
+    fail_first: int = 0,
+    latency_jitter: float = 0.0,
+    body_cache_size: int = 0
+):
+    """Start the stub on a background thread; returns (server, state, base_url)."""
+
+    state = StubState(latency, handshake_latency, fail_first, latency_jitter, body_cache_size)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, name="stub-api", daemon=True)
+    thread.start()
+
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/VisualCrossingWebServices/rest/services/timeline/"
+
+    return server, state, base_url
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the stub Visual Crossing timeline API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Per-request latency in seconds")
+    parser.add_argument("--handshake-latency", type=float, default=0.05, help="Per-connection setup latency in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Spread latency by +/- this fraction")
+    parser.add_argument("--body-cache", type=int, default=0, help="Reuse up to this many encoded payloads")
+    args = parser.parse_args()
+
+    server, state, base_url = start_stub_server(
+        args.port, args.latency, args.handshake_latency,
+        latency_jitter=args.latency_jitter, body_cache_size=args.body_cache
+    )
+    print(f"Stub timeline API listening on {base_url}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
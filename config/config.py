@@ -15,7 +15,81 @@ CITIES = [
 ]
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./weather_data.db")
+# Optional separate URL for read-only queries (e.g. a replica); SQLite defaults to a read-only connection to DATABASE_URL.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+# Unset: pre-ping pooled connections to server databases but not to SQLite files.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING")
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", 10))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", 20))
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -65536))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 30000))
+SQLITE_WAL_AUTOCHECKPOINT = int(os.getenv("SQLITE_WAL_AUTOCHECKPOINT", 1000))
+SQLITE_WAL_TRUNCATE_MB = int(os.getenv("SQLITE_WAL_TRUNCATE_MB", 64))
+# INCREMENTAL lets retention hand freed pages back to the OS in small steps; only applies to new
+# database files (an existing one keeps its mode until a one-off VACUUM).
+SQLITE_AUTO_VACUUM = os.getenv("SQLITE_AUTO_VACUUM", "INCREMENTAL")
 FETCH_INTERVAL = int(os.getenv("FETCH_INTERVAL", 3600))
+# Per-group intervals, e.g. "Warsaw,Berlin=900;London=1800"; cities not listed run every FETCH_INTERVAL.
+SCHEDULE_GROUPS = os.getenv("SCHEDULE_GROUPS", "")
+SCHEDULE_JITTER_SECONDS = float(os.getenv("SCHEDULE_JITTER_SECONDS", 30))
+# After downtime: "once" runs missed jobs immediately, "skip" waits for the next slot.
+SCHEDULE_CATCH_UP = os.getenv("SCHEDULE_CATCH_UP", "once")
+SCHEDULER_STATE_PATH = os.getenv("SCHEDULER_STATE_PATH", "./cache/scheduler_state.json")
+# Retention tiers: raw rows for RETENTION_RAW_DAYS, hourly rollups for RETENTION_HOURLY_DAYS, daily rollups forever.
+RETENTION_RAW_DAYS = int(os.getenv("RETENTION_RAW_DAYS", 90))
+RETENTION_HOURLY_DAYS = int(os.getenv("RETENTION_HOURLY_DAYS", 730))
+# Days per city folded and deleted in one transaction.
+RETENTION_BATCH_DAYS = int(os.getenv("RETENTION_BATCH_DAYS", 7))
+RETENTION_VACUUM_PAGES = int(os.getenv("RETENTION_VACUUM_PAGES", 1024))
+# Seconds between retention runs in the scheduler; 0 leaves retention to 'app.py --retention'.
+RETENTION_INTERVAL = int(os.getenv("RETENTION_INTERVAL", 0))
+# Cold data is archived as Parquet under ARCHIVE_PATH/city=<city>/month=<YYYY-MM>/; retention
+# archives raw rows before deleting them unless ARCHIVE_ON_RETENTION is false.
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", "./archive")
+ARCHIVE_ON_RETENTION = os.getenv("ARCHIVE_ON_RETENTION", "true").lower() == "true"
+# Engine for archive queries: "auto" uses DuckDB when installed and pyarrow datasets otherwise.
+ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "auto")
+# DuckDB spills to DUCKDB_TEMP_DIRECTORY once a query needs more than DUCKDB_MEMORY_LIMIT.
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "1GB")
+DUCKDB_TEMP_DIRECTORY = os.getenv("DUCKDB_TEMP_DIRECTORY", "./cache/duckdb")
+DB_BULK_CHUNK_SIZE = int(os.getenv("DB_BULK_CHUNK_SIZE", 1000))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 50000))
+EXTRACT_MAX_WORKERS = int(os.getenv("EXTRACT_MAX_WORKERS", 8))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 64))
+PIPELINE_LOAD_BATCH_SIZE = int(os.getenv("PIPELINE_LOAD_BATCH_SIZE", 100))
+API_REQUESTS_PER_SECOND = float(os.getenv("API_REQUESTS_PER_SECOND", 2))
+BACKFILL_WINDOW_DAYS = int(os.getenv("BACKFILL_WINDOW_DAYS", 30))
+BACKFILL_MAX_WORKERS = int(os.getenv("BACKFILL_MAX_WORKERS", 4))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 16))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 60))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.5))
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", 5000))
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", 65536))
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "./cache/timeline_cache.db")
+RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", 512))
+RESPONSE_CACHE_RECENT_TTL = int(os.getenv("RESPONSE_CACHE_RECENT_TTL", 3600))
+# Port for the Prometheus-text /metrics endpoint; 0 disables it.
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_SUMMARY_PATH = os.getenv("METRICS_SUMMARY_PATH", "./cache/last_run.json")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = os.getenv("LOG_FILE", "weather_etl.log")
 STREAMLIT_PORT = int(os.getenv("STREAMLIT_PORT", 8501))
+# Dashboard query results are cached per data generation; the TTL only bounds how far a window may slide.
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 300))
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", 128))
+# Target points per dashboard chart; the bucket size (5 min .. 1 day) is picked to stay near it.
+DASHBOARD_CHART_POINTS = int(os.getenv("DASHBOARD_CHART_POINTS", 500))
+# Upper bound on rows embedded per chart section; larger frames are LTTB-downsampled.
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", 1000))
+# Width in pixels of a concatenated chart section: Vega-Lite cannot size the panels of a
+# concatenated chart to the container, so set it to match the page.
+CHART_WIDTH = int(os.getenv("CHART_WIDTH", 900))
@@ -1,24 +1,59 @@
-import time
-import schedule
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, date, timedelta
 
+from config.config import (
+    CITIES,
+    METRICS_SUMMARY_PATH,
+    RETENTION_INTERVAL,
+    SCHEDULE_CATCH_UP,
+    SCHEDULE_GROUPS,
+    SCHEDULE_JITTER_SECONDS,
+    SCHEDULER_STATE_PATH
+)
+from database.database import maybe_checkpoint_wal, session_scope
+from repositories.rollup_repositories import RollupRepository
+from services.archive_services import ArchiveService
+from services.backfill_services import BackfillService
 from services.extract_services import ExtractService
+from services.historical_services import HistoricalService
 from services.load_services import LoadService
+from services.pipeline_services import PipelineService
+from services.retention_services import RetentionService
 from services.transform_services import TransformService
-from services.historical_services import HistoricalService
 from utils.logger import get_logger
+from utils.metrics import RunSummary
+from utils.scheduler import Scheduler
 
 logger = get_logger(__name__)
 
 class ETLControllers:
 
     @staticmethod
-    def run_etl_pipeline() -> bool:
+    def run_etl_pipeline(pipelined: bool = False, cities: Optional[List[Dict[str, str]]] = None, group: str = "all") -> bool:
+        summary = RunSummary("pipelined" if pipelined else "batch", len(CITIES if cities is None else cities), group)
+        success = False
+
         try:
 
+            if pipelined:
+                logger.info("Starting pipelined ETL process for weather data")
+                stats = PipelineService.run(cities)
+
+                for stage, done in (("extract", "extracted"), ("transform", "transformed"), ("load", "saved")):
+                    summary.stage(stage, stats[f"{stage}_seconds"])
+                    summary.records(stage, stats[done], stats[f"{stage}_failed"])
+
+                maybe_checkpoint_wal()
+                success = stats["saved"] > 0
+
+                return success
+
             logger.info("Starting ETL process for weather data")
-            raw_weather_data = ExtractService.extract_all_cities()
+
+            with summary.timed_stage("extract"):
+                raw_weather_data = ExtractService.extract_all_cities(cities)
+
+            summary.records("extract", len(raw_weather_data))
 
             if not raw_weather_data:
                 logger.warning("No Weather data downloaded")
@@ -27,37 +62,97 @@ class ETLControllers:
                 
             logger.info(f"Downloaded data for {len(raw_weather_data)} cities")
 
-            processed_data = TransformService.batch_process_cities(raw_weather_data)
+            with session_scope():
+                with summary.timed_stage("transform"):
+                    processed_data = TransformService.batch_process_cities(raw_weather_data)
+
+                summary.records("transform", len(processed_data))
+                logger.info(f"Processed data for {len(processed_data)} cities")
 
-            logger.info(f"Processed data for {len(processed_data)} cities")
+                with summary.timed_stage("load"):
+                    record_ids = LoadService.batch_save_weather_data(processed_data)
 
-            record_ids = LoadService.batch_save_weather_data(processed_data)
+            summary.records("load", len(record_ids))
+            maybe_checkpoint_wal()
 
             logger.info(f"Saved {len(record_ids)} records of weather data")
+            success = True
 
             return True
         except Exception as e:
             logger.error(f"Error during ETL process: {str(e)}")
 
             return False
-    
+        finally:
+            summary.finish(success, METRICS_SUMMARY_PATH)
+
     @staticmethod
-    def schedule_etl_job(interval_seconds: int) -> None:
+    def schedule_groups(default_interval: int, groups: str = SCHEDULE_GROUPS) -> List[Dict[str, Any]]:
+        """Split CITIES into groups by interval from a spec like "Warsaw,Berlin=900;London=1800".
+
+        Cities that are not listed form one group running every default_interval.
+        """
+
+        cities_by_name = {city["name"].lower(): city for city in CITIES}
+        scheduled = []
+        assigned = set()
+
+        for entry in filter(None, (part.strip() for part in groups.split(";"))):
+            names, _, interval = entry.rpartition("=")
+
+            if not names or not interval.strip().isdigit() or int(interval) <= 0:
+                raise ValueError(f"Invalid schedule group '{entry}', expected 'City,City=seconds'")
+
+            group_cities = []
+
+            for name in filter(None, (name.strip() for name in names.split(","))):
+                city = cities_by_name.get(name.lower())
+
+                if city is None:
+                    logger.warning(f"Scheduled city {name} is not configured, ignoring it")
+                    continue
+
+                if city["name"] in assigned:
+                    raise ValueError(f"City {city['name']} is listed in more than one schedule group")
 
-        def job():
-            ETLControllers.run_etl_pipeline()
+                assigned.add(city["name"])
+                group_cities.append(city)
 
-        job()
+            if group_cities:
+                scheduled.append({"interval": int(interval), "cities": group_cities})
 
-        schedule.every(interval_seconds).seconds.do(job)
+        remaining = [city for city in CITIES if city["name"] not in assigned]
 
-        logger.info(f"ETL execution for {interval_seconds} seconds")
+        if remaining:
+            scheduled.append({"interval": default_interval, "cities": remaining})
+
+        return scheduled
+
+    @staticmethod
+    def schedule_etl_job(interval_seconds: int, pipelined: bool = False) -> None:
+        scheduler = Scheduler(state_path=SCHEDULER_STATE_PATH, catch_up=SCHEDULE_CATCH_UP)
+
+        for group in ETLControllers.schedule_groups(interval_seconds):
+            cities = group["cities"]
+            name = ",".join(city["name"] for city in cities)
+
+            scheduler.add_job(
+                name,
+                group["interval"],
+                lambda cities=cities, name=name: ETLControllers.run_etl_pipeline(pipelined, cities, name),
+                jitter=SCHEDULE_JITTER_SECONDS
+            )
+
+            logger.info(f"ETL for {name} every {group['interval']} seconds")
+
+        if RETENTION_INTERVAL > 0:
+            scheduler.add_job("retention", RETENTION_INTERVAL, ETLControllers.apply_retention)
+            logger.info(f"Retention every {RETENTION_INTERVAL} seconds")
 
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(1)
+            scheduler.run()
         except KeyboardInterrupt:
+            scheduler.stop()
             logger.info(f"Stopped ETL execution")
 
     @staticmethod
@@ -66,11 +161,73 @@ class ETLControllers:
         return TransformService.calculate_weather_statistics(city_name)
     
     @staticmethod
-    def export_city_data(city_name: str, file_path: str) -> bool:
-        
-        return LoadService.export_to_csv(city_name, file_path)
+    def export_city_data(
+        city_names: List[str],
+        file_path: str,
+        start_date_str: Optional[str] = None,
+        end_date_str: Optional[str] = None,
+        file_format: Optional[str] = None
+    ) -> bool:
+
+        try:
+            end_date = datetime.strptime(end_date_str, "%Y-%m-%d") + timedelta(days=1) - timedelta(microseconds=1) \
+                if end_date_str else datetime.now()
+            start_date = datetime.strptime(start_date_str, "%Y-%m-%d") \
+                if start_date_str else end_date - timedelta(days=30)
+        except ValueError as e:
+            logger.error(f"Invalid date format: {str(e)}")
+
+            return False
+
+        if start_date > end_date:
+            logger.error(f"Start date {start_date.date()} cannot be after end date {end_date.date()}")
+
+            return False
+
+        return LoadService.export_data(city_names, file_path, start_date, end_date, file_format)
     
-    def fetch_historical_data(city_name: str, start_date_str: str, end_date_str: str) -> bool:
+    @staticmethod
+    def rebuild_rollups() -> bool:
+
+        try:
+            refreshed = RollupRepository.rebuild_rollups()
+            logger.info(f"Rebuilt rollups for {refreshed} city-days")
+
+            return True
+        except Exception as e:
+            logger.error(f"Error while rebuilding rollups: {str(e)}")
+
+            return False
+
+    @staticmethod
+    def apply_retention() -> bool:
+
+        try:
+            RetentionService.apply_retention()
+
+            return True
+        except Exception as e:
+            logger.error(f"Error while applying retention: {str(e)}")
+
+            return False
+
+    @staticmethod
+    def archive_data(city_names: Optional[List[str]] = None) -> bool:
+
+        try:
+            archived = ArchiveService.archive_before(city_names=city_names)
+
+            for city_name, months in archived.items():
+                logger.info(f"Archived {months} months for {city_name}")
+
+            return True
+        except Exception as e:
+            logger.error(f"Error while archiving data: {str(e)}")
+
+            return False
+
+    @staticmethod
+    def fetch_historical_data(city_names: List[str], start_date_str: str, end_date_str: str, stream: bool = False) -> bool:
 
         try:
             start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
@@ -88,20 +245,28 @@ class ETLControllers:
                 
                 return False
             
-            date_diff = (end_date - start_date).days
-            if date_diff > 365:
-                logger.warning(f"Date range exceeds 365 days ({date_diff} days). This may take a while.")
-            
-            records_saved = HistoricalService.fetch_and_save_historical_data(city_name, start_date, end_date)
-            
-            if records_saved > 0:
-                logger.info(f"Successfully saved {records_saved} historical records for {city_name}")
-                
-                return True
-            else:
-                logger.warning(f"No historical records saved for {city_name}")
-                
+            if stream:
+                saved = {
+                    city_name: HistoricalService.stream_and_save_historical_data(city_name, start_date, end_date)
+                    for city_name in city_names
+                }
+
+                return all(saved.values())
+
+            result = BackfillService.run_backfill(city_names, start_date, end_date)
+
+            for city_name, records_saved in result["saved"].items():
+                logger.info(f"Saved {records_saved} historical records for {city_name}")
+
+            if result["failed_windows"] or result["unknown_cities"]:
+                logger.warning(
+                    f"Historical backfill incomplete: {result['failed_windows']} windows failed, "
+                    f"{result['unknown_cities']} cities not configured. Re-run to resume."
+                )
+
                 return False
+
+            return True
         
         except ValueError as e:
             logger.error(f"Invalid date format: {str(e)}")
@@ -1,22 +1,66 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
+import pandas as pd
 from datetime import datetime, timedelta
+from typing import Any, Dict, List
 
+from config.config import DASHBOARD_CACHE_MAX_ENTRIES, DASHBOARD_CACHE_TTL, DASHBOARD_CHART_POINTS
+from repositories.generation_repositories import DataGenerationRepository
 from repositories.weather_repositories import WeatherRepository
 from services.transform_services import TransformService
 from database.database import init_db
+from utils.charts import base_chart, concat_rows
+
+TIME_RANGES = {
+    "Last 24 hours": timedelta(days=1),
+    "Last 7 days": timedelta(days=7),
+    "Last 30 days": timedelta(days=30)
+}
+
+# Cached queries take the data generation as an argument: the ETL bumps it with every committed
+# batch, so a rerun without new data is served from the cache and new data changes the key.
+
+@st.cache_resource(show_spinner=False)
+def initialize_database() -> None:
+    init_db()
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, max_entries=DASHBOARD_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_cities(generation: int) -> List[str]:
+
+    return WeatherRepository.get_cities_with_data()
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, max_entries=DASHBOARD_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_window(city_name: str, time_range: str, generation: int) -> pd.DataFrame:
+    now = datetime.now()
 
-init_db()
+    return WeatherRepository.get_weather_dataframe(city_name, now - TIME_RANGES[time_range], now)
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, max_entries=DASHBOARD_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_chart_buckets(city_name: str, time_range: str, generation: int) -> pd.DataFrame:
+    """Mean/min/max per bucket, with the bucket size chosen so any window yields about DASHBOARD_CHART_POINTS points."""
+
+    now = datetime.now()
+    start_date = now - TIME_RANGES[time_range]
+    bucket_seconds = WeatherRepository.choose_bucket(start_date, now, DASHBOARD_CHART_POINTS)
+
+    return WeatherRepository.get_bucketed_dataframe(city_name, start_date, now, bucket_seconds)
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, max_entries=DASHBOARD_CACHE_MAX_ENTRIES, show_spinner=False)
+def load_statistics(city_name: str, generation: int) -> Dict[str, Any]:
+
+    return TransformService.calculate_weather_statistics(city_name)
 
 st.set_page_config(
     page_title= "Weather ETL",
     layout="wide"
 )
 
+initialize_database()
+
 st.title("Weather ETL")
 
-cities = WeatherRepository.get_cities_with_data()
+generation = DataGenerationRepository.get_generation()
+cities = load_cities(generation)
 
 if not cities:
     st.error("No data in database. Execute ETL process to download weather data")
@@ -26,31 +70,20 @@ selected_city = st.sidebar.selectbox("Choose city", cities)
 
 time_range = st.sidebar.radio(
     "Choose time range",
-    ["Last 24 hours", "Last 7 days", "Last 30 days"]
+    list(TIME_RANGES)
 )
 
-now = datetime.now()
-
-if time_range == "Last 24 hours":
-    start_date = now - timedelta(days=1)
-elif time_range == "Last 7 days":
-    start_date = now - timedelta(days=7)
-else:
-    start_date = now - timedelta(days=30)
+df = load_window(selected_city, time_range, generation)
 
-weather_data = WeatherRepository.get_weather_data_by_data_range(selected_city, start_date, now)
-
-if not weather_data:
+if df.empty:
     st.warning(f"No data for {selected_city} in chosen time range")
     st.stop()
 
-df = pd.DataFrame(weather_data)
-
-df['timestamp'] = pd.to_datetime(df['timestamp'])
 df['date'] = df['timestamp'].dt.date
 df['time'] = df["timestamp"].dt.time
 
-stats = TransformService.calculate_weather_statistics(selected_city)
+stats = load_statistics(selected_city, generation)
+buckets = load_chart_buckets(selected_city, time_range, generation)
 
 st.header(f"Current data for {selected_city}")
 
@@ -76,41 +109,47 @@ if latest_data is not None:
     st.caption(f"Latest actualization: {latest_data['timestamp']}")
     st.caption(f"Description: {latest_data['weather_description']}")
 
-st.header("Temperature graph")
-temp_chart = alt.Chart(df).mark_line().encode(
-    x=alt.X('timestamp:T', title='Date and hour'),
-    y=alt.Y('temperature:Q', title='Temperature(°C)', scale=alt.Scale(zero=False)),
-    tooltip=['timestamp:T', 'temperature:Q', 'weather_condition:N']
-).properties(
-    height=400
+st.header("Temperature, humidity and pressure")
+chart_base = base_chart(
+    buckets,
+    'bucket_start',
+    ['temperature_mean', 'temperature_min', 'temperature_max', 'humidity_mean', 'pressure_mean'],
+    extra_columns=['humidity_min', 'humidity_max', 'pressure_min', 'pressure_max', 'sample_count']
+).encode(
+    x=alt.X('bucket_start:T', title='Date and hour')
 )
 
-st.altair_chart(temp_chart, use_container_width=True)
+temp_chart = alt.layer(
+    chart_base.mark_area(opacity=0.25).encode(
+        y=alt.Y('temperature_min:Q', title='Temperature(°C)', scale=alt.Scale(zero=False)),
+        y2='temperature_max:Q'
+    ),
+    chart_base.mark_line().encode(
+        y='temperature_mean:Q',
+        tooltip=['bucket_start:T', 'temperature_mean:Q', 'temperature_min:Q', 'temperature_max:Q', 'sample_count:Q']
+    )
+).properties(
+    height=400,
+    title='Temperature'
+)
 
-st.header("Humidity and pressure")
-col1, col2 = st.columns(2)
+humidity_chart = chart_base.mark_area(opacity=0.7).encode(
+    y=alt.Y('humidity_mean:Q', title='Humidity(%)', scale=alt.Scale(domain=[0,100])),
+    tooltip=['bucket_start:T', 'humidity_mean:Q', 'humidity_min:Q', 'humidity_max:Q']
+).properties(
+    height=300,
+    title='Humidity'
+)
 
-with col1:
-    humidity_chart = alt.Chart(df).mark_area(opacity=0.7).encode(
-        x=alt.X('timestamp:T', title='Date and hour'),
-        y=alt.Y('humidity:Q', title='Humidity(%)', scale=alt.Scale(domain=[0,100])),
-        tooltip=['timestamp:T', 'humidity:Q']
-    ).properties(
-        height=300,
-        title='Humidity'
-    )
-    st.altair_chart(humidity_chart, use_container_width=True)
+pressure_chart = chart_base.mark_line(color='red').encode(
+    y=alt.Y('pressure_mean:Q', title='Pressure(hPa)', scale=alt.Scale(zero=False)),
+    tooltip=['bucket_start:T', 'pressure_mean:Q', 'pressure_min:Q', 'pressure_max:Q']
+).properties(
+    height=300,
+    title='Pressure'
+)
 
-with col2:
-    pressure_chart = alt.Chart(df).mark_line(color='red').encode(
-        x=alt.X('timestamp:T', title='Date and hour'),
-        y=alt.Y('pressure:Q', title='Pressure(hPa)', scale=alt.Scale(zero=False)),  
-        tooltip=['timestamp:T', 'pressure:Q']
-    ).properties(
-        height=300,
-        title='Pressure'
-    )
-    st.altair_chart(pressure_chart, use_container_width=True)
+st.altair_chart(concat_rows([[temp_chart], [humidity_chart, pressure_chart]]))
 
 st.header("Weather condition")
 weather_counts = df['weather_condition'].value_counts().reset_index()
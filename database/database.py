@@ -1,14 +1,171 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, MetaData, Table
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, Date, DateTime, MetaData, Table, Index, delete, func, insert, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from config.config import (
+    DATABASE_URL,
+    DATABASE_READ_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_READ_POOL_SIZE,
+    DB_READ_MAX_OVERFLOW,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_WAL_AUTOCHECKPOINT,
+    SQLITE_WAL_TRUNCATE_MB,
+    SQLITE_AUTO_VACUUM
+)
+from utils.logger import get_logger
+from utils.metrics import DB_COMMIT_SECONDS, DB_QUERY_SECONDS
+
+logger = get_logger(__name__)
+
+def _sqlite_pragma_listener(pragmas):
+    def apply_pragmas(dbapi_connection, connection_record) -> None:
+        # Hand transaction control to SQLAlchemy (see the "begin" listener) so that SAVEPOINTs
+        # nest inside the unit of work instead of pysqlite's implicit transactions.
+        dbapi_connection.isolation_level = None
+
+        cursor = dbapi_connection.cursor()
+
+        try:
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+        finally:
+            cursor.close()
+
+    return apply_pragmas
+
+SQLITE_SHARED_PRAGMAS = [
+    f"cache_size={SQLITE_CACHE_SIZE}",
+    f"mmap_size={SQLITE_MMAP_SIZE}",
+    f"busy_timeout={SQLITE_BUSY_TIMEOUT}"
+]
+
+SQLITE_WRITER_PRAGMAS = [
+    # Must come before the first table is created to take effect on a new file.
+    f"auto_vacuum={SQLITE_AUTO_VACUUM}",
+    f"journal_mode={SQLITE_JOURNAL_MODE}",
+    f"synchronous={SQLITE_SYNCHRONOUS}",
+    f"wal_autocheckpoint={SQLITE_WAL_AUTOCHECKPOINT}",
+    "foreign_keys=ON",
+    *SQLITE_SHARED_PRAGMAS
+]
+
+SQLITE_READER_PRAGMAS = ["query_only=ON", *SQLITE_SHARED_PRAGMAS]
+
+def _begin_sqlite_transaction(connection) -> None:
+    connection.exec_driver_sql("BEGIN")
+
+# The start time lives on the statement's execution context, which is discarded with it, so
+# a statement that raises leaves nothing behind on the pooled connection.
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_query_started", None)
+
+    if started is None:
+
+        return
+
+    verb = statement[:16].split(None, 1)
+
+    DB_QUERY_SECONDS.observe(time.perf_counter() - started, verb[0].upper() if verb else "")
+
+def _before_commit(session) -> None:
+    session.info["commit_started"] = time.perf_counter()
+
+def _after_commit(session) -> None:
+    started = session.info.pop("commit_started", None)
+
+    if started is not None:
+        DB_COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+def _is_sqlite_file(url: URL) -> bool:
+
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+def create_db_engine(database_url: str = DATABASE_URL, read_only: bool = False) -> Engine:
+    """Engine with pooling from config; SQLite connections also get the configured pragmas.
+
+    With read_only=True a SQLite file is opened with mode=ro and query_only, so readers never
+    take the write lock and, in WAL mode, never wait for the writer.
+    """
+
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+
+    if DB_POOL_PRE_PING is None:
+        pre_ping = not is_sqlite
+    else:
+        pre_ping = DB_POOL_PRE_PING.lower() == "true"
+
+    options = {"pool_pre_ping": pre_ping}
+
+    # In-memory SQLite uses a single-connection pool that takes no size options.
+    if not is_sqlite or _is_sqlite_file(url):
+        options.update(
+            pool_size=DB_READ_POOL_SIZE if read_only else DB_POOL_SIZE,
+            max_overflow=DB_READ_MAX_OVERFLOW if read_only else DB_MAX_OVERFLOW
+        )
+
+    if read_only and _is_sqlite_file(url):
+        path = os.path.abspath(url.database)
+        url = url.set(database=f"file:{path}?mode=ro", query={**url.query, "uri": "true"})
+
+    db_engine = create_engine(url, **options)
+
+    if is_sqlite:
+        pragmas = SQLITE_READER_PRAGMAS if read_only else SQLITE_WRITER_PRAGMAS
+        event.listen(db_engine, "connect", _sqlite_pragma_listener(pragmas))
+        event.listen(db_engine, "begin", _begin_sqlite_transaction)
+
+    event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+
+    return db_engine
+
+def _create_read_engine() -> Engine:
+    if DATABASE_READ_URL:
 
-from config.config import DATABASE_URL
+        return create_db_engine(DATABASE_READ_URL, read_only=True)
+
+    if _is_sqlite_file(make_url(DATABASE_URL)):
+
+        return create_db_engine(DATABASE_URL, read_only=True)
+
+    return engine
+
+engine = create_db_engine()
+read_engine = _create_read_engine()
+SessionFactory = sessionmaker(bind=engine)
+ReadSessionFactory = sessionmaker(bind=read_engine)
+event.listen(SessionFactory, "before_commit", _before_commit)
+event.listen(SessionFactory, "after_commit", _after_commit)
+
+_unit_of_work: ContextVar[Optional[Session]] = ContextVar("unit_of_work", default=None)
 
-engine = create_engine(DATABASE_URL)
 Base = declarative_base()
 
 class WeatherDataTable(Base):
     __tablename__ = 'weather_data'
+    __table_args__ = (
+        Index('uq_weather_data_city_timestamp', 'city_name', 'timestamp', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     city_name = Column(String(50),nullable=False )
@@ -26,12 +183,346 @@ class WeatherDataTable(Base):
     snow_1h = Column(Float,nullable=True)
     timestamp = Column(DateTime, nullable=False, index=True)
 
+class RollupColumnsMixin:
+    city_name = Column(String(50), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    sample_count = Column(Integer, nullable=False)
+    temperature_min = Column(Float, nullable=False)
+    temperature_max = Column(Float, nullable=False)
+    temperature_sum = Column(Float, nullable=False)
+    temperature_sum_sq = Column(Float, nullable=False)
+    humidity_min = Column(Float, nullable=False)
+    humidity_max = Column(Float, nullable=False)
+    humidity_sum = Column(Float, nullable=False)
+    pressure_min = Column(Float, nullable=False)
+    pressure_max = Column(Float, nullable=False)
+    pressure_sum = Column(Float, nullable=False)
+    precipitation_total = Column(Float, nullable=False)
+    dominant_condition = Column(String(50), nullable=False)
+
+class WeatherHourlyRollupTable(RollupColumnsMixin, Base):
+    __tablename__ = 'weather_rollup_hourly'
+
+class WeatherDailyRollupTable(RollupColumnsMixin, Base):
+    __tablename__ = 'weather_rollup_daily'
+
+class WeatherHourlyConditionRollupTable(Base):
+    __tablename__ = 'weather_rollup_hourly_conditions'
+
+    city_name = Column(String(50), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    weather_condition = Column(String(50), primary_key=True)
+    sample_count = Column(Integer, nullable=False)
+
+class BackfillCheckpointTable(Base):
+    __tablename__ = 'backfill_checkpoints'
+
+    city_name = Column(String(50), primary_key=True)
+    window_start = Column(Date, primary_key=True)
+    window_end = Column(Date, primary_key=True)
+    records = Column(Integer, nullable=False)
+    completed_at = Column(DateTime, nullable=False)
+
+class DataGenerationTable(Base):
+    """Single-row counter bumped whenever weather data is committed, so readers can tell cheaply that it changed."""
+
+    __tablename__ = 'data_generation'
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+# Dialects whose INSERT supports ON CONFLICT; other backends go through upsert_rows' portable path.
+ON_CONFLICT_DIALECTS = ('sqlite', 'postgresql')
+
+def dialect_insert(table: Table, dialect_name: str):
+    """INSERT construct with ON CONFLICT support on SQLite and PostgreSQL, a plain INSERT elsewhere."""
+
+    if dialect_name == 'sqlite':
+
+        return sqlite_insert(table)
+
+    if dialect_name == 'postgresql':
+
+        return postgresql_insert(table)
+
+    return insert(table)
+
+def upsert_rows(
+    connection,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    key_columns: List[str],
+    update_columns: Optional[List[str]] = None,
+    returning: Optional[Column] = None
+) -> Optional[List[Any]]:
+    """Insert the rows, or update the stored row with the same key_columns.
+
+    update_columns default to every non-key, non-primary-key column; an empty list keeps
+    stored rows as they are. With `returning` (the table's primary key column), returns its
+    value for each row, in the order of `rows`. SQLite and PostgreSQL do it in one
+    INSERT ... ON CONFLICT statement; other backends look each row up by key and update or
+    insert it.
+    """
+
+    if update_columns is None:
+        update_columns = [
+            column.name for column in table.columns
+            if column.name not in key_columns and not column.primary_key
+        ]
+
+    if connection.dialect.name in ON_CONFLICT_DIALECTS:
+        statement = dialect_insert(table, connection.dialect.name)
+
+        if update_columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=key_columns,
+                set_={name: statement.excluded[name] for name in update_columns}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=key_columns)
+
+        if returning is None:
+            connection.execute(statement, rows)
+
+            return None
+
+        # Rows come back in parameter order, so each value lines up with its row.
+        return list(connection.execute(
+            statement.returning(returning, sort_by_parameter_order=True), rows
+        ).scalars().all())
+
+    values = []
+    lookup = returning if returning is not None else table.c[key_columns[0]]
+
+    for row in rows:
+        key = [table.c[name] == row[name] for name in key_columns]
+        stored = connection.execute(select(lookup).where(*key)).first()
+
+        if stored is None:
+            result = connection.execute(insert(table).values(row))
+            values.append(result.inserted_primary_key[0] if returning is not None else None)
+        else:
+            if update_columns:
+                connection.execute(update(table).where(*key).values({name: row[name] for name in update_columns}))
+
+            values.append(stored[0])
+
+    return values if returning is not None else None
+
+def deduplicate_weather_data(connection) -> int:
+    """Delete duplicate (city_name, timestamp) rows, keeping the most recently inserted one."""
+
+    keep_ids = select(func.max(WeatherDataTable.id)).group_by(
+        WeatherDataTable.city_name,
+        WeatherDataTable.timestamp
+    )
+    result = connection.execute(
+        delete(WeatherDataTable.__table__).where(WeatherDataTable.id.not_in(keep_ids))
+    )
+
+    return result.rowcount
+
+def _migrate_unique_city_timestamp(connection) -> None:
+    existing = {index['name'] for index in inspect(connection).get_indexes(WeatherDataTable.__tablename__)}
+
+    for index in WeatherDataTable.__table__.indexes:
+        if not index.unique or index.name in existing:
+            continue
+
+        removed = deduplicate_weather_data(connection)
+        logger.info(f"Removed {removed} duplicate weather rows before creating {index.name}")
+
+        index.create(connection)
+
+def _check_rollups_populated(connection) -> None:
+    has_raw = connection.execute(select(WeatherDataTable.id).limit(1)).first() is not None
+    has_rollups = connection.execute(select(WeatherDailyRollupTable.city_name).limit(1)).first() is not None
+
+    if has_raw and not has_rollups:
+        logger.warning("Rollup tables are empty; run 'python app.py --rebuild-rollups' to backfill them")
+
+def _check_auto_vacuum(connection) -> None:
+    if not _is_sqlite_file(connection.engine.url) or SQLITE_AUTO_VACUUM.upper() not in ("INCREMENTAL", "2"):
+
+        return
+
+    # Changing the mode of an existing file needs a full VACUUM, which locks the database for
+    # its whole duration, so it is left to the operator.
+    if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+        logger.warning(
+            "SQLite database is not in auto_vacuum=INCREMENTAL mode, so retention cannot shrink the file; "
+            "run 'PRAGMA auto_vacuum=INCREMENTAL; VACUUM;' once while the ETL is stopped"
+        )
+
+MIGRATIONS = [
+    _migrate_unique_city_timestamp,
+    _check_rollups_populated,
+    _check_auto_vacuum,
+]
+
 def init_db():
     Base.metadata.create_all(engine)
 
+    with engine.begin() as connection:
+        for migration in MIGRATIONS:
+            migration(connection)
+
+class UnitOfWorkSession:
+    """Session handed out by get_session() inside session_scope().
+
+    Repository code keeps its usual commit/rollback/close calls: each get_session() opens a
+    SAVEPOINT, commit releases it, and rollback or close without commit undoes only that
+    repository call. The enclosing session_scope() commits or rolls back the whole batch.
+    """
+
+    def __init__(self, session: Session):
+        self._session = session
+        self._savepoint = session.begin_nested()
+
+    def commit(self) -> None:
+        if self._savepoint.is_active:
+            self._savepoint.commit()
+
+    def rollback(self) -> None:
+        if self._savepoint.is_active:
+            self._savepoint.rollback()
+
+    def close(self) -> None:
+        self.rollback()
+
+    def __getattr__(self, name):
+
+        return getattr(self._session, name)
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Unit of work: every get_session() in the block shares one transaction, committed at the end.
+
+    Nested scopes join the outermost one.
+    """
+
+    current = _unit_of_work.get()
+
+    if current is not None:
+        yield current
+
+        return
+
+    session = SessionFactory()
+    token = _unit_of_work.set(session)
+
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        _unit_of_work.reset(token)
+        session.close()
+
 def get_session():
-    Session = sessionmaker(bind=engine)
+    current = _unit_of_work.get()
+
+    if current is not None:
+
+        return UnitOfWorkSession(current)
+
+    return SessionFactory()
+
+def get_read_session():
+    """Session for read-only queries. Inside session_scope() it reads through the writer so the
+    batch sees its own uncommitted rows."""
+
+    if _unit_of_work.get() is not None:
+
+        return get_session()
+
+    return ReadSessionFactory()
+
+def checkpoint_wal(mode: str = "PASSIVE") -> Optional[Tuple[int, int, int]]:
+    """Run a WAL checkpoint on the writer; returns (busy, wal_frames, checkpointed_frames), or None when not SQLite."""
+
+    if engine.dialect.name != "sqlite":
+
+        return None
+
+    connection = engine.raw_connection()
+
+    try:
+        cursor = connection.cursor()
+        result = cursor.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        cursor.close()
+
+        return tuple(result)
+    finally:
+        connection.close()
+
+def maybe_checkpoint_wal() -> None:
+    """Truncate the WAL once it outgrows SQLITE_WAL_TRUNCATE_MB.
+
+    The automatic checkpoint is PASSIVE and cannot complete while dashboards keep read
+    transactions open, so under constant reads the WAL (and every reader's lookup cost)
+    keeps growing. Called by the writer after each committed batch.
+    """
+
+    url = make_url(DATABASE_URL)
+
+    if _unit_of_work.get() is not None or not _is_sqlite_file(url):
+
+        return
+
+    wal_path = f"{os.path.abspath(url.database)}-wal"
+
+    try:
+        wal_size = os.path.getsize(wal_path)
+    except OSError:
+
+        return
+
+    if wal_size < SQLITE_WAL_TRUNCATE_MB * 1024 * 1024:
+
+        return
+
+    busy, wal_frames, checkpointed = checkpoint_wal("TRUNCATE")
+    logger.info(
+        f"WAL checkpoint of {wal_size / (1024 * 1024):.1f} MB: {checkpointed}/{wal_frames} frames"
+        + (" (readers still active, will retry)" if busy else "")
+    )
+
+def incremental_vacuum(max_pages: int) -> Optional[Tuple[int, int]]:
+    """Return up to max_pages free pages to the OS; returns (freed, still_free), or None when not supported.
+
+    Needs a SQLite file in auto_vacuum=INCREMENTAL mode. Each call is its own short write
+    transaction, so callers can reclaim space in steps between other writers.
+    """
+
+    if engine.dialect.name != "sqlite":
+
+        return None
+
+    connection = engine.raw_connection()
+
+    try:
+        cursor = connection.cursor()
+
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+
+            return None
+
+        free_before = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        # Drain the statement: pysqlite stops stepping a pragma early and only part of the pages are freed.
+        cursor.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+        free_after = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        cursor.close()
+
+        return free_before - free_after, free_after
+    finally:
+        connection.close()
 
-    return Session()
 def close_connection():
     engine.dispose()
+
+    if read_engine is not engine:
+        read_engine.dispose()
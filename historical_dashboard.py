@@ -7,7 +7,10 @@ import time
 from io import StringIO
 import json
 
-from config.config import WEATHER_API_KEY, WEATHER_API_BASE_URL, CITIES
+from config.config import CITIES
+from services.parse_services import ParseService
+from services.timeline_services import TimelineService
+from utils.charts import base_chart, concat_rows
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -57,25 +60,11 @@ if date_diff > 30:
 
 @st.cache_data(ttl=3600)
 def fetch_historical_weather_data(city_name, start_date, end_date):
-    """Fetch historical weather data directly from the Visual Crossing API"""
+    """Fetch historical weather data from the Visual Crossing API, reusing days already in the response cache"""
     
     try:
-        start_str = start_date.strftime("%Y-%m-%d")
-        end_str = end_date.strftime("%Y-%m-%d")
-        
-        url = f"{WEATHER_API_BASE_URL}{city_name}/{start_str}/{end_str}"
-        params = {
-            "unitGroup": "metric",
-            "key": WEATHER_API_KEY,
-            "contentType": "json",
-            "include": "days,hours"
-        }
-        
-        with st.spinner(f"Fetching data for {city_name} from {start_str} to {end_str}..."):
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+        with st.spinner(f"Fetching data for {city_name} from {start_date} to {end_date}..."):
+            data = TimelineService.fetch_timeline(city_name, start_date, end_date, include="days,hours")
             return data
     
     except requests.exceptions.RequestException as e:
@@ -95,57 +84,11 @@ def process_weather_data(raw_data):
     if not raw_data or "days" not in raw_data:
         return None
     
-    hourly_data = []
-    daily_data = []
-    
-    for day in raw_data.get("days", []):
-        day_date = day.get("datetime")
-
-        daily_data.append({
-            "date": day_date,
-            "tempmax": day.get("tempmax"),
-            "tempmin": day.get("tempmin"),
-            "temp": day.get("temp"),
-            "humidity": day.get("humidity"),
-            "pressure": day.get("pressure"),
-            "windspeed": day.get("windspeed"),
-            "conditions": day.get("conditions"),
-            "description": day.get("description"),
-            "precip": day.get("precip", 0),
-            "cloudcover": day.get("cloudcover", 0)
-        })
-
-        for hour in day.get("hours", []):
-            hour_time = hour.get("datetime")
-            
-            timestamp = f"{day_date} {hour_time}"
-            
-            hourly_data.append({
-                "timestamp": timestamp,
-                "datetime": hour_time,
-                "date": day_date,
-                "temperature": hour.get("temp"),
-                "feels_like": hour.get("feelslike"),
-                "humidity": hour.get("humidity"),
-                "pressure": hour.get("pressure"),
-                "wind_speed": hour.get("windspeed"),
-                "wind_direction": hour.get("winddir"),
-                "weather_condition": hour.get("conditions", "").split(",")[0].strip(),
-                "weather_description": hour.get("conditions", ""),
-                "clouds": hour.get("cloudcover", 0),
-                "precipitation": hour.get("precip", 0)
-            })
-    
-    hourly_df = pd.DataFrame(hourly_data)
-    daily_df = pd.DataFrame(daily_data)
+    hourly_df = ParseService.hourly_frame(raw_data)
+    daily_df = ParseService.daily_frame(raw_data)
     
     if not hourly_df.empty:
-        hourly_df["timestamp"] = pd.to_datetime(hourly_df["timestamp"])
-        hourly_df["datetime"] = pd.to_datetime(hourly_df["datetime"], format="%H:%M:%S").dt.time
-        hourly_df["date"] = pd.to_datetime(hourly_df["date"])
-    
-    if not daily_df.empty:
-        daily_df["date"] = pd.to_datetime(daily_df["date"])
+        hourly_df["datetime"] = hourly_df["timestamp"].dt.time
     
     return {
         "hourly": hourly_df,
@@ -194,23 +137,61 @@ if 'weather_data' in st.session_state:
     with col3:
         st.metric("Timezone", metadata['timezone'])
     
-    st.header("Daily Temperature Trends")
-    temp_chart = alt.Chart(daily_df).mark_line(point=True).encode(
-        x=alt.X('date:T', title='Date'),
+    st.header("Daily Trends")
+
+    daily_base = base_chart(
+        daily_df,
+        'date',
+        ['temp', 'tempmin', 'tempmax', 'cloudcover', 'humidity', 'precip'],
+        extra_columns=['conditions']
+    ).encode(
+        x=alt.X('date:T', title='Date')
+    )
+
+    temp_chart = daily_base.mark_line(point=True).encode(
         y=alt.Y('temp:Q', title='Average Temperature (°C)', scale=alt.Scale(zero=False)),
         tooltip=['date:T', 'temp:Q', 'tempmin:Q', 'tempmax:Q', 'conditions:N']
-    ).properties(
-        height=300
     )
-    
-    temp_range = alt.Chart(daily_df).mark_area(opacity=0.2).encode(
-        x=alt.X('date:T'),
+
+    temp_range = daily_base.mark_area(opacity=0.2).encode(
         y=alt.Y('tempmin:Q', title='Min Temperature'),
         y2=alt.Y2('tempmax:Q', title='Max Temperature'),
         tooltip=['date:T', 'tempmin:Q', 'tempmax:Q']
     )
-    
-    st.altair_chart(temp_chart + temp_range, use_container_width=True)
+
+    cloud_chart = daily_base.mark_bar().encode(
+        y=alt.Y('cloudcover:Q', title='Cloud Cover (%)'),
+        color=alt.Color('cloudcover:Q', scale=alt.Scale(scheme='blues')),
+        tooltip=['date:T', 'cloudcover:Q', 'conditions:N']
+    ).properties(
+        height=200,
+        title='Daily Cloud Cover'
+    )
+
+    humidity_chart = daily_base.mark_area(opacity=0.7).encode(
+        y=alt.Y('humidity:Q', title='Humidity (%)', scale=alt.Scale(domain=[0, 100])),
+        tooltip=['date:T', 'humidity:Q']
+    ).properties(
+        height=250,
+        title='Daily Average Humidity'
+    )
+
+    precip_chart = daily_base.mark_bar().encode(
+        y=alt.Y('precip:Q', title='Precipitation (mm)'),
+        color=alt.Color('precip:Q', scale=alt.Scale(scheme='blues')),
+        tooltip=['date:T', 'precip:Q', 'conditions:N']
+    ).properties(
+        height=250,
+        title='Daily Precipitation'
+    )
+
+    st.altair_chart(
+        concat_rows([
+            [(temp_chart + temp_range).properties(height=300, title='Daily Temperature')],
+            [cloud_chart],
+            [humidity_chart, precip_chart]
+        ]).resolve_scale(color='independent')
+    )
     
     st.header("Temperature Distribution by Hour")
     
@@ -237,62 +218,20 @@ if 'weather_data' in st.session_state:
     st.altair_chart(hourly_temp_chart + hourly_range, use_container_width=True)
 
     st.header("Weather Conditions")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        condition_counts = daily_df['conditions'].value_counts().reset_index()
-        condition_counts.columns = ['condition', 'count']
-        
-        conditions_chart = alt.Chart(condition_counts).mark_bar().encode(
-            x=alt.X('count:Q', title='Days'),
-            y=alt.Y('condition:N', title='Weather Condition', sort='-x'),
-            color=alt.Color('condition:N', legend=None),
-            tooltip=['condition:N', 'count:Q']
-        ).properties(
-            height=200,
-            title='Weather Conditions Distribution'
-        )
-        st.altair_chart(conditions_chart, use_container_width=True)
-    
-    with col2:
-        cloud_chart = alt.Chart(daily_df).mark_bar().encode(
-            x=alt.X('date:T', title='Date'),
-            y=alt.Y('cloudcover:Q', title='Cloud Cover (%)'),
-            color=alt.Color('cloudcover:Q', scale=alt.Scale(scheme='blues')),
-            tooltip=['date:T', 'cloudcover:Q', 'conditions:N']
-        ).properties(
-            height=200,
-            title='Daily Cloud Cover'
-        )
-        st.altair_chart(cloud_chart, use_container_width=True)
 
-    st.header("Humidity and Precipitation")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        humidity_chart = alt.Chart(daily_df).mark_area(opacity=0.7).encode(
-            x=alt.X('date:T', title='Date'),
-            y=alt.Y('humidity:Q', title='Humidity (%)', scale=alt.Scale(domain=[0, 100])),
-            tooltip=['date:T', 'humidity:Q']
-        ).properties(
-            height=250,
-            title='Daily Average Humidity'
-        )
-        st.altair_chart(humidity_chart, use_container_width=True)
-    
-    with col2:
-        precip_chart = alt.Chart(daily_df).mark_bar().encode(
-            x=alt.X('date:T', title='Date'),
-            y=alt.Y('precip:Q', title='Precipitation (mm)'),
-            color=alt.Color('precip:Q', scale=alt.Scale(scheme='blues')),
-            tooltip=['date:T', 'precip:Q', 'conditions:N']
-        ).properties(
-            height=250,
-            title='Daily Precipitation'
-        )
-        st.altair_chart(precip_chart, use_container_width=True)
+    condition_counts = daily_df['conditions'].value_counts().reset_index()
+    condition_counts.columns = ['condition', 'count']
+
+    conditions_chart = alt.Chart(condition_counts).mark_bar().encode(
+        x=alt.X('count:Q', title='Days'),
+        y=alt.Y('condition:N', title='Weather Condition', sort='-x'),
+        color=alt.Color('condition:N', legend=None),
+        tooltip=['condition:N', 'count:Q']
+    ).properties(
+        height=200,
+        title='Weather Conditions Distribution'
+    )
+    st.altair_chart(conditions_chart, use_container_width=True)
 
     st.header("Hourly Weather Data")
 
@@ -305,39 +244,40 @@ if 'weather_data' in st.session_state:
     
     if not selected_day_df.empty:
 
-        hourly_detail_chart = alt.Chart(selected_day_df).mark_line(point=True).encode(
-            x=alt.X('datetime:T', title='Hour', axis=alt.Axis(format='%H:%M')),
+        detail_base = base_chart(
+            selected_day_df,
+            'timestamp',
+            ['temperature', 'humidity', 'wind_speed'],
+            extra_columns=['feels_like', 'wind_direction', 'weather_condition']
+        ).encode(
+            x=alt.X('timestamp:T', title='Hour', axis=alt.Axis(format='%H:%M'))
+        )
+
+        hourly_detail_chart = detail_base.mark_line(point=True).encode(
             y=alt.Y('temperature:Q', title='Temperature (°C)', scale=alt.Scale(zero=False)),
-            tooltip=['datetime:T', 'temperature:Q', 'feels_like:Q', 'weather_condition:N']
+            tooltip=['timestamp:T', 'temperature:Q', 'feels_like:Q', 'weather_condition:N']
         ).properties(
             height=300,
             title=f'Hourly Temperature on {selected_date}'
         )
-        st.altair_chart(hourly_detail_chart, use_container_width=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            humidity_detail_chart = alt.Chart(selected_day_df).mark_line(color='blue').encode(
-                x=alt.X('datetime:T', title='Hour', axis=alt.Axis(format='%H:%M')),
-                y=alt.Y('humidity:Q', title='Humidity (%)', scale=alt.Scale(domain=[0, 100])),
-                tooltip=['datetime:T', 'humidity:Q']
-            ).properties(
-                height=250,
-                title=f'Hourly Humidity on {selected_date}'
-            )
-            st.altair_chart(humidity_detail_chart, use_container_width=True)
-        
-        with col2:
-            wind_detail_chart = alt.Chart(selected_day_df).mark_line(color='green').encode(
-                x=alt.X('datetime:T', title='Hour', axis=alt.Axis(format='%H:%M')),
-                y=alt.Y('wind_speed:Q', title='Wind Speed (m/s)'),
-                tooltip=['datetime:T', 'wind_speed:Q', 'wind_direction:Q']
-            ).properties(
-                height=250,
-                title=f'Hourly Wind Speed on {selected_date}'
-            )
-            st.altair_chart(wind_detail_chart, use_container_width=True)
+
+        humidity_detail_chart = detail_base.mark_line(color='blue').encode(
+            y=alt.Y('humidity:Q', title='Humidity (%)', scale=alt.Scale(domain=[0, 100])),
+            tooltip=['timestamp:T', 'humidity:Q']
+        ).properties(
+            height=250,
+            title=f'Hourly Humidity on {selected_date}'
+        )
+
+        wind_detail_chart = detail_base.mark_line(color='green').encode(
+            y=alt.Y('wind_speed:Q', title='Wind Speed (m/s)'),
+            tooltip=['timestamp:T', 'wind_speed:Q', 'wind_direction:Q']
+        ).properties(
+            height=250,
+            title=f'Hourly Wind Speed on {selected_date}'
+        )
+
+        st.altair_chart(concat_rows([[hourly_detail_chart], [humidity_detail_chart, wind_detail_chart]]))
 
     st.header("Detailed Data")
     
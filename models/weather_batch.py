@@ -0,0 +1,157 @@
+from dataclasses import fields
+from datetime import date
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from models.weather_data import WeatherData
+
+FIELDS = tuple(field.name for field in fields(WeatherData))
+TEXT_FIELDS = ('city_name', 'country', 'weather_condition', 'weather_description')
+OPTIONAL_FIELDS = ('rain_1h', 'snow_1h')
+TIMESTAMP_DTYPE = 'datetime64[us]'
+
+class WeatherBatch:
+    """Column-oriented batch of weather records, one numpy array per WeatherData field.
+
+    Measurements are float64 (NaN where rain_1h/snow_1h are missing), text is an object array
+    of shared strings and timestamps are datetime64[us]. Rows are only materialized, as SQL
+    parameters or WeatherData records, when a caller asks for them.
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    @staticmethod
+    def _column(name: str, values: Any, length: int) -> np.ndarray:
+        if name in TEXT_FIELDS:
+            dtype = object
+        elif name == 'timestamp':
+            dtype = TIMESTAMP_DTYPE
+        else:
+            dtype = np.float64
+
+        if values is None or isinstance(values, str) or np.ndim(values) == 0:
+            column = np.empty(length, dtype=dtype)
+            column[:] = np.nan if values is None and dtype is np.float64 else values
+
+            return column
+
+        if isinstance(values, pd.Series):
+            values = values.to_numpy()
+
+        return np.asarray(values, dtype=dtype)
+
+    @classmethod
+    def from_columns(cls, length: int, **columns: Any) -> 'WeatherBatch':
+        """Build a batch from sequences or scalars (broadcast to `length`), e.g. a constant city_name."""
+
+        missing = [name for name in FIELDS if name not in columns and name not in OPTIONAL_FIELDS]
+
+        if missing:
+            raise ValueError(f"Missing columns for WeatherBatch: {', '.join(missing)}")
+
+        return cls({name: cls._column(name, columns.get(name), length) for name in FIELDS})
+
+    @classmethod
+    def empty(cls) -> 'WeatherBatch':
+
+        return cls.from_columns(0, **{name: [] for name in FIELDS})
+
+    @classmethod
+    def from_records(cls, records: Iterable[WeatherData]) -> 'WeatherBatch':
+        records = list(records)
+
+        return cls.from_columns(
+            len(records),
+            **{name: [getattr(record, name) for record in records] for name in FIELDS}
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'WeatherBatch':
+
+        return cls.from_columns(len(df), **{name: df[name] for name in FIELDS if name in df.columns})
+
+    @classmethod
+    def coerce(cls, data: Union['WeatherBatch', Iterable[WeatherData]]) -> 'WeatherBatch':
+
+        return data if isinstance(data, WeatherBatch) else cls.from_records(data)
+
+    @classmethod
+    def concat(cls, batches: Iterable['WeatherBatch']) -> 'WeatherBatch':
+        batches = [batch for batch in batches if len(batch)]
+
+        if not batches:
+
+            return cls.empty()
+
+        return cls({name: np.concatenate([batch.columns[name] for batch in batches]) for name in FIELDS})
+
+    def __len__(self) -> int:
+
+        return len(self.columns['timestamp'])
+
+    def __getitem__(self, index: Union[slice, np.ndarray]) -> 'WeatherBatch':
+
+        return WeatherBatch({name: column[index] for name, column in self.columns.items()})
+
+    def _python_columns(self) -> List[list]:
+        values = []
+
+        for name in FIELDS:
+            column = self.columns[name]
+
+            if name in OPTIONAL_FIELDS:
+                column = np.where(np.isnan(column), None, column)
+
+            values.append(column.tolist())
+
+        return values
+
+    def __iter__(self) -> Iterator[WeatherData]:
+
+        return (WeatherData(*row) for row in zip(*self._python_columns()))
+
+    def to_tuples(self) -> List[Tuple]:
+        """Rows as tuples in FIELDS order, with None for missing values."""
+
+        return list(zip(*self._python_columns()))
+
+    def to_params(self) -> List[Dict[str, Any]]:
+        """Rows as SQL parameter dicts keyed by column name."""
+
+        return [dict(zip(FIELDS, row)) for row in zip(*self._python_columns())]
+
+    def to_dataframe(self) -> pd.DataFrame:
+
+        return pd.DataFrame(self.columns, columns=list(FIELDS))
+
+    def deduplicated(self) -> 'WeatherBatch':
+        """Keep the last record for each (city_name, timestamp)."""
+
+        keys = pd.DataFrame({'city_name': self.columns['city_name'], 'timestamp': self.columns['timestamp']})
+        duplicated = keys.duplicated(keep='last').to_numpy()
+
+        return self[~duplicated] if duplicated.any() else self
+
+    def city_days(self) -> Dict[str, List[date]]:
+        """Distinct calendar days per city, sorted."""
+
+        days = pd.DataFrame({
+            'city_name': self.columns['city_name'],
+            'day': self.columns['timestamp'].astype('datetime64[D]')
+        }).drop_duplicates().sort_values(['city_name', 'day'])
+
+        return {
+            city_name: group['day'].dt.date.tolist()
+            for city_name, group in days.groupby('city_name', sort=False)
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays (shared strings are not counted)."""
+
+        return sum(column.nbytes for column in self.columns.values())
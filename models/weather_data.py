@@ -1,9 +1,9 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from datetime import datetime
 from typing import Optional, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class WeatherData:
     city_name: str
     country: str
@@ -25,7 +25,7 @@ class WeatherData:
             self.timestamp = datetime.now()
         
     def to_dict(self) -> Dict[str, Any]:
-        data_dict = asdict(self)
+        data_dict = {field.name: getattr(self, field.name) for field in fields(self)}
 
         if isinstance(data_dict['timestamp'], datetime):
             data_dict['timestamp'] = data_dict['timestamp'].isoformat()
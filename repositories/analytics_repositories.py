@@ -0,0 +1,246 @@
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from config.config import ANALYTICS_ENGINE, DUCKDB_MEMORY_LIMIT, DUCKDB_TEMP_DIRECTORY
+from repositories.archive_repositories import ARCHIVE_SCHEMA, ArchiveRepository
+from repositories.weather_repositories import WeatherRepository
+from utils.metrics import REPOSITORY_SECONDS, timed
+
+STATISTICS_COLUMNS = ['temperature', 'humidity', 'pressure']
+
+class AnalyticsRepository:
+    """Queries over the Parquet archive that stream instead of loading the range into memory.
+
+    Partitions outside the requested cities and months are pruned on their paths, only the
+    columns a query needs are read, and the timestamp predicate is pushed down to the row
+    groups. DuckDB runs the queries when it is installed (spilling to disk past
+    DUCKDB_MEMORY_LIMIT); otherwise pyarrow datasets scan the files batch by batch.
+    """
+
+    @staticmethod
+    def engine() -> str:
+        engine = ANALYTICS_ENGINE.lower()
+
+        if engine == 'auto':
+
+            return 'duckdb' if duckdb is not None else 'pyarrow'
+
+        if engine == 'duckdb' and duckdb is None:
+            raise RuntimeError("ANALYTICS_ENGINE is duckdb but the duckdb package is not installed")
+
+        if engine not in ('duckdb', 'pyarrow'):
+            raise ValueError(f"Unknown analytics engine {ANALYTICS_ENGINE}, expected auto, duckdb or pyarrow")
+
+        return engine
+
+    @staticmethod
+    def _duckdb_connection():
+        connection = duckdb.connect()
+        os.makedirs(DUCKDB_TEMP_DIRECTORY, exist_ok=True)
+        connection.execute(f"SET memory_limit = '{DUCKDB_MEMORY_LIMIT}'")
+        connection.execute(f"SET temp_directory = '{DUCKDB_TEMP_DIRECTORY}'")
+
+        return connection
+
+    @staticmethod
+    def _duckdb_source(files: List[str]) -> str:
+        paths = ", ".join("'" + path.replace("'", "''") + "'" for path in files)
+
+        return f"read_parquet([{paths}])"
+
+    @staticmethod
+    def _scanner(files: List[str], columns: List[str], start_date: datetime, end_date: datetime) -> ds.Scanner:
+
+        return ds.dataset(files, schema=ARCHIVE_SCHEMA, format='parquet').scanner(
+            columns=columns,
+            filter=(ds.field('timestamp') >= pa.scalar(start_date, pa.timestamp('us')))
+            & (ds.field('timestamp') <= pa.scalar(end_date, pa.timestamp('us')))
+        )
+
+    @staticmethod
+    def iter_weather_dataframes(
+        city_names: Union[str, List[str]],
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Archived rows of the range as DataFrames, one Parquet record batch at a time."""
+
+        files = ArchiveRepository.list_files(city_names, start_date, end_date)
+
+        if not files:
+
+            return
+
+        for batch in AnalyticsRepository._scanner(files, columns or ARCHIVE_SCHEMA.names, start_date, end_date).to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_weather_statistics(city_name: str, start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
+        """Same result as WeatherRepository.get_weather_statistics, computed over the archive."""
+
+        files = ArchiveRepository.list_files(city_name, start_date, end_date)
+
+        if not files:
+
+            return None
+
+        if AnalyticsRepository.engine() == 'duckdb':
+            aggregates, conditions = AnalyticsRepository._duckdb_statistics(files, start_date, end_date)
+        else:
+            aggregates, conditions = AnalyticsRepository._pyarrow_statistics(files, start_date, end_date)
+
+        data_points = aggregates['data_points']
+
+        if not data_points:
+
+            return None
+
+        averages = {name: aggregates[f'{name}_sum'] / data_points for name in STATISTICS_COLUMNS}
+
+        return {
+            'data_points': data_points,
+            'temperature': {
+                'min': aggregates['temperature_min'],
+                'max': aggregates['temperature_max'],
+                'avg': averages['temperature'],
+                'std': WeatherRepository.sample_std(data_points, averages['temperature'], aggregates['temperature_sum_sq'])
+            },
+            'humidity': {
+                'min': aggregates['humidity_min'],
+                'max': aggregates['humidity_max'],
+                'avg': averages['humidity']
+            },
+            'pressure': {
+                'min': aggregates['pressure_min'],
+                'max': aggregates['pressure_max'],
+                'avg': averages['pressure']
+            },
+            'weather_conditions': dict(sorted(conditions.items(), key=lambda item: item[1], reverse=True))
+        }
+
+    @staticmethod
+    def _duckdb_statistics(files: List[str], start_date: datetime, end_date: datetime) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        select_list = ", ".join(
+            f"min({name}), max({name}), sum({name})" for name in STATISTICS_COLUMNS
+        )
+        where = "timestamp BETWEEN ? AND ?"
+        connection = AnalyticsRepository._duckdb_connection()
+
+        try:
+            row = connection.execute(
+                f"SELECT count(*), sum(temperature * temperature), {select_list} "
+                f"FROM {AnalyticsRepository._duckdb_source(files)} WHERE {where}",
+                [start_date, end_date]
+            ).fetchone()
+            conditions = connection.execute(
+                f"SELECT weather_condition, count(*) FROM {AnalyticsRepository._duckdb_source(files)} "
+                f"WHERE {where} GROUP BY weather_condition",
+                [start_date, end_date]
+            ).fetchall()
+        finally:
+            connection.close()
+
+        aggregates = {'data_points': row[0], 'temperature_sum_sq': row[1]}
+
+        for index, name in enumerate(STATISTICS_COLUMNS):
+            aggregates[f'{name}_min'], aggregates[f'{name}_max'], aggregates[f'{name}_sum'] = row[2 + 3 * index:5 + 3 * index]
+
+        return aggregates, dict(conditions)
+
+    @staticmethod
+    def _pyarrow_statistics(files: List[str], start_date: datetime, end_date: datetime) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        aggregates = {'data_points': 0, 'temperature_sum_sq': 0.0}
+        conditions: Dict[str, int] = {}
+        scanner = AnalyticsRepository._scanner(files, [*STATISTICS_COLUMNS, 'weather_condition'], start_date, end_date)
+
+        for batch in scanner.to_batches():
+            if not batch.num_rows:
+                continue
+
+            aggregates['data_points'] += batch.num_rows
+            temperature = batch.column('temperature')
+            aggregates['temperature_sum_sq'] += pc.sum(pc.multiply(temperature, temperature)).as_py()
+
+            for name in STATISTICS_COLUMNS:
+                column = batch.column(name)
+                bounds = pc.min_max(column).as_py()
+                current_min = aggregates.get(f'{name}_min')
+                current_max = aggregates.get(f'{name}_max')
+                aggregates[f'{name}_min'] = bounds['min'] if current_min is None else min(current_min, bounds['min'])
+                aggregates[f'{name}_max'] = bounds['max'] if current_max is None else max(current_max, bounds['max'])
+                aggregates[f'{name}_sum'] = aggregates.get(f'{name}_sum', 0) + pc.sum(column).as_py()
+
+            for entry in pc.value_counts(batch.column('weather_condition')).to_pylist():
+                conditions[entry['values']] = conditions.get(entry['values'], 0) + entry['counts']
+
+        return aggregates, conditions
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_daily_temperature(city_name: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """Daily average temperature over the archive, shaped like RollupRepository.get_daily_temperature."""
+
+        files = ArchiveRepository.list_files(city_name, start_date, end_date)
+        columns = ['date', 'temperature', 'sample_count']
+
+        if not files:
+
+            return pd.DataFrame(columns=columns)
+
+        if AnalyticsRepository.engine() == 'duckdb':
+            connection = AnalyticsRepository._duckdb_connection()
+
+            try:
+                rows = connection.execute(
+                    f"SELECT CAST(timestamp AS DATE) AS day, avg(temperature), count(*) "
+                    f"FROM {AnalyticsRepository._duckdb_source(files)} WHERE timestamp BETWEEN ? AND ? "
+                    f"GROUP BY day ORDER BY day",
+                    [start_date, end_date]
+                ).fetchall()
+            finally:
+                connection.close()
+
+            return pd.DataFrame(rows, columns=columns)
+
+        # Per-batch sums and counts are merged by day, so memory grows with the days, not the rows.
+        daily = None
+        scanner = AnalyticsRepository._scanner(files, ['timestamp', 'temperature'], start_date, end_date)
+
+        for batch in scanner.to_batches():
+            if not batch.num_rows:
+                continue
+
+            partial = pa.table({
+                'date': pc.cast(batch.column('timestamp'), pa.date32()),
+                'temperature': batch.column('temperature')
+            }).group_by('date').aggregate(
+                [('temperature', 'sum'), ('temperature', 'count')]
+            ).to_pandas().set_index('date')
+
+            daily = partial if daily is None else daily.add(partial, fill_value=0)
+
+        if daily is None:
+
+            return pd.DataFrame(columns=columns)
+
+        daily = daily.sort_index()
+
+        return pd.DataFrame({
+            'date': daily.index,
+            'temperature': daily['temperature_sum'] / daily['temperature_count'],
+            'sample_count': daily['temperature_count'].astype(int)
+        }).reset_index(drop=True)
@@ -0,0 +1,114 @@
+import os
+from datetime import date, datetime, timedelta
+from typing import List, Tuple, Union
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config.config import ARCHIVE_PATH
+from repositories.weather_repositories import WeatherRepository, WEATHER_COLUMNS
+from utils.metrics import REPOSITORY_SECONDS, timed
+
+# Fixed schema so every month file has the same column types, whatever pandas inferred for it.
+ARCHIVE_SCHEMA = pa.schema([
+    ('city_name', pa.string()),
+    ('country', pa.string()),
+    ('temperature', pa.float64()),
+    ('feels_like', pa.float64()),
+    ('humidity', pa.float64()),
+    ('pressure', pa.float64()),
+    ('wind_speed', pa.float64()),
+    ('wind_direction', pa.float64()),
+    ('weather_condition', pa.string()),
+    ('weather_description', pa.string()),
+    ('clouds', pa.float64()),
+    ('rain_1h', pa.float64()),
+    ('snow_1h', pa.float64()),
+    ('timestamp', pa.timestamp('us'))
+])
+ARCHIVE_FILE_NAME = 'data.parquet'
+
+class ArchiveRepository:
+    """Parquet files partitioned as ARCHIVE_PATH/city=<city>/month=<YYYY-MM>/data.parquet.
+
+    Each file holds one city-month sorted by timestamp, so the row group statistics let a
+    reader skip everything outside the requested range.
+    """
+
+    @staticmethod
+    def city_path(city_name: str, root: str = ARCHIVE_PATH) -> str:
+
+        return os.path.join(root, f"city={quote(city_name, safe='')}")
+
+    @staticmethod
+    def month_path(city_name: str, month: date, root: str = ARCHIVE_PATH) -> str:
+
+        return os.path.join(ArchiveRepository.city_path(city_name, root), f"month={month:%Y-%m}", ARCHIVE_FILE_NAME)
+
+    @staticmethod
+    def month_bounds(month: date) -> Tuple[datetime, datetime]:
+        start = datetime(month.year, month.month, 1)
+
+        return start, (start + timedelta(days=32)).replace(day=1)
+
+    @staticmethod
+    def list_files(city_names: Union[str, List[str]], start_date: datetime, end_date: datetime, root: str = ARCHIVE_PATH) -> List[str]:
+        """Month files of the cities overlapping [start_date, end_date]: partition pruning done on the paths."""
+
+        city_names = [city_names] if isinstance(city_names, str) else list(city_names)
+        first, last = f"month={start_date:%Y-%m}", f"month={end_date:%Y-%m}"
+        files = []
+
+        for city_name in city_names:
+            city_path = ArchiveRepository.city_path(city_name, root)
+
+            if not os.path.isdir(city_path):
+                continue
+
+            for partition in sorted(os.listdir(city_path)):
+                path = os.path.join(city_path, partition, ARCHIVE_FILE_NAME)
+
+                if first <= partition <= last and os.path.exists(path):
+                    files.append(path)
+
+        return files
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def archive_month(city_name: str, month: date, root: str = ARCHIVE_PATH) -> int:
+        """Merge the city's stored rows for the month into its Parquet file; returns the rows in the file.
+
+        Rows already archived are kept (retention may have deleted them from the database since)
+        and rows still in the database replace archived rows with the same timestamp. The file
+        is replaced atomically, so readers never see a partial month.
+        """
+
+        start, end = ArchiveRepository.month_bounds(month)
+        path = ArchiveRepository.month_path(city_name, start, root)
+        frames = list(WeatherRepository.iter_weather_dataframes(
+            city_name, start, end - timedelta(microseconds=1), columns=WEATHER_COLUMNS
+        ))
+
+        if not frames:
+
+            return pq.ParquetFile(path).metadata.num_rows if os.path.exists(path) else 0
+
+        if os.path.exists(path):
+            frames.insert(0, pq.read_table(path).to_pandas(coerce_temporal_nanoseconds=True))
+
+        df = pd.concat(frames, ignore_index=True).drop_duplicates(
+            'timestamp', keep='last'
+        ).sort_values('timestamp')
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        pq.write_table(
+            pa.Table.from_pandas(df, schema=ARCHIVE_SCHEMA, preserve_index=False),
+            temporary_path,
+            compression='zstd'
+        )
+        os.replace(temporary_path, path)
+
+        return len(df)
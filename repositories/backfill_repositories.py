@@ -0,0 +1,54 @@
+from datetime import datetime, date
+from typing import Set, Tuple
+
+from sqlalchemy import select
+
+from database.database import BackfillCheckpointTable, get_read_session, get_session, upsert_rows
+from utils.metrics import REPOSITORY_SECONDS, timed
+
+class BackfillRepository:
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_completed_windows(city_name: str) -> Set[Tuple[date, date]]:
+        session = get_read_session()
+
+        try:
+            results = session.execute(
+                select(
+                    BackfillCheckpointTable.window_start,
+                    BackfillCheckpointTable.window_end
+                ).where(
+                    BackfillCheckpointTable.city_name == city_name
+                )
+            ).all()
+
+            return {(window_start, window_end) for window_start, window_end in results}
+        finally:
+            session.close()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def mark_window_completed(city_name: str, window_start: date, window_end: date, records: int) -> None:
+        session = get_session()
+
+        try:
+            upsert_rows(
+                session.connection(),
+                BackfillCheckpointTable.__table__,
+                [{
+                    'city_name': city_name,
+                    'window_start': window_start,
+                    'window_end': window_end,
+                    'records': records,
+                    'completed_at': datetime.now()
+                }],
+                ['city_name', 'window_start', 'window_end'],
+                ['records', 'completed_at']
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from sqlalchemy import insert, select, update
+
+from database.database import ON_CONFLICT_DIALECTS, DataGenerationTable, dialect_insert, get_read_session, get_session
+from utils.metrics import REPOSITORY_SECONDS, timed
+
+GENERATION_ROW_ID = 1
+
+class DataGenerationRepository:
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_generation() -> int:
+        session = get_read_session()
+
+        try:
+            generation = session.execute(
+                select(DataGenerationTable.generation).where(DataGenerationTable.id == GENERATION_ROW_ID)
+            ).scalar()
+
+            return generation or 0
+        finally:
+            session.close()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def bump_generation() -> None:
+        """Increment the counter; inside session_scope() it commits together with the data it announces."""
+
+        session = get_session()
+
+        try:
+            table = DataGenerationTable.__table__
+            dialect_name = session.get_bind().dialect.name
+            row = {'id': GENERATION_ROW_ID, 'generation': 1, 'updated_at': datetime.now()}
+
+            if dialect_name in ON_CONFLICT_DIALECTS:
+                statement = dialect_insert(table, dialect_name)
+                statement = statement.on_conflict_do_update(
+                    index_elements=['id'],
+                    set_={
+                        'generation': table.c.generation + 1,
+                        'updated_at': statement.excluded.updated_at
+                    }
+                )
+
+                session.execute(statement, row)
+            else:
+                result = session.execute(
+                    update(table).where(table.c.id == GENERATION_ROW_ID).values(
+                        generation=table.c.generation + 1,
+                        updated_at=row['updated_at']
+                    )
+                )
+
+                if not result.rowcount:
+                    session.execute(insert(table).values(row))
+
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -0,0 +1,211 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import Select, delete, func, select
+
+from database.database import (
+    WeatherDataTable,
+    WeatherHourlyRollupTable,
+    WeatherDailyRollupTable,
+    WeatherHourlyConditionRollupTable,
+    get_read_session,
+    get_session,
+    upsert_rows
+)
+from repositories.rollup_repositories import ROLLUP_KEY_COLUMNS, RollupRepository
+from utils.metrics import REPOSITORY_SECONDS, timed
+
+class RetentionRepository:
+    """Deletes aged rows one (city, time range) batch at a time; every lookup is served by the
+    (city_name, timestamp) index or the (city_name, bucket_start) primary keys."""
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_aged_cities(column, cutoff: datetime) -> List[Tuple[str, datetime]]:
+        """(city_name, oldest value of `column`) for every city with rows before the cutoff.
+
+        `column` is WeatherDataTable.timestamp or the bucket_start of a rollup table.
+        """
+
+        table = column.class_
+        session = get_read_session()
+
+        try:
+
+            return [
+                (city_name, first)
+                for city_name, first in session.execute(
+                    select(table.city_name, func.min(column)).where(column < cutoff).group_by(table.city_name)
+                ).all()
+            ]
+        finally:
+            session.close()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_next_time(column, city_name: str, start: datetime, cutoff: datetime) -> Optional[datetime]:
+        """Oldest value of `column` for the city in [start, cutoff), used to skip gaps in the history."""
+
+        table = column.class_
+        session = get_read_session()
+
+        try:
+
+            return session.execute(
+                select(func.min(column)).where(
+                    table.city_name == city_name,
+                    column >= start,
+                    column < cutoff
+                )
+            ).scalar()
+        finally:
+            session.close()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def delete_raw(city_name: str, start: datetime, end: datetime) -> int:
+        session = get_session()
+
+        try:
+            result = session.execute(
+                delete(WeatherDataTable.__table__).where(
+                    WeatherDataTable.city_name == city_name,
+                    WeatherDataTable.timestamp >= start,
+                    WeatherDataTable.timestamp < end
+                )
+            )
+            session.commit()
+
+            return result.rowcount
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def range_filter(table, city_name: str, start: datetime, end: datetime) -> tuple:
+
+        return (
+            table.city_name == city_name,
+            table.bucket_start >= start,
+            table.bucket_start < end
+        )
+
+    @staticmethod
+    def range_query(table, city_name: str, start: datetime, end: datetime) -> Select:
+
+        return select(table.__table__).where(*RetentionRepository.range_filter(table, city_name, start, end))
+
+    @staticmethod
+    def daily_from_hourly(hourly: pd.DataFrame, conditions: pd.DataFrame) -> pd.DataFrame:
+        """Combine hourly rollups into daily ones, as RollupRepository.aggregate would from the raw rows."""
+
+        hourly = hourly.assign(bucket_start=pd.to_datetime(hourly['bucket_start']).dt.floor('D'))
+
+        daily = hourly.groupby(ROLLUP_KEY_COLUMNS).agg(
+            sample_count=('sample_count', 'sum'),
+            temperature_min=('temperature_min', 'min'),
+            temperature_max=('temperature_max', 'max'),
+            temperature_sum=('temperature_sum', 'sum'),
+            temperature_sum_sq=('temperature_sum_sq', 'sum'),
+            humidity_min=('humidity_min', 'min'),
+            humidity_max=('humidity_max', 'max'),
+            humidity_sum=('humidity_sum', 'sum'),
+            pressure_min=('pressure_min', 'min'),
+            pressure_max=('pressure_max', 'max'),
+            pressure_sum=('pressure_sum', 'sum'),
+            precipitation_total=('precipitation_total', 'sum')
+        )
+
+        conditions = conditions.assign(bucket_start=pd.to_datetime(conditions['bucket_start']).dt.floor('D'))
+        counts = conditions.groupby(
+            [*ROLLUP_KEY_COLUMNS, 'weather_condition']
+        )['sample_count'].sum().reset_index()
+
+        # Days without condition counts fall back to the hourly dominant conditions.
+        fallback = hourly.groupby(
+            [*ROLLUP_KEY_COLUMNS, 'dominant_condition']
+        )['sample_count'].sum().reset_index().rename(columns={'dominant_condition': 'weather_condition'})
+
+        daily['dominant_condition'] = RollupRepository.dominant_conditions(counts).combine_first(
+            RollupRepository.dominant_conditions(fallback)
+        )
+
+        return daily.reset_index()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def fold_hourly_into_daily(city_name: str, start: datetime, end: datetime) -> int:
+        """Create the daily rollups missing for hourly buckets in [start, end); existing days are left as they are."""
+
+        session = get_session()
+
+        try:
+            connection = session.connection()
+            hourly = pd.DataFrame(
+                connection.execute(
+                    RetentionRepository.range_query(WeatherHourlyRollupTable, city_name, start, end)
+                ).mappings().all()
+            )
+
+            if hourly.empty:
+
+                return 0
+
+            conditions = pd.DataFrame(
+                connection.execute(
+                    RetentionRepository.range_query(WeatherHourlyConditionRollupTable, city_name, start, end)
+                ).mappings().all(),
+                columns=[column.name for column in WeatherHourlyConditionRollupTable.__table__.columns]
+            )
+            existing = set(connection.execute(
+                select(WeatherDailyRollupTable.bucket_start).where(
+                    *RetentionRepository.range_filter(WeatherDailyRollupTable, city_name, start, end)
+                )
+            ).scalars())
+
+            daily = RetentionRepository.daily_from_hourly(hourly, conditions)
+            missing = daily[~daily['bucket_start'].isin(pd.to_datetime(list(existing)))]
+
+            if missing.empty:
+
+                return 0
+
+            upsert_rows(connection, WeatherDailyRollupTable.__table__, missing.to_dict('records'), ROLLUP_KEY_COLUMNS, [])
+            session.commit()
+
+            return len(missing)
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def delete_hourly(city_name: str, start: datetime, end: datetime) -> int:
+        """Delete the hourly rollups and their condition counts in [start, end); returns the hourly rows removed."""
+
+        session = get_session()
+
+        try:
+            session.execute(
+                delete(WeatherHourlyConditionRollupTable.__table__).where(
+                    *RetentionRepository.range_filter(WeatherHourlyConditionRollupTable, city_name, start, end)
+                )
+            )
+            result = session.execute(
+                delete(WeatherHourlyRollupTable.__table__).where(
+                    *RetentionRepository.range_filter(WeatherHourlyRollupTable, city_name, start, end)
+                )
+            )
+            session.commit()
+
+            return result.rowcount
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -0,0 +1,538 @@
+from datetime import datetime, date, time, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import pandas as pd
+from sqlalchemy import Select, Table, delete, func, select
+
+from database.database import (
+    WeatherDataTable,
+    WeatherHourlyRollupTable,
+    WeatherDailyRollupTable,
+    WeatherHourlyConditionRollupTable,
+    get_read_session,
+    get_session,
+    upsert_rows
+)
+from models.weather_batch import WeatherBatch
+from models.weather_data import WeatherData
+from repositories.weather_repositories import WeatherRepository
+from utils.metrics import REPOSITORY_SECONDS, timed
+
+ROLLUP_SOURCE_COLUMNS = ['city_name', 'timestamp', 'temperature', 'humidity', 'pressure', 'rain_1h', 'weather_condition']
+ROLLUP_KEY_COLUMNS = ['city_name', 'bucket_start']
+CONDITION_DELETE_CHUNK = 500
+DAILY_TEMPERATURE_COLUMNS = ['date', 'temperature', 'sample_count']
+
+class RollupRepository:
+
+    @staticmethod
+    def aggregate(df: pd.DataFrame, freq: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Roll raw rows up into per-city `freq` buckets, returning the bucket aggregates and per-bucket condition counts."""
+
+        source = pd.DataFrame({
+            'city_name': df['city_name'],
+            'bucket_start': df['timestamp'].dt.floor(freq),
+            'temperature': df['temperature'],
+            'temperature_sq': df['temperature'] ** 2,
+            'humidity': df['humidity'],
+            'pressure': df['pressure'],
+            'precipitation': df['rain_1h'].fillna(0.0),
+            'weather_condition': df['weather_condition']
+        })
+
+        rollups = source.groupby(ROLLUP_KEY_COLUMNS).agg(
+            sample_count=('temperature', 'size'),
+            temperature_min=('temperature', 'min'),
+            temperature_max=('temperature', 'max'),
+            temperature_sum=('temperature', 'sum'),
+            temperature_sum_sq=('temperature_sq', 'sum'),
+            humidity_min=('humidity', 'min'),
+            humidity_max=('humidity', 'max'),
+            humidity_sum=('humidity', 'sum'),
+            pressure_min=('pressure', 'min'),
+            pressure_max=('pressure', 'max'),
+            pressure_sum=('pressure', 'sum'),
+            precipitation_total=('precipitation', 'sum')
+        )
+
+        conditions = source.groupby(
+            [*ROLLUP_KEY_COLUMNS, 'weather_condition']
+        ).size().rename('sample_count').reset_index()
+
+        rollups['dominant_condition'] = RollupRepository.dominant_conditions(conditions)
+
+        return rollups.reset_index(), conditions
+
+    @staticmethod
+    def dominant_conditions(conditions: pd.DataFrame) -> pd.Series:
+        """Most frequent condition per (city_name, bucket_start); ties go to the alphabetically first."""
+
+        return conditions.sort_values(
+            [*ROLLUP_KEY_COLUMNS, 'sample_count', 'weather_condition'],
+            ascending=[True, True, False, True]
+        ).drop_duplicates(ROLLUP_KEY_COLUMNS).set_index(ROLLUP_KEY_COLUMNS)['weather_condition']
+
+    @staticmethod
+    def _upsert(connection, table: Table, frame: pd.DataFrame) -> None:
+        upsert_rows(connection, table, frame.to_dict('records'), ROLLUP_KEY_COLUMNS)
+
+    @staticmethod
+    def _replace_conditions(connection, conditions: pd.DataFrame) -> None:
+        table = WeatherHourlyConditionRollupTable.__table__
+
+        # Only the recomputed buckets are cleared, so buckets whose raw rows were already
+        # removed by retention keep their counts.
+        for city_name, city_conditions in conditions.groupby('city_name'):
+            buckets = [bucket.to_pydatetime() for bucket in city_conditions['bucket_start'].unique()]
+
+            for start in range(0, len(buckets), CONDITION_DELETE_CHUNK):
+                connection.execute(
+                    delete(table).where(
+                        table.c.city_name == city_name,
+                        table.c.bucket_start.in_(buckets[start:start + CONDITION_DELETE_CHUNK])
+                    )
+                )
+
+        connection.execute(table.insert(), conditions.to_dict('records'))
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def refresh_rollups(city_names: Union[str, List[str]], start_date: date, end_date: date) -> int:
+        """Recompute the hourly and daily rollups of every day in [start_date, end_date] from raw rows.
+
+        Several cities sharing the same days are recomputed with one query and one groupby.
+        """
+
+        session = get_session()
+
+        try:
+            connection = session.connection()
+            df = WeatherRepository.read_dataframe(
+                connection,
+                WeatherRepository.columns_query(
+                    city_names,
+                    datetime.combine(start_date, time.min),
+                    datetime.combine(end_date, time.max),
+                    ROLLUP_SOURCE_COLUMNS
+                )
+            )
+
+            if df.empty:
+
+                return 0
+
+            hourly, hourly_conditions = RollupRepository.aggregate(df, 'h')
+            daily, _ = RollupRepository.aggregate(df, 'D')
+
+            RollupRepository._upsert(connection, WeatherHourlyRollupTable.__table__, hourly)
+            RollupRepository._upsert(connection, WeatherDailyRollupTable.__table__, daily)
+            RollupRepository._replace_conditions(connection, hourly_conditions)
+
+            session.commit()
+
+            return len(daily)
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def affected_day_ranges(weather_batch: Union[WeatherBatch, List[WeatherData]]) -> Dict[str, List[Tuple[date, date]]]:
+        """Group the days touched by a batch into contiguous runs per city."""
+
+        ranges = {}
+
+        for city_name, days in WeatherBatch.coerce(weather_batch).city_days().items():
+            runs = []
+
+            for day in days:
+                if runs and day - runs[-1][1] <= timedelta(days=1):
+                    runs[-1][1] = day
+                else:
+                    runs.append([day, day])
+
+            ranges[city_name] = [(run_start, run_end) for run_start, run_end in runs]
+
+        return ranges
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def refresh_for_records(weather_batch: Union[WeatherBatch, List[WeatherData]]) -> int:
+        cities_by_range: Dict[Tuple[date, date], List[str]] = {}
+
+        for city_name, day_ranges in RollupRepository.affected_day_ranges(weather_batch).items():
+            for day_range in day_ranges:
+                cities_by_range.setdefault(day_range, []).append(city_name)
+
+        refreshed = 0
+
+        for (start_day, end_day), city_names in cities_by_range.items():
+            refreshed += RollupRepository.refresh_rollups(city_names, start_day, end_day)
+
+        return refreshed
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def rebuild_rollups(city_names: Optional[List[str]] = None, chunk_days: int = 31) -> int:
+        """Backfill the rollups from every raw row, chunk_days at a time per city."""
+
+        session = get_session()
+
+        try:
+            bounds = session.execute(
+                select(
+                    WeatherDataTable.city_name,
+                    func.min(WeatherDataTable.timestamp),
+                    func.max(WeatherDataTable.timestamp)
+                ).group_by(WeatherDataTable.city_name)
+            ).all()
+        finally:
+            session.close()
+
+        refreshed = 0
+
+        for city_name, first_timestamp, last_timestamp in bounds:
+            if city_names and city_name not in city_names:
+                continue
+
+            day = first_timestamp.date()
+
+            while day <= last_timestamp.date():
+                window_end = min(day + timedelta(days=chunk_days - 1), last_timestamp.date())
+                refreshed += RollupRepository.refresh_rollups(city_name, day, window_end)
+                day = window_end + timedelta(days=1)
+
+        return refreshed
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def oldest_raw_timestamp(city_name: str) -> Optional[datetime]:
+        """Oldest raw row of the city; retention has deleted the raw rows before it, if any."""
+
+        session = get_read_session()
+
+        try:
+
+            return session.execute(
+                select(func.min(WeatherDataTable.timestamp)).where(WeatherDataTable.city_name == city_name)
+            ).scalar()
+        finally:
+            session.close()
+
+    @staticmethod
+    def split_range(
+        start_date: datetime,
+        end_date: datetime,
+        freq: str,
+        raw_since: Optional[datetime]
+    ) -> Tuple[Optional[Tuple[datetime, datetime]], List[Tuple[datetime, datetime]]]:
+        """Split [start_date, end_date] into the `freq` ('h' or 'D') buckets to read from the rollups and the partial edges.
+
+        The buckets are returned as [first, last) bucket starts (None when there are none);
+        the edges as inclusive ranges to read from raw rows. An edge entirely before
+        raw_since has no raw rows left, so its whole bucket is read from the rollups instead.
+        """
+
+        step = timedelta(hours=1) if freq == 'h' else timedelta(days=1)
+        first = pd.Timestamp(start_date).ceil(freq).to_pydatetime()
+        last = pd.Timestamp(end_date).floor(freq).to_pydatetime()
+
+        def deleted(edge_end: datetime) -> bool:
+
+            return raw_since is None or edge_end < raw_since
+
+        # Both ends fall inside one bucket.
+        if first > last:
+
+            return ((last, first), []) if deleted(end_date) else (None, [(start_date, end_date)])
+
+        edges = []
+
+        if start_date < first:
+            if deleted(first - timedelta(microseconds=1)):
+                first -= step
+            else:
+                edges.append((start_date, first - timedelta(microseconds=1)))
+
+        if deleted(end_date):
+            last += step
+        else:
+            edges.append((last, end_date))
+
+        return ((first, last) if first < last else None), edges
+
+    @staticmethod
+    def raw_daily_temperature(city_name: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """Daily averages from raw rows, for partial days and data that has not been rolled up yet."""
+
+        df = WeatherRepository.get_weather_dataframe(
+            city_name, start_date, end_date, columns=['timestamp', 'temperature']
+        )
+
+        if df.empty:
+
+            return pd.DataFrame(columns=DAILY_TEMPERATURE_COLUMNS)
+
+        return df.groupby(df['timestamp'].dt.floor('D').rename('date'))['temperature'].agg(
+            temperature='mean',
+            sample_count='size'
+        ).reset_index()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_daily_temperature(city_name: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """Daily average temperature over exactly [start_date, end_date].
+
+        Whole days come from the daily rollups and the partial first and last days from raw
+        rows (or from their daily rollup once retention has deleted their raw rows). So do
+        whole days the rollups do not fully count yet (see missing_samples): per day,
+        whichever source counts more samples wins.
+        """
+
+        raw_since = RollupRepository.oldest_raw_timestamp(city_name)
+        whole_days, edges = RollupRepository.split_range(start_date, end_date, 'D', raw_since)
+        frames = [RollupRepository.raw_daily_temperature(city_name, edge_start, edge_end) for edge_start, edge_end in edges]
+
+        if whole_days:
+            first_day, last_day = whole_days
+            session = get_read_session()
+
+            try:
+                rows = session.execute(
+                    WeatherRepository.daily_avg_query(city_name, first_day, last_day)
+                ).all()
+            finally:
+                session.close()
+
+            frames.append(pd.DataFrame(rows, columns=DAILY_TEMPERATURE_COLUMNS))
+            last_whole = last_day - timedelta(microseconds=1)
+
+            if RollupRepository.missing_samples(city_name, first_day, last_whole):
+                frames.append(RollupRepository.raw_daily_temperature(city_name, first_day, last_whole))
+
+        frames = [frame for frame in frames if not frame.empty]
+
+        if not frames:
+
+            return pd.DataFrame(columns=DAILY_TEMPERATURE_COLUMNS)
+
+        daily = pd.concat(frames, ignore_index=True)
+        daily['date'] = pd.to_datetime(daily['date'])
+
+        # Days whose raw rows retention has deleted keep their rollup.
+        return daily.sort_values('sample_count').drop_duplicates(
+            'date', keep='last'
+        ).sort_values('date').reset_index(drop=True)
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def missing_samples(city_name: str, start_date: datetime, end_date: datetime) -> int:
+        """Raw rows in the range that the hourly rollups do not count yet.
+
+        Non-zero on a database upgraded from before the rollups until --rebuild-rollups has run.
+        Only the hours from the oldest raw row on are compared: retention deletes raw rows
+        after rolling them up, so earlier hours legitimately have rollups without raw rows.
+        """
+
+        table = WeatherHourlyRollupTable
+        session = get_read_session()
+
+        try:
+            first_timestamp = session.execute(
+                select(func.min(WeatherDataTable.timestamp)).where(
+                    WeatherDataTable.city_name == city_name,
+                    WeatherDataTable.timestamp >= start_date,
+                    WeatherDataTable.timestamp <= end_date
+                )
+            ).scalar()
+
+            if first_timestamp is None:
+
+                return 0
+
+            # Both counts cover the same whole hours.
+            window_start = first_timestamp.replace(minute=0, second=0, microsecond=0)
+            window_end = end_date.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+            raw_count = session.execute(
+                select(func.count()).select_from(WeatherDataTable).where(
+                    WeatherDataTable.city_name == city_name,
+                    WeatherDataTable.timestamp >= window_start,
+                    WeatherDataTable.timestamp < window_end
+                )
+            ).scalar()
+            rolled_up = session.execute(
+                select(func.coalesce(func.sum(table.sample_count), 0)).where(
+                    table.city_name == city_name,
+                    table.bucket_start >= window_start,
+                    table.bucket_start < window_end
+                )
+            ).scalar()
+
+            return max(raw_count - rolled_up, 0)
+        finally:
+            session.close()
+
+    @staticmethod
+    def statistics_query(city_name: str, start_date: datetime, end_date: datetime) -> Select:
+        """Aggregates of the hourly buckets starting in [start_date, end_date); pass whole-hour bounds."""
+
+        table = WeatherHourlyRollupTable
+
+        return select(
+            func.sum(table.sample_count).label('data_points'),
+            func.min(table.temperature_min).label('temperature_min'),
+            func.max(table.temperature_max).label('temperature_max'),
+            func.sum(table.temperature_sum).label('temperature_sum'),
+            func.sum(table.temperature_sum_sq).label('temperature_sum_sq'),
+            func.min(table.humidity_min).label('humidity_min'),
+            func.max(table.humidity_max).label('humidity_max'),
+            func.sum(table.humidity_sum).label('humidity_sum'),
+            func.min(table.pressure_min).label('pressure_min'),
+            func.max(table.pressure_max).label('pressure_max'),
+            func.sum(table.pressure_sum).label('pressure_sum')
+        ).where(
+            table.city_name == city_name,
+            table.bucket_start >= start_date,
+            table.bucket_start < end_date
+        )
+
+    @staticmethod
+    def raw_statistics_query(city_name: str, start_date: datetime, end_date: datetime) -> Select:
+        """The aggregates of statistics_query over the raw rows in [start_date, end_date], for the partial edge hours."""
+
+        table = WeatherDataTable
+
+        return select(
+            func.count().label('data_points'),
+            func.min(table.temperature).label('temperature_min'),
+            func.max(table.temperature).label('temperature_max'),
+            func.sum(table.temperature).label('temperature_sum'),
+            func.sum(table.temperature * table.temperature).label('temperature_sum_sq'),
+            func.min(table.humidity).label('humidity_min'),
+            func.max(table.humidity).label('humidity_max'),
+            func.sum(table.humidity).label('humidity_sum'),
+            func.min(table.pressure).label('pressure_min'),
+            func.max(table.pressure).label('pressure_max'),
+            func.sum(table.pressure).label('pressure_sum')
+        ).where(
+            table.city_name == city_name,
+            table.timestamp >= start_date,
+            table.timestamp <= end_date
+        )
+
+    @staticmethod
+    def condition_counts_query(city_name: str, start_date: datetime, end_date: datetime) -> Select:
+        """Condition counts of the hourly buckets starting in [start_date, end_date); pass whole-hour bounds."""
+
+        table = WeatherHourlyConditionRollupTable
+
+        return select(
+            table.weather_condition,
+            func.sum(table.sample_count).label('count')
+        ).where(
+            table.city_name == city_name,
+            table.bucket_start >= start_date,
+            table.bucket_start < end_date
+        ).group_by(
+            table.weather_condition
+        ).order_by(
+            func.sum(table.sample_count).desc()
+        )
+
+    @staticmethod
+    def combine_aggregates(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge partial aggregates: minimum of the *_min columns, maximum of the *_max ones, sum of the rest."""
+
+        totals: Dict[str, Any] = {}
+
+        for row in rows:
+            if not row['data_points']:
+                continue
+
+            for name, value in row.items():
+                if name not in totals:
+                    totals[name] = value
+                elif name.endswith('_min'):
+                    totals[name] = min(totals[name], value)
+                elif name.endswith('_max'):
+                    totals[name] = max(totals[name], value)
+                else:
+                    totals[name] += value
+
+        return totals
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_weather_statistics(city_name: str, start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
+        """Same result as WeatherRepository.get_weather_statistics.
+
+        Whole hours inside the range are read from the hourly rollups and the partial hours
+        at either end from raw rows, so the bounds are as exact as on the raw path (edge hours
+        whose raw rows retention has deleted are read whole from the rollups). When the
+        rollups do not fully count the whole hours yet (see missing_samples), the whole range
+        is read from raw rows.
+        """
+
+        raw_since = RollupRepository.oldest_raw_timestamp(city_name)
+        whole_hours, edges = RollupRepository.split_range(start_date, end_date, 'h', raw_since)
+
+        if whole_hours and RollupRepository.missing_samples(city_name, whole_hours[0], whole_hours[1] - timedelta(microseconds=1)):
+            whole_hours, edges = None, [(start_date, end_date)]
+        session = get_read_session()
+
+        try:
+            partials = [
+                dict(session.execute(RollupRepository.raw_statistics_query(city_name, edge_start, edge_end)).one()._mapping)
+                for edge_start, edge_end in edges
+            ]
+            conditions: Dict[str, int] = {}
+
+            for edge_start, edge_end in edges:
+                for condition, count in session.execute(
+                    WeatherRepository.condition_counts_query(city_name, edge_start, edge_end)
+                ).all():
+                    conditions[condition] = conditions.get(condition, 0) + count
+
+            if whole_hours:
+                partials.append(dict(session.execute(
+                    RollupRepository.statistics_query(city_name, *whole_hours)
+                ).one()._mapping))
+
+                for condition, count in session.execute(
+                    RollupRepository.condition_counts_query(city_name, *whole_hours)
+                ).all():
+                    conditions[condition] = conditions.get(condition, 0) + count
+        finally:
+            session.close()
+
+        row = RollupRepository.combine_aggregates(partials)
+
+        if not row:
+
+            return None
+
+        data_points = row['data_points']
+        temperature_avg = row['temperature_sum'] / data_points
+
+        return {
+            'data_points': data_points,
+            'temperature': {
+                'min': row['temperature_min'],
+                'max': row['temperature_max'],
+                'avg': temperature_avg,
+                'std': WeatherRepository.sample_std(data_points, temperature_avg, row['temperature_sum_sq'])
+            },
+            'humidity': {
+                'min': row['humidity_min'],
+                'max': row['humidity_max'],
+                'avg': row['humidity_sum'] / data_points
+            },
+            'pressure': {
+                'min': row['pressure_min'],
+                'max': row['pressure_max'],
+                'avg': row['pressure_sum'] / data_points
+            },
+            'weather_conditions': dict(sorted(conditions.items(), key=lambda item: item[1], reverse=True))
+        }
@@ -1,54 +1,122 @@
+import math
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from sqlalchemy import func, desc
+from typing import List, Dict, Any, Iterator, Optional, Union
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, Select, String, cast, func, desc, select, type_coerce
 
-from database.database import WeatherDataTable, get_session
+from config.config import EXPORT_CHUNK_SIZE
+from database.database import WeatherDataTable, WeatherDailyRollupTable, get_read_session, get_session, upsert_rows
+from models.weather_batch import WeatherBatch
 from models.weather_data import WeatherData
+from utils.metrics import REPOSITORY_SECONDS, ROWS_SAVED, timed
+
+WEATHER_COLUMNS = [
+    'city_name', 'country', 'temperature', 'feels_like', 'humidity', 'pressure', 'wind_speed',
+    'wind_direction', 'weather_condition', 'weather_description', 'clouds', 'rain_1h', 'snow_1h', 'timestamp'
+]
+
+BUCKET_COLUMNS = ['temperature', 'humidity', 'pressure']
+# Chart bucket sizes in seconds: 5 min, 15 min, hour, 3 hours, 6 hours, day.
+BUCKET_SIZES = [300, 900, 3600, 10800, 21600, 86400]
 
 class WeatherRepository:
 
     @staticmethod
+    @timed(REPOSITORY_SECONDS)
     def save_weather_data(weather_data: WeatherData) -> int:
+
+        return WeatherRepository.upsert_weather_data(WeatherBatch.from_records([weather_data]))[0]
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def upsert_weather_data(weather_batch: Union[WeatherBatch, List[WeatherData]]) -> List[int]:
+        """Insert records or overwrite the stored row with the same (city_name, timestamp), in one transaction."""
+
+        weather_batch = WeatherBatch.coerce(weather_batch)
+
+        if not len(weather_batch):
+
+            return []
+
+        # One statement may not touch the same key twice, so the last record for a key wins.
+        rows = weather_batch.deduplicated().to_params()
+
         session = get_session()
 
         try:
-            db_weather_data = WeatherDataTable(
-                city_name = weather_data.city_name,
-                country = weather_data.country,
-                temperature = weather_data.temperature,
-                feels_like = weather_data.feels_like,
-                humidity = weather_data.humidity,
-                pressure = weather_data.pressure,
-                wind_speed = weather_data.wind_speed,
-                wind_direction = weather_data.wind_direction,
-                weather_condition = weather_data.weather_condition,
-                weather_description = weather_data.weather_description,
-                clouds = weather_data.clouds,
-                rain_1h = weather_data.rain_1h,
-                snow_1h = weather_data.snow_1h,
-                timestamp = weather_data.timestamp
+            record_ids = upsert_rows(
+                session.connection(),
+                WeatherDataTable.__table__,
+                rows,
+                ['city_name', 'timestamp'],
+                returning=WeatherDataTable.__table__.c.id
             )
-
-            session.add(db_weather_data)
             session.commit()
+            ROWS_SAVED.inc(len(record_ids))
 
-            return db_weather_data.id
+            return record_ids
         except Exception as e:
             session.rollback()
             raise
         finally:
             session.close()
 
+    # Statement builders are shared with benchmarks/check_query_plans.py, which asserts through
+    # EXPLAIN QUERY PLAN that they are served by an index.
+
+    @staticmethod
+    def latest_query(city_name: str) -> Select:
+
+        return select(WeatherDataTable).where(
+            WeatherDataTable.city_name == city_name
+        ).order_by(
+            desc(WeatherDataTable.timestamp)
+        ).limit(1)
+
     @staticmethod
+    def range_query(city_name: str, start_date: datetime, end_date: datetime) -> Select:
+
+        return select(WeatherDataTable).where(
+            WeatherDataTable.city_name == city_name,
+            WeatherDataTable.timestamp >= start_date,
+            WeatherDataTable.timestamp <= end_date
+        ).order_by(
+            WeatherDataTable.timestamp
+        )
+
+    @staticmethod
+    def daily_avg_query(city_name: str, start_date: datetime, end_date: datetime) -> Select:
+        """Daily rollups starting in [start_date, end_date); pass whole-day bounds."""
+
+        table = WeatherDailyRollupTable
+
+        return select(
+            table.bucket_start.label('date'),
+            (table.temperature_sum / table.sample_count).label('avg_temp'),
+            table.sample_count
+        ).where(
+            table.city_name == city_name,
+            table.bucket_start >= start_date,
+            table.bucket_start < end_date
+        ).order_by(
+            table.bucket_start
+        )
+
+    @staticmethod
+    def cities_query() -> Select:
+
+        return select(WeatherDataTable.city_name).distinct()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
     def get_latest_weather_data_by_city(city_name: str) -> Optional[Dict[str, Any]]:
-        session= get_session()
+        session = get_read_session()
 
         try:
-            result = session.query(WeatherDataTable).filter(
-                WeatherDataTable.city_name == city_name
-            ).order_by(
-                desc(WeatherDataTable.timestamp)
-            ).first()
+            result = session.execute(
+                WeatherRepository.latest_query(city_name)
+            ).scalars().first()
 
             if result:
                 
@@ -75,22 +143,19 @@ class WeatherRepository:
             session.close()
 
     @staticmethod
+    @timed(REPOSITORY_SECONDS)
     def get_weather_data_by_data_range(
         city_name: str,
         start_date: datetime,
         end_time: datetime
     ) -> List[Dict[str, Any]]:
         
-        session = get_session()
+        session = get_read_session()
 
         try:
-            results = session.query(WeatherDataTable).filter(
-                WeatherDataTable.city_name == city_name,
-                WeatherDataTable.timestamp >= start_date,
-                WeatherDataTable.timestamp <= end_time
-            ).order_by(
-                WeatherDataTable.timestamp
-            ).all()
+            results = session.execute(
+                WeatherRepository.range_query(city_name, start_date, end_time)
+            ).scalars().all()
             
             return [{
                 'id': result.id,
@@ -113,39 +178,312 @@ class WeatherRepository:
             session.close()
 
     @staticmethod
-    def get_daily_avg_temperature(city_name: str, days: 7) -> List[Dict[str, Any]]:
+    def columns_query(
+        city_names: Union[str, List[str]],
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[List[str]] = None
+    ) -> Select:
+        table = WeatherDataTable.__table__
+        columns = columns or WEATHER_COLUMNS
+        city_names = [city_names] if isinstance(city_names, str) else list(city_names)
 
-        session = get_session()
+        # Timestamps come back as raw values and are parsed by pandas in one vectorized call,
+        # instead of one datetime per row in the SQLAlchemy result processor.
+        selected = [
+            type_coerce(table.c[name], String).label(name) if name == 'timestamp' else table.c[name]
+            for name in columns
+        ]
+
+        return select(*selected).where(
+            table.c.city_name.in_(city_names),
+            table.c.timestamp >= start_date,
+            table.c.timestamp <= end_date
+        ).order_by(
+            table.c.city_name,
+            table.c.timestamp
+        )
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_weather_dataframe(
+        city_names: Union[str, List[str]],
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Load the selected columns for one or more cities straight into a DataFrame, without ORM objects."""
+
+        session = get_read_session()
+
+        try:
+            statement = WeatherRepository.columns_query(city_names, start_date, end_date, columns)
+
+            return WeatherRepository.read_dataframe(session.connection(), statement)
+        finally:
+            session.close()
+
+    @staticmethod
+    def iter_weather_dataframes(
+        city_names: Union[str, List[str]],
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[List[str]] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the range as DataFrames of at most chunk_size rows, streaming from a server-side cursor."""
+
+        session = get_read_session()
+
+        try:
+            statement = WeatherRepository.columns_query(city_names, start_date, end_date, columns)
+            connection = session.connection().execution_options(stream_results=True, yield_per=chunk_size)
+            result = connection.execute(statement)
+            keys = list(result.keys())
+
+            for partition in result.partitions():
+                yield WeatherRepository.normalize_dataframe(pd.DataFrame(partition, columns=keys))
+        finally:
+            session.close()
+
+    @staticmethod
+    def read_dataframe(connection, statement: Select) -> pd.DataFrame:
+
+        return WeatherRepository.normalize_dataframe(pd.read_sql(statement, connection))
+
+    @staticmethod
+    def normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+
+        if 'timestamp' in df.columns:
+            df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+
+        for name in ('rain_1h', 'snow_1h'):
+            if name in df.columns:
+                df[name] = df[name].astype(float)
+
+        return df
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_weather_arrays(
+        city_names: Union[str, List[str]],
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[List[str]] = None
+    ) -> Dict[str, np.ndarray]:
+
+        df = WeatherRepository.get_weather_dataframe(city_names, start_date, end_date, columns)
+
+        return {name: df[name].to_numpy() for name in df.columns}
+
+    @staticmethod
+    def choose_bucket(start_date: datetime, end_date: datetime, target_points: int) -> int:
+        """Smallest bucket size that keeps the range within target_points buckets."""
+
+        span = (end_date - start_date).total_seconds()
+
+        return next((size for size in BUCKET_SIZES if span / size <= target_points), BUCKET_SIZES[-1])
+
+    @staticmethod
+    def epoch_seconds(column, dialect_name: str):
+        """Seconds since 1970-01-01 of a naive timestamp column, as a SQL expression."""
+
+        if dialect_name == 'sqlite':
+
+            return cast(func.strftime('%s', column), Integer)
+
+        if dialect_name == 'postgresql':
+
+            # Truncate: a cast alone rounds fractional seconds into the next bucket.
+            return cast(func.floor(func.extract('epoch', column)), Integer)
+
+        return func.unix_timestamp(column)
+
+    @staticmethod
+    def bucketed_query(
+        city_names: Union[str, List[str]],
+        start_date: datetime,
+        end_date: datetime,
+        bucket_seconds: int,
+        dialect_name: str,
+        columns: Optional[List[str]] = None
+    ) -> Select:
+        table = WeatherDataTable.__table__
+        city_names = [city_names] if isinstance(city_names, str) else list(city_names)
+
+        # Integer division of the epoch floors each timestamp to the start of its bucket.
+        bucket = (WeatherRepository.epoch_seconds(table.c.timestamp, dialect_name) // bucket_seconds * bucket_seconds).label('bucket')
+
+        aggregates = []
+
+        for name in columns or BUCKET_COLUMNS:
+            aggregates.extend([
+                func.avg(table.c[name]).label(f'{name}_mean'),
+                func.min(table.c[name]).label(f'{name}_min'),
+                func.max(table.c[name]).label(f'{name}_max')
+            ])
+
+        return select(
+            table.c.city_name,
+            bucket,
+            func.count().label('sample_count'),
+            *aggregates
+        ).where(
+            table.c.city_name.in_(city_names),
+            table.c.timestamp >= start_date,
+            table.c.timestamp <= end_date
+        ).group_by(
+            table.c.city_name,
+            bucket
+        ).order_by(
+            table.c.city_name,
+            bucket
+        )
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_bucketed_dataframe(
+        city_names: Union[str, List[str]],
+        start_date: datetime,
+        end_date: datetime,
+        bucket_seconds: int,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Per-city mean, min and max of each column per bucket_seconds bucket, aggregated in SQL.
+
+        Buckets are aligned to the epoch and labelled by their start (bucket_start); only
+        buckets with data are returned.
+        """
+
+        session = get_read_session()
 
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-
-            results = session.query (
-                func.date(WeatherDataTable.timestamp).label('date'),
-                func.avg(WeatherDataTable.temperature).label('avg_temp'),
-            ).filter(
-                WeatherDataTable.city_name == city_name,
-                WeatherDataTable.timestamp >= start_date,
-                WeatherDataTable.timestamp <= end_date
-            ).group_by(
-                func.date(WeatherDataTable.timestamp)
-            ).order_by(
-                func.date(WeatherDataTable.timestamp)
+            connection = session.connection()
+            statement = WeatherRepository.bucketed_query(
+                city_names, start_date, end_date, bucket_seconds, connection.dialect.name, columns
+            )
+            df = pd.read_sql(statement, connection)
+        finally:
+            session.close()
+
+        df.insert(1, 'bucket_start', pd.to_datetime(df.pop('bucket'), unit='s'))
+
+        return df
+
+    @staticmethod
+    def statistics_query(city_name: str, start_date: datetime, end_date: datetime) -> Select:
+        table = WeatherDataTable
+
+        return select(
+            func.count().label('data_points'),
+            func.min(table.temperature).label('temperature_min'),
+            func.max(table.temperature).label('temperature_max'),
+            func.avg(table.temperature).label('temperature_avg'),
+            func.sum(table.temperature * table.temperature).label('temperature_sum_sq'),
+            func.min(table.humidity).label('humidity_min'),
+            func.max(table.humidity).label('humidity_max'),
+            func.avg(table.humidity).label('humidity_avg'),
+            func.min(table.pressure).label('pressure_min'),
+            func.max(table.pressure).label('pressure_max'),
+            func.avg(table.pressure).label('pressure_avg')
+        ).where(
+            table.city_name == city_name,
+            table.timestamp >= start_date,
+            table.timestamp <= end_date
+        )
+
+    @staticmethod
+    def condition_counts_query(city_name: str, start_date: datetime, end_date: datetime) -> Select:
+        table = WeatherDataTable
+
+        return select(
+            table.weather_condition,
+            func.count().label('count')
+        ).where(
+            table.city_name == city_name,
+            table.timestamp >= start_date,
+            table.timestamp <= end_date
+        ).group_by(
+            table.weather_condition
+        ).order_by(
+            desc('count')
+        )
+
+    @staticmethod
+    def sample_std(count: int, mean: float, sum_sq: float) -> float:
+        """Sample standard deviation (ddof=1, as pandas computes it) from count, mean and sum of squares."""
+
+        if count < 2:
+
+            return float('nan')
+
+        variance = (sum_sq - count * mean * mean) / (count - 1)
+
+        return math.sqrt(max(variance, 0.0))
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_weather_statistics(city_name: str, start_date: datetime, end_date: datetime) -> Optional[Dict[str, Any]]:
+        """Min/max/avg/std aggregates and the condition histogram for a range, computed in SQL."""
+
+        session = get_read_session()
+
+        try:
+            row = session.execute(
+                WeatherRepository.statistics_query(city_name, start_date, end_date)
+            ).one()
+
+            if not row.data_points:
+
+                return None
+
+            conditions = session.execute(
+                WeatherRepository.condition_counts_query(city_name, start_date, end_date)
             ).all()
 
-            return [{'date': str(date), 
-                    'avg_temperature': float(avg_temp)}
-                    for date , avg_temp in results]
+            return {
+                'data_points': row.data_points,
+                'temperature': {
+                    'min': row.temperature_min,
+                    'max': row.temperature_max,
+                    'avg': row.temperature_avg,
+                    'std': WeatherRepository.sample_std(row.data_points, row.temperature_avg, row.temperature_sum_sq)
+                },
+                'humidity': {
+                    'min': row.humidity_min,
+                    'max': row.humidity_max,
+                    'avg': row.humidity_avg
+                },
+                'pressure': {
+                    'min': row.pressure_min,
+                    'max': row.pressure_max,
+                    'avg': row.pressure_avg
+                },
+                'weather_conditions': {condition: count for condition, count in conditions}
+            }
         finally:
             session.close()
+
+    @staticmethod
+    @timed(REPOSITORY_SECONDS)
+    def get_daily_avg_temperature(city_name: str, days: int = 7) -> List[Dict[str, Any]]:
+        # Imported here because rollup_repositories builds on this module.
+        from repositories.rollup_repositories import RollupRepository
+
+        end_date = datetime.now()
+        daily = RollupRepository.get_daily_temperature(city_name, end_date - timedelta(days=days), end_date)
+
+        return [{'date': str(date.date()),
+                'avg_temperature': float(avg_temp)}
+                for date, avg_temp in zip(daily['date'], daily['temperature'])]
             
     @staticmethod
+    @timed(REPOSITORY_SECONDS)
     def get_cities_with_data() -> List[str]:
-        session = get_session()
+        session = get_read_session()
 
         try:
-            results = session.query(WeatherDataTable.city_name).distinct().all()
+            results = session.execute(WeatherRepository.cities_query()).all()
             
             return [result[0] for result in results]
         finally:
@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from database.database import WeatherDataTable
+from repositories.archive_repositories import ArchiveRepository
+from repositories.retention_repositories import RetentionRepository
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ArchiveService:
+
+    @staticmethod
+    def months(start_date: datetime, end_date: datetime) -> List[date]:
+        """First day of every month overlapping [start_date, end_date)."""
+
+        month = date(start_date.year, start_date.month, 1)
+        months = []
+
+        while datetime.combine(month, datetime.min.time()) < end_date:
+            months.append(month)
+            month = (month + timedelta(days=32)).replace(day=1)
+
+        return months
+
+    @staticmethod
+    def archive_range(city_name: str, start_date: datetime, end_date: datetime) -> int:
+        """Archive every month of the city overlapping [start_date, end_date); returns the rows in those files."""
+
+        return sum(
+            ArchiveRepository.archive_month(city_name, month)
+            for month in ArchiveService.months(start_date, end_date)
+        )
+
+    @staticmethod
+    def archive_before(cutoff: Optional[datetime] = None, city_names: Optional[List[str]] = None) -> Dict[str, int]:
+        """Archive each city's months before the cutoff (default: every complete month); returns months per city."""
+
+        today = date.today()
+        cutoff = cutoff or datetime(today.year, today.month, 1)
+        archived = {}
+
+        for city_name, first_timestamp in RetentionRepository.get_aged_cities(WeatherDataTable.timestamp, cutoff):
+            if city_names and city_name not in city_names:
+                continue
+
+            archived[city_name] = 0
+            next_timestamp = first_timestamp
+
+            while next_timestamp is not None:
+                month_start, month_end = ArchiveRepository.month_bounds(next_timestamp)
+                rows = ArchiveRepository.archive_month(city_name, month_start)
+                archived[city_name] += 1
+                logger.info(f"Archived {rows} rows for {city_name} in {month_start:%Y-%m}")
+
+                next_timestamp = RetentionRepository.get_next_time(WeatherDataTable.timestamp, city_name, month_end, cutoff)
+
+        return archived
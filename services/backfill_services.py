@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Tuple
+
+from config.config import API_REQUESTS_PER_SECOND, BACKFILL_MAX_WORKERS, BACKFILL_WINDOW_DAYS
+from repositories.backfill_repositories import BackfillRepository
+from services.historical_services import HistoricalService
+from utils.logger import get_logger
+from utils.rate_limiter import RateLimiter
+
+logger = get_logger(__name__)
+
+WINDOW_GRID_ORIGIN = date(2000, 1, 1)
+
+class BackfillService:
+
+    @staticmethod
+    def plan_windows(start_date: date, end_date: date, window_days: int = BACKFILL_WINDOW_DAYS) -> List[Tuple[date, date]]:
+        """Split a range into windows aligned to a fixed grid, so overlapping runs share checkpoints."""
+
+        windows = []
+        window_start = start_date
+
+        while window_start <= end_date:
+            offset = (window_start - WINDOW_GRID_ORIGIN).days % window_days
+            window_end = min(window_start + timedelta(days=window_days - offset - 1), end_date)
+            windows.append((window_start, window_end))
+            window_start = window_end + timedelta(days=1)
+
+        return windows
+
+    @staticmethod
+    def plan_backfill(
+        cities: List[Dict[str, str]],
+        start_date: date,
+        end_date: date,
+        window_days: int = BACKFILL_WINDOW_DAYS
+    ) -> List[Tuple[Dict[str, str], date, date]]:
+        """Windows still to fetch per city, skipping those recorded in the checkpoint table."""
+
+        tasks = []
+
+        for city in cities:
+            completed = BackfillRepository.get_completed_windows(city['name'])
+            windows = BackfillService.plan_windows(start_date, end_date, window_days)
+            pending = [window for window in windows if window not in completed]
+
+            logger.info(f"Backfill plan for {city['name']}: {len(pending)} of {len(windows)} windows pending")
+
+            tasks.extend((city, window_start, window_end) for window_start, window_end in pending)
+
+        return tasks
+
+    @staticmethod
+    def run_backfill(
+        city_names: List[str],
+        start_date: date,
+        end_date: date,
+        window_days: int = BACKFILL_WINDOW_DAYS,
+        max_workers: int = BACKFILL_MAX_WORKERS,
+        requests_per_second: float = API_REQUESTS_PER_SECOND
+    ) -> Dict[str, Any]:
+        """Fetch windows concurrently within the rate budget and save each one as it arrives.
+
+        Fetches run on worker threads; parsing, saving and checkpointing stay on the calling
+        thread, so there is a single database writer. At most 2 * max_workers responses are
+        in flight, which bounds memory for long ranges.
+        """
+
+        cities = []
+
+        for city_name in city_names:
+            city = HistoricalService.find_city(city_name)
+
+            if city:
+                cities.append(city)
+            else:
+                logger.error(f"City {city_name} not found in configured cities")
+
+        tasks = BackfillService.plan_backfill(cities, start_date, end_date, window_days)
+        saved = {city['name']: 0 for city in cities}
+        failed_windows = 0
+
+        limiter = RateLimiter(requests_per_second, burst=max_workers)
+        last_complete_day = datetime.now().date() - timedelta(days=2)
+
+        def fetch(task):
+            city, window_start, window_end = task
+            limiter.acquire()
+
+            return HistoricalService.fetch_historical_weather(city, window_start, window_end)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backfill") as executor:
+            queued = iter(tasks)
+            in_flight: Dict[Future, Any] = {}
+
+            def submit_next() -> None:
+                task = next(queued, None)
+
+                if task is not None:
+                    in_flight[executor.submit(fetch, task)] = task
+
+            for _ in range(max_workers * 2):
+                submit_next()
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    city, window_start, window_end = in_flight.pop(future)
+                    submit_next()
+
+                    try:
+                        raw_data = future.result()
+
+                        if not raw_data:
+                            raise ValueError("no data returned")
+
+                        records = HistoricalService.save_historical_data(raw_data, city)
+
+                        # Windows reaching into today or yesterday (in any city's time zone) may
+                        # still change, so they are not checkpointed and are fetched again next run.
+                        if records and window_end <= last_complete_day:
+                            BackfillRepository.mark_window_completed(city['name'], window_start, window_end, records)
+
+                        saved[city['name']] += records
+                        logger.info(f"Backfilled {records} records for {city['name']} {window_start}..{window_end}")
+                    except Exception as e:
+                        failed_windows += 1
+                        logger.error(f"Backfill window {window_start}..{window_end} for {city['name']} failed: {str(e)}")
+
+        logger.info(
+            f"Backfill finished: {sum(saved.values())} records saved from {len(tasks)} windows, "
+            f"{failed_windows} windows failed"
+        )
+
+        return {
+            "saved": saved,
+            "windows": len(tasks),
+            "failed_windows": failed_windows,
+            "unknown_cities": len(city_names) - len(cities)
+        }
@@ -1,15 +1,21 @@
+import time
 import requests
-from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
-from config.config import WEATHER_API_BASE_URL, WEATHER_API_KEY, CITIES
+from config.config import WEATHER_API_BASE_URL, WEATHER_API_KEY, CITIES, EXTRACT_MAX_WORKERS
+from models.weather_batch import WeatherBatch
 from models.weather_data import WeatherData
+from utils import http_client
 from utils.logger import get_logger
+from utils.metrics import EXTRACT_CITY_SECONDS
 
 logger = get_logger(__name__)
 
 class ExtractService:
-    
+
     @staticmethod
     def fetch_weather_data(city: Dict[str, str]) -> Optional[Dict[str, Any]]:
 
@@ -21,7 +27,7 @@ class ExtractService:
                 "contentType": "json"
             }
 
-            response = requests.get(url, params=params)
+            response = http_client.get(url, params=params)
             response.raise_for_status()
 
             logger.info(f"Downloaded weather data for {city['name']}, {city['country']}")
@@ -31,38 +37,99 @@ class ExtractService:
             logger.error(f"Error for downloading weather data for {city['name']}, {city['country']}")
 
             return None
-        
+
+    @staticmethod
+    def parse_weather_data(raw_data: Dict[str, Any], city: Dict[str, str]) -> WeatherData:
+
+        current_conditions = raw_data.get('currentConditions', {})
+
+        return WeatherData(
+            city_name=city['name'],
+            country=city['country'],
+            temperature=current_conditions.get('temp', 0),
+            feels_like=current_conditions.get('feelslike', 0),
+            humidity=current_conditions.get('humidity', 0),
+            pressure=current_conditions.get('pressure', 0),
+            wind_speed=current_conditions.get('windspeed', 0),
+            wind_direction=current_conditions.get('winddir', 0),
+            weather_condition=current_conditions.get('conditions', '').split(',')[0].strip(),
+            weather_description=current_conditions.get('conditions', ''),
+            clouds=current_conditions.get('cloudcover', 0),
+            rain_1h=current_conditions.get('precip', 0) if current_conditions.get('precip', 0) > 0 else None,
+            snow_1h=None,
+            timestamp=ExtractService._observation_time(raw_data, current_conditions)
+        )
+
+    @staticmethod
+    def _observation_time(raw_data: Dict[str, Any], current_conditions: Dict[str, Any]) -> Optional[datetime]:
+        """Observation time in the city's local wall-clock time, matching the timeline API's hourly datetimes.
+
+        Using the observation time rather than the fetch time makes repeated runs within one
+        observation period upsert the same (city_name, timestamp) row.
+        """
+
+        epoch = current_conditions.get('datetimeEpoch')
+
+        if epoch is None:
+
+            return None
+
+        offset_hours = raw_data.get('tzoffset') or 0
+
+        return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None) + timedelta(hours=offset_hours)
+
     @staticmethod
-    def extract_all_cities() -> List[WeatherData]:
-        weather_data_list = []
+    def extract_city(city: Dict[str, str]) -> Tuple[Optional[WeatherData], float]:
+        """Fetch and parse one city, returning the record (or None) and the fetch latency in seconds."""
+
+        started = time.perf_counter()
+        raw_data = None
 
-        for city in CITIES:
+        try:
             raw_data = ExtractService.fetch_weather_data(city)
+        except Exception as e:
+            logger.error(f"Unexpected error while downloading data for {city['name']}: {str(e)}")
+
+        latency = time.perf_counter() - started
+        EXTRACT_CITY_SECONDS.observe(latency, city['name'])
+
+        if not raw_data:
+
+            return None, latency
+
+        try:
+
+            return ExtractService.parse_weather_data(raw_data, city), latency
+        except Exception as e:
+            logger.error(f"Error parsing data for {city['name']}: {str(e)}")
+
+            return None, latency
+
+    @staticmethod
+    def extract_all_cities(
+        cities: Optional[List[Dict[str, str]]] = None,
+        max_workers: int = EXTRACT_MAX_WORKERS
+    ) -> WeatherBatch:
+        cities = CITIES if cities is None else cities
+        workers = max(1, min(max_workers, len(cities)))
+
+        started = time.perf_counter()
+
+        if workers == 1:
+            results = [ExtractService.extract_city(city) for city in cities]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+                results = list(executor.map(ExtractService.extract_city, cities))
+
+        wall_clock = time.perf_counter() - started
+        summed_latency = sum(latency for _, latency in results)
+
+        weather_data_list = [weather_data for weather_data, _ in results if weather_data is not None]
+
+        logger.info(f"Downloaded weather data for {len(weather_data_list)} from {len(cities)} configured cities")
+        logger.info(
+            f"Extraction took {wall_clock:.2f}s wall-clock vs {summed_latency:.2f}s summed fetch latency "
+            f"using {workers} worker(s)"
+        )
 
-            if raw_data:
-                try:
-
-                    current_conditions = raw_data.get('currentConditions', {})
-
-                    weather_data = WeatherData(
-                        city_name=city['name'],
-                        country=city['country'],
-                        temperature=current_conditions.get('temp', 0),
-                        feels_like=current_conditions.get('feelslike', 0),
-                        humidity=current_conditions.get('humidity', 0),
-                        pressure=current_conditions.get('pressure', 0),
-                        wind_speed=current_conditions.get('windspeed', 0),
-                        wind_direction=current_conditions.get('winddir', 0),
-                        weather_condition=current_conditions.get('conditions', '').split(',')[0].strip(),
-                        weather_description=current_conditions.get('conditions', ''),
-                        clouds=current_conditions.get('cloudcover', 0),
-                        rain_1h=current_conditions.get('precip', 0) if current_conditions.get('precip', 0) > 0 else None,
-                        snow_1h=None, 
-                    )
-                    weather_data_list.append(weather_data)
-                except Exception as e:
-                    logger.error(f"Error parsing data for {city['name']}: {str(e)}")
-        
-        logger.info(f"Downloaded weather data for {len(weather_data_list)} from {len(CITIES)} configured cities")
-        
-        return weather_data_list
\ No newline at end of file
+        return WeatherBatch.from_records(weather_data_list)
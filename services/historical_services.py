@@ -1,39 +1,45 @@
+import time
 import requests
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta, date
+from datetime import date
 
-from config.config import WEATHER_API_BASE_URL, WEATHER_API_KEY, CITIES
-from models.weather_data import WeatherData
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from config.config import CITIES, STREAM_BATCH_ROWS, STREAM_CHUNK_BYTES
+from models.weather_batch import WeatherBatch
 from utils.logger import get_logger
 from services.transform_services import TransformService
 from services.load_services import LoadService
+from services.parse_services import ParseService
+from services.timeline_services import TimelineService, get_response_cache
+from utils.json_stream import JsonArrayStream
 
 logger = get_logger(__name__)
 
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None where the resource module is unavailable."""
+
+    if resource is None:
+
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
 class HistoricalService:
 
     @staticmethod
     def fetch_historical_weather(city: Dict[str, str], start_date: date, end_date: date) -> Optional[Dict[str, Any]]:
 
         try:
-            start_str = start_date.strftime("%Y-%m-%d")
-            end_str = end_date.strftime("%Y-%m-%d")
-
-            url = f"{WEATHER_API_BASE_URL}{city['name']}/{start_str}/{end_str}"
-            params = {
-                "unitGroup": "metric",
-                "key": WEATHER_API_KEY,
-                "contentType": "json",
-                "include": "days,hours"
-            }
-
-            logger.info(f"Fetching historical data for {city['name']} from {start_str} to {end_str}")
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+            logger.info(f"Fetching historical data for {city['name']} from {start_date} to {end_date}")
+            raw_data = TimelineService.fetch_timeline(city['name'], start_date, end_date, include="days,hours")
 
             logger.info(f"Successfully downloaded historical weather data for {city['name']}, {city['country']}")
             
-            return response.json()
+            return raw_data
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Error downloading historical data for {city['name']}, {city['country']}: {str(e)} ")
@@ -41,8 +47,8 @@ class HistoricalService:
             return None
         
     @staticmethod
-    def process_historical_data(raw_data: Dict[str, Any], city: Dict[str, str]) -> List[WeatherData]:
-        weather_data_list = []
+    def process_historical_data(raw_data: Dict[str, Any], city: Dict[str, str]) -> WeatherBatch:
+        weather_data_list = WeatherBatch.empty()
 
         if not raw_data or "days" not in raw_data:
             logger.error(f"Invalid historical data format for {city['name']}")
@@ -50,38 +56,8 @@ class HistoricalService:
             return weather_data_list
         
         try:
-
-            for day in raw_data("days", []):
-
-                for hour in day.get("hours", []):
-
-                    try:
-                        day_date = day.get("datetime", "")
-                        hour_time = hour.get("datetime", "")
-                        timestamp = datetime.strptime(f"{day_date} {hour_time}","%Y-%m-%d %H:%M:%S")
-
-                        weather_data = WeatherData(
-                            city_name=city['name'],
-                            country=city['country'],
-                            temperature=hour.get('temp', 0),
-                            feels_like=hour.get('feelslike', 0),
-                            humidity=hour.get('humidity', 0),
-                            pressure=hour.get('pressure', 0),
-                            wind_speed=hour.get('windspeed', 0),
-                            wind_direction=hour.get('winddir', 0),
-                            weather_condition=hour.get('conditions', '').split(',')[0].strip(),
-                            weather_description=hour.get('conditions', ''),
-                            clouds=hour.get('cloudcover', 0),
-                            rain_1h=hour.get('precip', 0) if hour.get('precip', 0) > 0 else None,
-                            snow_1h=None,
-                            timestamp=timestamp
-                        )
-                        weather_data_list.append(weather_data)
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing hourly data for {city['name']} at {day_date} {hour_time}: {str(e)}")
-                        
-                        continue
+            hourly = ParseService.hourly_frame(raw_data)
+            weather_data_list = ParseService.to_weather_batch(hourly, city)
         
         except Exception as e:
             logger.error(f"Error processing historical data for {city['name']}: {str(e)}")
@@ -90,9 +66,32 @@ class HistoricalService:
         
         return weather_data_list
     
+    @staticmethod
+    def find_city(city_name: str) -> Optional[Dict[str, str]]:
+
+        return next((c for c in CITIES if c['name'].lower() == city_name.lower()), None)
+
+    @staticmethod
+    def save_historical_data(raw_data: Dict[str, Any], city: Dict[str, str]) -> int:
+
+        weather_data_list = HistoricalService.process_historical_data(raw_data, city)
+
+        if not weather_data_list:
+            logger.error(f"No historical data processed for {city['name']}")
+            
+            return 0
+        
+        processed_data = TransformService.batch_process_cities(weather_data_list)
+
+        record_ids = LoadService.batch_save_weather_data(processed_data)
+        
+        logger.info(f"Saved {len(record_ids)} historical records for {city['name']}")
+        
+        return len(record_ids)
+
     @staticmethod
     def fetch_and_save_historical_data(city_name: str, start_date: date, end_date: date) -> int:
-        city = next((c for c in CITIES if c['name'].lower() == city_name.lower()), None) 
+        city = HistoricalService.find_city(city_name)
         
         if not city:
             logger.error(f"City {city_name} not found in configured cities")
@@ -106,17 +105,74 @@ class HistoricalService:
             
             return 0
 
-        weather_data_list = HistoricalService.process_historical_data(raw_data, city)
+        return HistoricalService.save_historical_data(raw_data, city)
+
+    @staticmethod
+    def _save_day_batch(days: List[Dict[str, Any]], city: Dict[str, str]) -> int:
+        cache = get_response_cache()
+
+        if cache:
+            cache.put_days(city['name'], "days,hours", days)
+
+        return HistoricalService.save_historical_data({"days": days}, city)
+
+    @staticmethod
+    def stream_and_save_historical_data(
+        city_name: str,
+        start_date: date,
+        end_date: date,
+        batch_rows: int = STREAM_BATCH_ROWS
+    ) -> int:
+        """Fetch a range in a single request and save it while the body is still downloading.
+
+        Days are decoded from the response one at a time and saved in batches of about
+        batch_rows hourly rows, so memory is bounded by the batch size rather than the range.
+        """
+
+        city = HistoricalService.find_city(city_name)
+
+        if not city:
+            logger.error(f"City {city_name} not found in configured cities")
 
-        if not weather_data_list:
-            logger.error(f"No historical data processed for {city_name}")
-            
             return 0
-        
-        processed_data = TransformService.batch_process_cities(weather_data_list)
 
-        record_ids = LoadService.batch_save_weather_data(processed_data)
-        
-        logger.info(f"Saved {len(record_ids)} historical records for {city_name}")
-        
-        return len(record_ids)
\ No newline at end of file
+        started = time.perf_counter()
+        saved = 0
+        batch: List[Dict[str, Any]] = []
+        pending_rows = 0
+        stream = None
+
+        try:
+            response = TimelineService.open_timeline(city['name'], start_date, end_date, "days,hours", stream=True)
+
+            try:
+                stream = JsonArrayStream(response.iter_content(chunk_size=STREAM_CHUNK_BYTES), "days")
+
+                for day in stream:
+                    batch.append(day)
+                    pending_rows += len(day.get("hours", ()))
+
+                    if pending_rows >= batch_rows:
+                        saved += HistoricalService._save_day_batch(batch, city)
+                        batch = []
+                        pending_rows = 0
+
+                if batch:
+                    saved += HistoricalService._save_day_batch(batch, city)
+            finally:
+                response.close()
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Error streaming historical data for {city['name']}, {city['country']}: {str(e)}")
+
+        elapsed = time.perf_counter() - started
+        megabytes = (stream.bytes_read if stream else 0) / (1024 * 1024)
+        peak_rss = peak_rss_mb()
+
+        logger.info(
+            f"Streamed {megabytes:.1f} MB for {city['name']} in {elapsed:.1f}s "
+            f"({megabytes / elapsed if elapsed else 0:.1f} MB/s), saved {saved} records"
+            + (f", peak RSS {peak_rss:.0f} MB" if peak_rss is not None else "")
+        )
+
+        return saved
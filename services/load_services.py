@@ -1,9 +1,14 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Union
 import pandas as pd
 from datetime import datetime, timedelta
 
+from config.config import DB_BULK_CHUNK_SIZE
+from database.database import maybe_checkpoint_wal, session_scope
+from models.weather_batch import WeatherBatch
 from models.weather_data import WeatherData
-from repositories.weather_repositories import WeatherRepository
+from repositories.generation_repositories import DataGenerationRepository
+from repositories.rollup_repositories import RollupRepository
+from repositories.weather_repositories import WeatherRepository, WEATHER_COLUMNS
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,11 +28,71 @@ class LoadService:
 
             raise
     @staticmethod
-    def batch_save_weather_data(weather_data_list: List[WeatherData]) -> List[int]:
+    def batch_save_weather_data(
+        weather_batch: Union[WeatherBatch, List[WeatherData]],
+        bulk: bool = True,
+        chunk_size: int = DB_BULK_CHUNK_SIZE
+    ) -> List[int]:
+
+        weather_batch = WeatherBatch.coerce(weather_batch)
+
+        if not bulk:
+            record_ids = LoadService._save_rows_individually(weather_batch)
+            LoadService.refresh_rollups(weather_batch)
+
+            if record_ids:
+                LoadService.bump_generation()
+
+            return record_ids
+
+        record_ids = []
+
+        # One transaction per batch: the raw rows and the rollups they touch commit together.
+        with session_scope():
+            for start in range(0, len(weather_batch), chunk_size):
+                chunk = weather_batch[start:start + chunk_size]
+
+                try:
+                    record_ids.extend(WeatherRepository.upsert_weather_data(chunk))
+                except Exception as e:
+                    logger.warning(f"Bulk upsert of {len(chunk)} records failed, retrying row by row: {str(e)}")
+                    record_ids.extend(LoadService._save_rows_individually(chunk))
+
+            logger.info(f"Saved {len(record_ids)} from {len(weather_batch)} records with weather data")
+
+            LoadService.refresh_rollups(weather_batch)
+
+            if record_ids:
+                LoadService.bump_generation()
+
+        maybe_checkpoint_wal()
+
+        return record_ids
+
+    @staticmethod
+    def refresh_rollups(weather_batch: WeatherBatch) -> None:
+
+        try:
+            refreshed = RollupRepository.refresh_for_records(weather_batch)
+            logger.info(f"Refreshed rollups for {refreshed} city-days")
+        except Exception as e:
+            logger.error(f"Error while refreshing rollups: {str(e)}")
+
+    @staticmethod
+    def bump_generation() -> None:
+        """Tell readers (the dashboard caches) that new data has been committed."""
+
+        try:
+            DataGenerationRepository.bump_generation()
+        except Exception as e:
+            logger.error(f"Error while bumping the data generation: {str(e)}")
+
+    @staticmethod
+    def _save_rows_individually(weather_batch: WeatherBatch) -> List[int]:
 
         record_ids = []
 
-        for weather_data in weather_data_list:
+        for weather_data in weather_batch:
 
             try:
                 record_id = LoadService.save_weather_data(weather_data)
@@ -35,30 +100,86 @@ class LoadService:
             except Exception as e:
                 logger.error(f"Failed to save data for {weather_data.city_name}: {str(e)}")
 
-        logger.info(f"Saved {len(record_ids)} from {len(weather_data_list)} records with weather data")
+        logger.info(f"Saved {len(record_ids)} from {len(weather_batch)} records with weather data")
 
         return record_ids
-    
+
     @staticmethod
     def export_to_csv(city_name: str, file_path: str) -> bool:
 
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=30)
+
+        return LoadService.export_data([city_name], file_path, start_date, end_date, file_format='csv')
+
+    @staticmethod
+    def export_data(
+        city_names: List[str],
+        file_path: str,
+        start_date: datetime,
+        end_date: datetime,
+        file_format: Optional[str] = None
+    ) -> bool:
+        """Stream the range to CSV or Parquet chunk by chunk, so memory stays flat regardless of export size."""
+
+        file_format = file_format or ('parquet' if file_path.lower().endswith('.parquet') else 'csv')
+        cities_label = ", ".join(city_names)
+
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
+            chunks = WeatherRepository.iter_weather_dataframes(
+                city_names, start_date, end_date, columns=['id'] + WEATHER_COLUMNS
+            )
 
-            historical_data = WeatherRepository. get_weather_data_by_data_range(city_name, start_date, end_date)
+            if file_format == 'parquet':
+                rows_written = LoadService._write_parquet(chunks, file_path)
+            else:
+                rows_written = LoadService._write_csv(chunks, file_path)
 
-            if not historical_data:
-                logger.warning(f"No data ready to export for {city_name}")
+            if not rows_written:
+                logger.warning(f"No data ready to export for {cities_label}")
 
                 return False
-            df = pd.DataFrame(historical_data)
-            df.to_csv(file_path, index=False)
 
-            logger.info(f"Data exported for {city_name} to {file_path}")
+            logger.info(f"Exported {rows_written} rows for {cities_label} to {file_path}")
 
             return True
         except Exception as e:
-            logger.error(f"Error while exporting data for {city_name}: {str(e)}")
+            logger.error(f"Error while exporting data for {cities_label}: {str(e)}")
 
             return False
+
+    @staticmethod
+    def _write_csv(chunks: Iterable[pd.DataFrame], file_path: str) -> int:
+        rows_written = 0
+
+        with open(file_path, 'w', newline='') as csv_file:
+            for chunk in chunks:
+                chunk.to_csv(csv_file, header=(rows_written == 0), index=False)
+                rows_written += len(chunk)
+
+        return rows_written
+
+    @staticmethod
+    def _write_parquet(chunks: Iterable[pd.DataFrame], file_path: str) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows_written = 0
+        writer = None
+
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+
+                if writer is None:
+                    writer = pq.ParquetWriter(file_path, table.schema, compression='snappy')
+                else:
+                    table = table.cast(writer.schema)
+
+                writer.write_table(table)
+                rows_written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return rows_written
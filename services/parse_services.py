@@ -0,0 +1,119 @@
+from typing import Dict, Any
+
+import numpy as np
+import pandas as pd
+
+from models.weather_batch import WeatherBatch
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HOURLY_FIELDS = {
+    'temp': 'temperature',
+    'feelslike': 'feels_like',
+    'humidity': 'humidity',
+    'pressure': 'pressure',
+    'windspeed': 'wind_speed',
+    'winddir': 'wind_direction',
+    'cloudcover': 'clouds',
+    'precip': 'precipitation'
+}
+
+DAILY_FIELDS = ['tempmax', 'tempmin', 'temp', 'humidity', 'pressure', 'windspeed', 'precip', 'cloudcover']
+
+class ParseService:
+    """Columnar parsing of Visual Crossing timeline responses.
+
+    Every field is converted once per column instead of once per row: timestamps are built
+    from the parsed day dates plus the hour offsets, numbers are coerced with missing values
+    as NaN and condition strings are categorical, so they are split once per distinct value.
+    """
+
+    @staticmethod
+    def _conditions(values: pd.Series) -> pd.DataFrame:
+        description = values.astype('category')
+        primary = description.cat.categories.str.split(',').str[0].str.strip()
+        codes = description.cat.codes.to_numpy()
+
+        condition = pd.Categorical(
+            np.where(codes >= 0, primary.to_numpy()[codes], None)
+        )
+
+        return pd.DataFrame({
+            'weather_condition': condition,
+            'weather_description': description
+        }, index=values.index)
+
+    @staticmethod
+    def hourly_frame(raw_data: Dict[str, Any]) -> pd.DataFrame:
+        """One row per hour with columns timestamp, date, the HOURLY_FIELDS names and the conditions."""
+
+        days = raw_data.get('days', [])
+        hours = [hour for day in days for hour in day.get('hours', ())]
+
+        if not hours:
+
+            return pd.DataFrame(columns=['timestamp', 'date', *HOURLY_FIELDS.values(), 'weather_condition', 'weather_description'])
+
+        counts = [len(day.get('hours', ())) for day in days]
+        day_dates = pd.to_datetime([day.get('datetime') for day in days], format='%Y-%m-%d', errors='coerce')
+
+        records = pd.DataFrame.from_records(hours, columns=['datetime', 'conditions', *HOURLY_FIELDS])
+
+        date = pd.Series(day_dates.repeat(counts))
+        offsets = pd.to_timedelta(records['datetime'], errors='coerce')
+
+        frame = pd.DataFrame({'timestamp': date + offsets, 'date': date})
+
+        for source, column in HOURLY_FIELDS.items():
+            frame[column] = pd.to_numeric(records[source], errors='coerce').astype('float64')
+
+        frame = frame.join(ParseService._conditions(records['conditions']))
+
+        invalid = frame['timestamp'].isna()
+
+        if invalid.any():
+            logger.warning(f"Skipping {int(invalid.sum())} hourly rows with an unparseable date or time")
+            frame = frame[~invalid].reset_index(drop=True)
+
+        return frame
+
+    @staticmethod
+    def daily_frame(raw_data: Dict[str, Any]) -> pd.DataFrame:
+        days = raw_data.get('days', [])
+        records = pd.DataFrame.from_records(days, columns=['datetime', 'conditions', 'description', *DAILY_FIELDS])
+
+        frame = pd.DataFrame({'date': pd.to_datetime(records['datetime'], format='%Y-%m-%d', errors='coerce')})
+
+        for column in DAILY_FIELDS:
+            frame[column] = pd.to_numeric(records[column], errors='coerce').astype('float64')
+
+        frame['conditions'] = records['conditions'].astype('category')
+        frame['description'] = records['description']
+
+        return frame
+
+    @staticmethod
+    def to_weather_batch(hourly: pd.DataFrame, city: Dict[str, str]) -> WeatherBatch:
+        """Build a WeatherBatch from an hourly frame, defaulting missing measurements to 0."""
+
+        measures = hourly[list(HOURLY_FIELDS.values())].fillna(0.0)
+        precipitation = measures['precipitation'].to_numpy()
+
+        return WeatherBatch.from_columns(
+            len(hourly),
+            city_name=city['name'],
+            country=city['country'],
+            temperature=measures['temperature'],
+            feels_like=measures['feels_like'],
+            humidity=measures['humidity'],
+            pressure=measures['pressure'],
+            wind_speed=measures['wind_speed'],
+            wind_direction=measures['wind_direction'],
+            weather_condition=hourly['weather_condition'].astype(object).fillna(''),
+            weather_description=hourly['weather_description'].astype(object).fillna(''),
+            clouds=measures['clouds'],
+            rain_1h=np.where(precipitation > 0, precipitation, np.nan),
+            snow_1h=None,
+            timestamp=hourly['timestamp']
+        )
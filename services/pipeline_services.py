@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from config.config import CITIES, EXTRACT_MAX_WORKERS, PIPELINE_QUEUE_SIZE, PIPELINE_LOAD_BATCH_SIZE
+from models.weather_batch import WeatherBatch
+from services.extract_services import ExtractService
+from services.load_services import LoadService
+from services.transform_services import TransformService
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_DONE = object()
+
+class PipelineService:
+
+    @staticmethod
+    def run(
+        cities: Optional[List[Dict[str, str]]] = None,
+        max_workers: int = EXTRACT_MAX_WORKERS,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        load_batch_size: int = PIPELINE_LOAD_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """Run extract, transform and load as concurrent stages joined by bounded queues.
+
+        Extract workers put each city's record on a queue as soon as it is fetched, a
+        transform thread enriches records as they arrive and a single load thread saves
+        whatever has accumulated (up to load_batch_size). Full queues block the stage
+        upstream, which caps the records held in memory at about 2 * queue_size. A failure
+        is logged and counted by the stage it happened in; the other records keep flowing.
+        The fetches dominate a cycle and saving is cheap next to them, so the cycle takes
+        about as long as stage-by-stage mode: what this mode adds is failure isolation,
+        backpressure and bounded memory, not speed. The *_seconds stats are each stage's
+        busy time, summed over its workers, so they can add up to more than the wall clock.
+        """
+
+        cities = CITIES if cities is None else cities
+        extracted: queue.Queue = queue.Queue(maxsize=queue_size)
+        transformed: queue.Queue = queue.Queue(maxsize=queue_size)
+        stats = {"extracted": 0, "transformed": 0, "saved": 0, "extract_failed": 0, "transform_failed": 0, "load_failed": 0,
+                 "extract_seconds": 0.0, "transform_seconds": 0.0, "load_seconds": 0.0}
+        stats_lock = threading.Lock()
+
+        def count(key: str, amount: int = 1) -> None:
+            with stats_lock:
+                stats[key] += amount
+
+        def extract(city: Dict[str, str]) -> None:
+            weather_data, latency = ExtractService.extract_city(city)
+            count("extract_seconds", latency)
+
+            if weather_data is None:
+                count("extract_failed")
+
+                return
+
+            count("extracted")
+            extracted.put(weather_data)
+
+        def transform() -> None:
+            try:
+                while (weather_data := extracted.get()) is not _DONE:
+                    try:
+                        transform_started = time.perf_counter()
+                        enriched = TransformService.enrich_weather_data(weather_data)
+                        count("transform_seconds", time.perf_counter() - transform_started)
+                        transformed.put(enriched)
+                        count("transformed")
+                    except Exception as e:
+                        count("transform_failed")
+                        logger.error(f"Error while processing data for {weather_data.city_name}: {str(e)}")
+            finally:
+                transformed.put(_DONE)
+
+        def load() -> None:
+            finished = False
+
+            while not finished:
+                batch = [transformed.get()]
+
+                # Take whatever else is already waiting, without waiting for a full batch.
+                while len(batch) < load_batch_size:
+                    try:
+                        batch.append(transformed.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if batch[-1] is _DONE:
+                    batch.pop()
+                    finished = True
+
+                if not batch:
+                    continue
+
+                load_started = time.perf_counter()
+
+                try:
+                    count("saved", len(LoadService.batch_save_weather_data(WeatherBatch.from_records(batch))))
+                except Exception as e:
+                    count("load_failed", len(batch))
+                    logger.error(f"Error while saving a batch of {len(batch)} records: {str(e)}")
+                finally:
+                    count("load_seconds", time.perf_counter() - load_started)
+
+        started = time.perf_counter()
+        stage_threads = [
+            threading.Thread(target=transform, name="pipeline-transform"),
+            threading.Thread(target=load, name="pipeline-load")
+        ]
+
+        for thread in stage_threads:
+            thread.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(cities))), thread_name_prefix="extract") as executor:
+                for future in [executor.submit(extract, city) for city in cities]:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        count("extract_failed")
+                        logger.error(f"Unexpected error in extract stage: {str(e)}")
+        finally:
+            extracted.put(_DONE)
+
+            for thread in stage_threads:
+                thread.join()
+
+        stats["seconds"] = time.perf_counter() - started
+
+        logger.info(
+            f"Pipelined ETL finished in {stats['seconds']:.2f}s: {stats['extracted']} extracted, "
+            f"{stats['transformed']} transformed, {stats['saved']} saved from {len(cities)} cities "
+            f"({stats['extract_failed']}/{stats['transform_failed']}/{stats['load_failed']} failed per stage)"
+        )
+
+        return stats
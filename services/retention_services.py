@@ -0,0 +1,155 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+from config.config import (
+    ARCHIVE_ON_RETENTION,
+    RETENTION_BATCH_DAYS,
+    RETENTION_HOURLY_DAYS,
+    RETENTION_RAW_DAYS,
+    RETENTION_VACUUM_PAGES
+)
+from database.database import (
+    WeatherDataTable,
+    WeatherHourlyRollupTable,
+    incremental_vacuum,
+    maybe_checkpoint_wal,
+    session_scope
+)
+from repositories.generation_repositories import DataGenerationRepository
+from repositories.retention_repositories import RetentionRepository
+from repositories.rollup_repositories import RollupRepository
+from services.archive_services import ArchiveService
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class RetentionService:
+    """Tiered retention: raw rows for raw_days, hourly rollups for hourly_days, daily rollups forever.
+
+    Aged rows are handled batch_days per city at a time, each batch in its own short
+    transaction, so the ETL and the dashboards only ever wait for one batch.
+    """
+
+    @staticmethod
+    def cutoff(days: int, today: Optional[date] = None) -> datetime:
+        """Midnight `days` days ago; tiers are cut on whole days so no day is left half rolled up."""
+
+        return datetime.combine((today or date.today()) - timedelta(days=days), time.min)
+
+    @staticmethod
+    def fold_raw(cutoff: datetime, batch_days: int, vacuum_pages: int, archive: bool = ARCHIVE_ON_RETENTION) -> Tuple[int, int]:
+        """Refresh the rollups of every aged day from its raw rows, then delete those rows in the same transaction.
+
+        With `archive`, the rows are first merged into the Parquet archive. Returns the rows
+        deleted and the pages freed.
+        """
+
+        deleted = freed = 0
+
+        for city_name, first_timestamp in RetentionRepository.get_aged_cities(WeatherDataTable.timestamp, cutoff):
+            batch_start = datetime.combine(first_timestamp.date(), time.min)
+
+            while batch_start is not None:
+                batch_end = min(batch_start + timedelta(days=batch_days), cutoff)
+
+                if archive:
+                    ArchiveService.archive_range(city_name, batch_start, batch_end)
+
+                with session_scope():
+                    RollupRepository.refresh_rollups(
+                        city_name, batch_start.date(), (batch_end - timedelta(days=1)).date()
+                    )
+                    deleted += RetentionRepository.delete_raw(city_name, batch_start, batch_end)
+
+                freed += RetentionService.reclaim_space(vacuum_pages)
+
+                next_timestamp = RetentionRepository.get_next_time(WeatherDataTable.timestamp, city_name, batch_end, cutoff)
+                batch_start = datetime.combine(next_timestamp.date(), time.min) if next_timestamp else None
+
+        return deleted, freed
+
+    @staticmethod
+    def fold_hourly(cutoff: datetime, batch_days: int, vacuum_pages: int) -> Tuple[int, int]:
+        """Fill in any daily rollups missing for aged hourly buckets, then delete the hourly rows."""
+
+        deleted = freed = 0
+        column = WeatherHourlyRollupTable.bucket_start
+
+        for city_name, first_bucket in RetentionRepository.get_aged_cities(column, cutoff):
+            batch_start = datetime.combine(first_bucket.date(), time.min)
+
+            while batch_start is not None:
+                batch_end = min(batch_start + timedelta(days=batch_days), cutoff)
+
+                with session_scope():
+                    RetentionRepository.fold_hourly_into_daily(city_name, batch_start, batch_end)
+                    deleted += RetentionRepository.delete_hourly(city_name, batch_start, batch_end)
+
+                freed += RetentionService.reclaim_space(vacuum_pages)
+
+                next_bucket = RetentionRepository.get_next_time(column, city_name, batch_end, cutoff)
+                batch_start = datetime.combine(next_bucket.date(), time.min) if next_bucket else None
+
+        return deleted, freed
+
+    @staticmethod
+    def reclaim_space(max_pages: int) -> int:
+        """Release up to max_pages free pages (SQLite with auto_vacuum=INCREMENTAL only) and keep the WAL
+        in check after a committed batch; returns the pages freed."""
+
+        maybe_checkpoint_wal()
+
+        if max_pages <= 0:
+
+            return 0
+
+        result = incremental_vacuum(max_pages)
+
+        return result[0] if result else 0
+
+    @staticmethod
+    def apply_retention(
+        raw_days: int = RETENTION_RAW_DAYS,
+        hourly_days: int = RETENTION_HOURLY_DAYS,
+        batch_days: int = RETENTION_BATCH_DAYS,
+        vacuum_pages: int = RETENTION_VACUUM_PAGES
+    ) -> Dict[str, Any]:
+
+        if raw_days > hourly_days:
+            raise ValueError(f"Raw retention ({raw_days} days) cannot be longer than hourly retention ({hourly_days} days)")
+
+        if batch_days <= 0:
+            raise ValueError(f"Retention batch must be at least one day, got {batch_days}")
+
+        raw_cutoff = RetentionService.cutoff(raw_days)
+        hourly_cutoff = RetentionService.cutoff(hourly_days)
+
+        raw_deleted, raw_freed = RetentionService.fold_raw(raw_cutoff, batch_days, vacuum_pages)
+        hourly_deleted, hourly_freed = RetentionService.fold_hourly(hourly_cutoff, batch_days, vacuum_pages)
+
+        stats = {
+            "raw_cutoff": raw_cutoff.isoformat(),
+            "hourly_cutoff": hourly_cutoff.isoformat(),
+            "raw_deleted": raw_deleted,
+            "hourly_deleted": hourly_deleted,
+            "pages_freed": raw_freed + hourly_freed
+        }
+
+        # Drain whatever the per-batch steps left, still one bounded step at a time.
+        while True:
+            freed = RetentionService.reclaim_space(vacuum_pages)
+            stats["pages_freed"] += freed
+
+            if not freed:
+                break
+
+        if stats["raw_deleted"]:
+            DataGenerationRepository.bump_generation()
+
+        logger.info(
+            f"Retention removed {stats['raw_deleted']} raw rows before {raw_cutoff.date()} and "
+            f"{stats['hourly_deleted']} hourly rollups before {hourly_cutoff.date()}; "
+            f"{stats['pages_freed']} pages returned to the OS"
+        )
+
+        return stats
@@ -0,0 +1,140 @@
+import threading
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import requests
+
+from config.config import (
+    WEATHER_API_BASE_URL,
+    WEATHER_API_KEY,
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_PATH,
+    RESPONSE_CACHE_MAX_MB,
+    RESPONSE_CACHE_RECENT_TTL
+)
+from utils import http_client
+from utils.logger import get_logger
+from utils.response_cache import ResponseCache
+
+logger = get_logger(__name__)
+
+LOCATION_KEYS = ("queryCost", "latitude", "longitude", "resolvedAddress", "address", "timezone", "tzoffset")
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    global _cache
+
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    RESPONSE_CACHE_PATH,
+                    max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+                    recent_ttl=RESPONSE_CACHE_RECENT_TTL
+                )
+
+    return _cache
+
+class TimelineService:
+
+    @staticmethod
+    def missing_ranges(days: List[date], cached: Dict[date, Any]) -> List[Tuple[date, date]]:
+        """Collapse the days that are not cached into contiguous (start, end) ranges."""
+
+        ranges = []
+
+        for day in days:
+            if day in cached:
+                continue
+
+            if ranges and day - ranges[-1][1] == timedelta(days=1):
+                ranges[-1][1] = day
+            else:
+                ranges.append([day, day])
+
+        return [(range_start, range_end) for range_start, range_end in ranges]
+
+    @staticmethod
+    def open_timeline(
+        city_name: str,
+        start_date: date,
+        end_date: date,
+        include: str,
+        stream: bool = False
+    ) -> requests.Response:
+        """Issue the timeline request, bypassing the cache. With stream=True the caller must close the response."""
+
+        start_str = start_date.strftime("%Y-%m-%d")
+        end_str = end_date.strftime("%Y-%m-%d")
+
+        url = f"{WEATHER_API_BASE_URL}{city_name}/{start_str}/{end_str}"
+        params = {
+            "unitGroup": "metric",
+            "key": WEATHER_API_KEY,
+            "contentType": "json",
+            "include": include
+        }
+
+        response = http_client.get(url, params=params, stream=stream)
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+
+        return response
+
+    @staticmethod
+    def request_timeline(city_name: str, start_date: date, end_date: date, include: str) -> Dict[str, Any]:
+
+        return TimelineService.open_timeline(city_name, start_date, end_date, include).json()
+
+    @staticmethod
+    def fetch_timeline(
+        city_name: str,
+        start_date: date,
+        end_date: date,
+        include: str = "days,hours"
+    ) -> Dict[str, Any]:
+        """Timeline response for a date range, fetching only the days missing from the response cache.
+
+        Raises requests exceptions like a direct API call would.
+        """
+
+        cache = get_response_cache()
+        days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+        cached = cache.get_days(city_name, days, include) if cache else {}
+        location = cache.get_location(city_name) if cache else None
+        missing = TimelineService.missing_ranges(days, cached)
+
+        if location is None and not missing:
+            missing = [(start_date, start_date)]
+
+        logger.info(
+            f"Timeline for {city_name} {start_date}..{end_date}: {len(cached)} of {len(days)} days cached, "
+            f"{len(missing)} API calls needed"
+        )
+
+        for range_start, range_end in missing:
+            raw_data = TimelineService.request_timeline(city_name, range_start, range_end, include)
+            fetched_days = raw_data.get("days", [])
+            location = {key: raw_data.get(key) for key in LOCATION_KEYS}
+
+            if cache:
+                cache.put_days(city_name, include, fetched_days)
+                cache.put_location(city_name, location)
+
+            for day_payload in fetched_days:
+                cached[date.fromisoformat(day_payload["datetime"])] = day_payload
+
+        return {
+            **(location or {}),
+            "days": [cached[day] for day in days if day in cached]
+        }
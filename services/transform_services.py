@@ -1,13 +1,19 @@
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 
+from models.weather_batch import WeatherBatch
 from models.weather_data import WeatherData
-from repositories.weather_repositories import WeatherRepository
+from repositories.analytics_repositories import AnalyticsRepository
+from repositories.rollup_repositories import RollupRepository
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# "database" reads the rollups (falling back to raw rows); "archive" queries the Parquet archive,
+# streaming it so the range can be far larger than memory.
+SOURCES = ('database', 'archive')
+
 class TransformService:
 
     @staticmethod
@@ -16,21 +22,40 @@ class TransformService:
         return weather_data
     
     @staticmethod
-    def calculate_temperature_trend(city_name: str) -> Optional[Dict[str, Any]]:
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        historical_data = WeatherRepository.get_weather_data_by_data_range(city_name, start_date, end_date)
+    def _date_range(
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        days: int,
+        source: str
+    ) -> Tuple[datetime, datetime]:
+
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source {source}, expected one of {', '.join(SOURCES)}")
+
+        end_date = end_date or datetime.now()
 
-        if not historical_data or len(historical_data) < 2:
+        return start_date or end_date - timedelta(days=days), end_date
+
+    @staticmethod
+    def calculate_temperature_trend(
+        city_name: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        source: str = 'database'
+    ) -> Optional[Dict[str, Any]]:
+        """Trend of the daily averages, by default over the last 7 days."""
+
+        start_date, end_date = TransformService._date_range(start_date, end_date, 7, source)
+
+        if source == 'archive':
+            daily_avg = AnalyticsRepository.get_daily_temperature(city_name, start_date, end_date)
+        else:
+            daily_avg = RollupRepository.get_daily_temperature(city_name, start_date, end_date)
+
+        if daily_avg['sample_count'].sum() < 2:
             logger.warning(f"Not enough data for {city_name} to calculate the trend")
             
             return None
-        
-        df = pd.DataFrame(historical_data)
-
-        df['date'] = pd.to_datetime(df['timestamp']).dt.date
-        daily_avg = df.groupby('date')['temperature'].mean().reset_index()
 
         x = range(len(daily_avg))
         y = daily_avg['temperature'].values
@@ -57,60 +82,45 @@ class TransformService:
         return None
     
     @staticmethod
-    def calculate_weather_statistics(city_name: str) -> Dict[str, Any]:
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-
-        historical_data = WeatherRepository.get_weather_data_by_data_range(city_name, start_date, end_date)
-
-        if not historical_data:
+    def calculate_weather_statistics(
+        city_name: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        source: str = 'database'
+    ) -> Dict[str, Any]:
+        """Aggregates and the condition histogram, by default over the last 30 days."""
+
+        start_date, end_date = TransformService._date_range(start_date, end_date, 30, source)
+
+        if source == 'archive':
+            aggregates = AnalyticsRepository.get_weather_statistics(city_name, start_date, end_date)
+        else:
+            aggregates = RollupRepository.get_weather_statistics(city_name, start_date, end_date)
+
+        if not aggregates:
             logger.warning(f"No data for {city_name}")
 
             return {
                 "city": city_name,
                 "status": "no_data"
             }
-        
-        df = pd.DataFrame(historical_data)
 
         stats = {
             "city": city_name,
             "status": "success",
             "period_start": start_date.strftime("%Y-%m-%d"),
             "period_end": end_date.strftime("%Y-%m-%d"),
-            "data_points": len(df),
-            "temperature": {
-                "min": df['temperature'].min(),
-                "max": df['temperature'].max(),
-                "avg": df['temperature'].mean(),
-                "std": df['temperature'].std()
-            },
-            "humidity": {
-                "min": df['humidity'].min(),
-                "max": df['humidity'].max(),
-                "avg": df['humidity'].mean()
-            },
-            "pressure": {
-                "min": df['pressure'].min(),
-                "max": df['pressure'].max(),
-                "avg": df['pressure'].mean()
-            },
-            "weather_conditions": df['weather_condition'].value_counts().to_dict()
+            **aggregates
         }
 
         return stats
     @staticmethod
-    def batch_process_cities(weather_data_list: List[WeatherData]) -> List[WeatherData]:
-
-        processed_data = []
+    def enrich_weather_batch(weather_batch: WeatherBatch) -> WeatherBatch:
+        """Column-wise counterpart of enrich_weather_data; a passthrough while that one is."""
 
-        for weather_data in weather_data_list:
+        return weather_batch
 
-            try:
-                enriched_data = TransformService.enrich_weather_data(weather_data)
-                processed_data.append(enriched_data)
-            except Exception as e:
-                logger.error(f"Error while processing data for {weather_data.city_name}: {str(e)}")
+    @staticmethod
+    def batch_process_cities(weather_batch: Union[WeatherBatch, List[WeatherData]]) -> WeatherBatch:
 
-        return processed_data
+        return TransformService.enrich_weather_batch(WeatherBatch.coerce(weather_batch))
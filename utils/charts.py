@@ -0,0 +1,41 @@
+from typing import List, Sequence
+
+import altair as alt
+import pandas as pd
+
+from config.config import CHART_MAX_POINTS, CHART_WIDTH
+from utils.downsampling import downsample_frame
+
+CHART_SPACING = 20
+
+def base_chart(
+    df: pd.DataFrame,
+    x: str,
+    columns: Sequence[str],
+    extra_columns: Sequence[str] = (),
+    max_points: int = CHART_MAX_POINTS
+) -> alt.Chart:
+    """Chart over `df` trimmed to the plotted columns and LTTB-downsampled to max_points rows.
+
+    Derive every chart of a page section from one base and render them together with
+    concat_rows, so the data is embedded once in the spec instead of once per chart.
+    """
+
+    used = list(dict.fromkeys([x, *columns, *extra_columns]))
+
+    return alt.Chart(downsample_frame(df[used], x, list(columns), max_points))
+
+def concat_rows(rows: List[List[alt.TopLevelMixin]], width: int = CHART_WIDTH) -> alt.VConcatChart:
+    """Stack rows of charts into a single spec, splitting `width` evenly within each row.
+
+    The panels have fixed widths (use_container_width does not resize the panels of a
+    concatenated chart), so the section is as wide as CHART_WIDTH unless `width` is given.
+    """
+
+    stacked = []
+
+    for row in rows:
+        chart_width = (width - CHART_SPACING * (len(row) - 1)) // len(row)
+        stacked.append(alt.hconcat(*(chart.properties(width=chart_width) for chart in row), spacing=CHART_SPACING))
+
+    return alt.vconcat(*stacked, spacing=CHART_SPACING)
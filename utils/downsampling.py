@@ -0,0 +1,77 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the rest are split into threshold - 2 equal
+    buckets and each bucket keeps the point forming the largest triangle with the point kept
+    in the previous bucket and the mean of the next bucket, so peaks and troughs survive.
+    `x` must be sorted. Work inside a bucket is vectorized, leaving one Python step per output point.
+    """
+
+    length = len(x)
+
+    if threshold >= length or threshold < 3:
+
+        return np.arange(length)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    # Mean of every bucket up front; the last "next bucket" is the final point itself.
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    x_sums = np.add.reduceat(x[:-1], starts)
+    y_sums = np.add.reduceat(y[:-1], starts)
+    x_means = np.append(x_sums / counts, x[-1])
+    y_means = np.append(y_sums / counts, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, length - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, end = starts[bucket], ends[bucket]
+        next_x, next_y = x_means[bucket + 1], y_means[bucket + 1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+def _as_float(values: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(values):
+
+        return values.to_numpy().astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+
+def downsample_frame(df: pd.DataFrame, x: str, columns: List[str], max_points: int) -> pd.DataFrame:
+    """Rows of `df` (sorted by `x`) kept by LTTB on each of `columns`, at most max_points in total.
+
+    Each column gets an equal share of the budget and the union of the kept rows is returned,
+    so the peaks of every series plotted from the frame are preserved. NaNs are ignored.
+    """
+
+    if len(df) <= max_points or not columns:
+
+        return df
+
+    df = df.sort_values(x, kind='stable').reset_index(drop=True)
+    x_values = _as_float(df[x])
+    budget = max(3, max_points // len(columns))
+    keep = []
+
+    for column in columns:
+        y_values = _as_float(df[column])
+        valid = np.flatnonzero(~np.isnan(y_values))
+        keep.append(valid[lttb_indices(x_values[valid], y_values[valid], budget)])
+
+    return df.iloc[np.unique(np.concatenate(keep))].reset_index(drop=True)
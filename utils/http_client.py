@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.config import (
+    HTTP_POOL_SIZE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR
+)
+from utils.metrics import HTTP_REQUEST_SECONDS
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def create_session(
+    pool_size: int = HTTP_POOL_SIZE,
+    max_retries: int = HTTP_MAX_RETRIES,
+    backoff_factor: float = HTTP_BACKOFF_FACTOR
+) -> requests.Session:
+    """Build a session with a keep-alive connection pool and retry with backoff on 429 and 5xx."""
+
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive"
+    })
+
+    return session
+
+def get_session() -> requests.Session:
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+
+    return _session
+
+def get(url: str, params: Optional[Dict[str, Any]] = None, stream: bool = False) -> requests.Response:
+    started = time.perf_counter()
+    status = "error"
+
+    try:
+        response = get_session().get(
+            url,
+            params=params,
+            timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+            stream=stream
+        )
+        status = str(response.status_code)
+
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, status)
+
+def close_session() -> None:
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
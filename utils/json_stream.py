@@ -0,0 +1,124 @@
+import codecs
+import json
+from typing import Dict, Any, Iterable, Iterator
+
+WHITESPACE = " \t\n\r"
+NUMBER_CHARACTERS = "0123456789.eE+-"
+
+class JsonArrayStream:
+    """Incrementally yield the items of one array member of a top-level JSON object.
+
+    `chunks` is any iterable of bytes (e.g. response.iter_content()). Only the item being
+    decoded is buffered, so memory is bounded by the largest item rather than the document.
+    The other top-level members are collected into `metadata` as they are passed; members
+    after the array are only available once iteration has finished.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], key: str):
+        self.chunks = iter(chunks)
+        self.key = key
+        self.metadata: Dict[str, Any] = {}
+        self.bytes_read = 0
+
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping what has been consumed. False at end of input."""
+
+        if self._eof:
+
+            return False
+
+        chunk = next(self.chunks, None)
+
+        if chunk is None:
+            self._eof = True
+            self._buffer = self._buffer[self._pos:] + self._text.decode(b"", final=True)
+        else:
+            self.bytes_read += len(chunk)
+            self._buffer = self._buffer[self._pos:] + self._text.decode(chunk)
+
+        self._pos = 0
+
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, reading more input as needed."""
+
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+
+            if self._pos < len(self._buffer):
+
+                return self._buffer[self._pos]
+
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def _expect(self, character: str) -> None:
+        if self._peek() != character:
+            raise ValueError(f"Expected '{character}' at offset {self.bytes_read}, got '{self._buffer[self._pos]}'")
+
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        self._peek()
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+
+                # A number cut off by the end of the buffer may continue in the next chunk.
+                truncated = end == len(self._buffer) or self._buffer[end] in NUMBER_CHARACTERS
+
+                if self._eof or not isinstance(value, (int, float)) or not truncated:
+                    self._pos = end
+
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+
+            self._fill()
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect("{")
+
+        while True:
+            character = self._peek()
+
+            if character == "}":
+                self._pos += 1
+
+                return
+
+            if character == ",":
+                self._pos += 1
+                continue
+
+            name = self._decode_value()
+            self._expect(":")
+
+            if name != self.key:
+                self.metadata[name] = self._decode_value()
+                continue
+
+            self._expect("[")
+
+            while True:
+                character = self._peek()
+
+                if character == "]":
+                    self._pos += 1
+                    break
+
+                if character == ",":
+                    self._pos += 1
+                    continue
+
+                yield self._decode_value()
@@ -0,0 +1,376 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic counter. Label values are passed positionally, in `labels` order."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def total(self) -> float:
+        with self._lock:
+
+            return sum(self._values.values())
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+
+        return [f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in values]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+
+            return {",".join(key) or "total": value for key, value in self._values.items()}
+
+class Histogram:
+    """Cumulative-bucket histogram of durations (or any non-negative value)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            state = self._values.get(label_values)
+
+            if state is None:
+                state = self._values[label_values] = [0] * (len(self.buckets) + 2)
+
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def totals(self) -> Tuple[int, float]:
+        """Observation count and sum across all label sets."""
+
+        with self._lock:
+            states = list(self._values.values())
+
+        return sum(int(sum(state[:-1])) for state in states), sum(state[-1] for state in states)
+
+    def quantile(self, q: float, *label_values: str) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (None without observations)."""
+
+        with self._lock:
+            state = list(self._values.get(label_values, ()))
+
+        if not state:
+
+            return None
+
+        counts = state[:-1]
+        rank = q * sum(counts)
+        seen = 0
+
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            seen += count
+
+            if seen >= rank and count:
+
+                return bound
+
+        return float("inf")
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+
+        lines = []
+
+        for key, state in values:
+            cumulative = 0
+
+            for bound, count in zip((*self.buckets, "+Inf"), state[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {state[-1]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+
+        return lines
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            keys = list(self._values)
+
+        snapshot = {}
+
+        for key in keys:
+            with self._lock:
+                state = self._values[key]
+                count, total = int(sum(state[:-1])), state[-1]
+
+            snapshot[",".join(key) or "total"] = {
+                "count": count,
+                "sum": round(total, 6),
+                "p50": self.quantile(0.5, *key),
+                "p95": self.quantile(0.95, *key)
+            }
+
+        return snapshot
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+
+            if existing is not None:
+
+                return existing
+
+            self._metrics[metric.name] = metric
+
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        lines = []
+
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram("weather_http_request_seconds", "Weather API request latency until response headers", ("status",))
+EXTRACT_CITY_SECONDS = REGISTRY.histogram("weather_extract_city_seconds", "Fetch latency per city in the ETL extract stage", ("city",))
+DB_QUERY_SECONDS = REGISTRY.histogram("weather_db_query_seconds", "Database statement execution time", ("statement",))
+DB_COMMIT_SECONDS = REGISTRY.histogram("weather_db_commit_seconds", "Session commit time, including the final flush")
+REPOSITORY_SECONDS = REGISTRY.histogram("weather_repository_seconds", "Time spent in each repository method", ("method",))
+STAGE_SECONDS = REGISTRY.histogram("weather_etl_stage_seconds", "Busy time of each ETL stage per run", ("stage",))
+RUN_SECONDS = REGISTRY.histogram("weather_etl_run_seconds", "Wall-clock time of each ETL run", ("mode",))
+STAGE_RECORDS = REGISTRY.counter("weather_etl_records_total", "Records that passed each ETL stage", ("stage",))
+STAGE_FAILURES = REGISTRY.counter("weather_etl_failures_total", "Records that failed in each ETL stage", ("stage",))
+ROWS_SAVED = REGISTRY.counter("weather_rows_saved_total", "Weather rows upserted into weather_data")
+RUNS = REGISTRY.counter("weather_etl_runs_total", "Finished ETL runs by outcome", ("outcome",))
+
+def timed(histogram: Histogram) -> Callable:
+    """Decorator observing each call's duration in `histogram`, labelled with the function's qualified name."""
+
+    def decorator(func: Callable) -> Callable:
+        label = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+
+            try:
+
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, label)
+
+        return wrapper
+
+    return decorator
+
+class RunSummary:
+    """Collects one ETL run's stage timings and record counts and writes them as JSON.
+
+    The summary file maps each schedule group to its last run, so groups do not overwrite each other.
+    """
+
+    _file_lock = threading.Lock()
+
+    def __init__(self, mode: str, cities: int, group: str = "all"):
+        self.mode = mode
+        self.group = group
+        self.details: Dict[str, Any] = {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "mode": mode,
+            "cities": cities,
+            "stages": {},
+            "records": {}
+        }
+        self._started = time.perf_counter()
+        self._db_queries = DB_QUERY_SECONDS.totals()
+        self._db_commits = DB_COMMIT_SECONDS.totals()
+        self._http = HTTP_REQUEST_SECONDS.totals()
+
+    def stage(self, name: str, seconds: float) -> None:
+        self.details["stages"][name] = round(self.details["stages"].get(name, 0.0) + seconds, 6)
+        STAGE_SECONDS.observe(seconds, name)
+
+    @contextmanager
+    def timed_stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.stage(name, time.perf_counter() - started)
+
+    def records(self, stage: str, count: int, failed: int = 0) -> None:
+        self.details["records"][stage] = count
+        STAGE_RECORDS.inc(count, stage)
+
+        if failed:
+            self.details["records"][f"{stage}_failed"] = failed
+            STAGE_FAILURES.inc(failed, stage)
+
+    @staticmethod
+    def _delta(after: Tuple[int, float], before: Tuple[int, float]) -> Dict[str, Any]:
+
+        return {"count": after[0] - before[0], "seconds": round(after[1] - before[1], 6)}
+
+    def finish(self, success: bool, path: Optional[str] = None) -> Dict[str, Any]:
+        seconds = time.perf_counter() - self._started
+        saved = self.details["records"].get("load", 0)
+
+        self.details.update({
+            "success": success,
+            "seconds": round(seconds, 6),
+            "rows_per_second": round(saved / self.details["stages"]["load"], 1) if self.details["stages"].get("load") else None,
+            "db_queries": self._delta(DB_QUERY_SECONDS.totals(), self._db_queries),
+            "db_commits": self._delta(DB_COMMIT_SECONDS.totals(), self._db_commits),
+            "http_requests": self._delta(HTTP_REQUEST_SECONDS.totals(), self._http)
+        })
+
+        RUN_SECONDS.observe(seconds, self.mode)
+        RUNS.inc(1, "success" if success else "failure")
+
+        if path:
+            try:
+                self._save(path)
+            except OSError as e:
+                logger.warning(f"Could not write run summary to {path}: {str(e)}")
+
+        return self.details
+
+    def _save(self, path: str) -> None:
+        with RunSummary._file_lock:
+            try:
+                with open(path) as summary_file:
+                    runs = json.load(summary_file)
+            except (OSError, ValueError):
+                runs = {}
+
+            # A file from before the summaries were keyed by group holds a single run.
+            if not isinstance(runs, dict) or "mode" in runs:
+                runs = {}
+
+            runs[self.group] = self.details
+            write_json(path, runs)
+
+def write_json(path: str, payload: Dict[str, Any]) -> None:
+    """Replace the file atomically; each writer gets its own temporary file, so concurrent
+    writers cannot interleave their output (the last one wins)."""
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile("w", dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp", delete=False) as summary_file:
+        temporary_path = summary_file.name
+
+        try:
+            json.dump(payload, summary_file, indent=2, default=str)
+        except Exception:
+            summary_file.close()
+            os.unlink(temporary_path)
+            raise
+
+    os.replace(temporary_path, path)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics in Prometheus text format from a daemon thread."""
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+
+    return server
@@ -0,0 +1,162 @@
+import json
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS day_payloads (
+    city TEXT NOT NULL,
+    day TEXT NOT NULL,
+    include TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (city, day, include)
+);
+CREATE INDEX IF NOT EXISTS ix_day_payloads_accessed_at ON day_payloads (accessed_at);
+CREATE TABLE IF NOT EXISTS locations (
+    city TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+class ResponseCache:
+    """Persistent, compressed cache of timeline day payloads keyed by (city, day, include set).
+
+    Days older than `immutable_after_days` never expire; more recent days are re-fetched once
+    they are older than `recent_ttl` seconds. When the cache grows past `max_bytes` the least
+    recently read days are evicted. The cache is a SQLite file, so it is shared by every
+    process on the machine (Streamlit workers, the CLI backfill, the scheduler).
+    """
+
+    def __init__(self, path: str, max_bytes: int, recent_ttl: int, immutable_after_days: int = 2):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.recent_ttl = recent_ttl
+        self.immutable_after_days = immutable_after_days
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def normalize_include(include: str) -> str:
+
+        return ",".join(sorted(part.strip() for part in include.split(",") if part.strip()))
+
+    def _is_fresh(self, day: date, fetched_at: float, now: float) -> bool:
+        if day < date.today() - timedelta(days=self.immutable_after_days):
+            return True
+
+        return now - fetched_at < self.recent_ttl
+
+    def get_days(self, city: str, days: List[date], include: str) -> Dict[date, Dict[str, Any]]:
+        if not days:
+            return {}
+
+        include = self.normalize_include(include)
+        wanted = {day.isoformat(): day for day in days}
+        now = time.time()
+        found = {}
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT day, payload, fetched_at FROM day_payloads "
+                "WHERE city = ? AND include = ? AND day BETWEEN ? AND ?",
+                (city.lower(), include, min(wanted), max(wanted))
+            ).fetchall()
+
+            for day_str, payload, fetched_at in rows:
+                day = wanted.get(day_str)
+
+                if day is not None and self._is_fresh(day, fetched_at, now):
+                    found[day] = json.loads(zlib.decompress(payload))
+
+            if found:
+                connection.execute(
+                    f"UPDATE day_payloads SET accessed_at = ? WHERE city = ? AND include = ? "
+                    f"AND day IN ({','.join('?' * len(found))})",
+                    (now, city.lower(), include, *(day.isoformat() for day in found))
+                )
+
+        return found
+
+    def put_days(self, city: str, include: str, day_payloads: List[Dict[str, Any]]) -> None:
+        if not day_payloads:
+            return
+
+        include = self.normalize_include(include)
+        now = time.time()
+        rows = []
+
+        for day_payload in day_payloads:
+            payload = zlib.compress(json.dumps(day_payload, separators=(",", ":")).encode(), 6)
+            rows.append((city.lower(), day_payload["datetime"], include, payload, len(payload), now, now))
+
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT OR REPLACE INTO day_payloads "
+                "(city, day, include, payload, size, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            connection.execute("COMMIT")
+
+        self.evict()
+
+    def get_location(self, city: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT payload FROM locations WHERE city = ?", (city.lower(),)).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def put_location(self, city: str, location: Dict[str, Any]) -> None:
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO locations (city, payload, fetched_at) VALUES (?, ?, ?)",
+                (city.lower(), json.dumps(location), time.time())
+            )
+
+    def evict(self) -> int:
+        """Drop least recently read days until the cache is back under 90% of max_bytes."""
+
+        with closing(self._connect()) as connection:
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM day_payloads").fetchone()[0]
+
+            if total <= self.max_bytes:
+                return 0
+
+            target = int(self.max_bytes * 0.9)
+            evicted = 0
+
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(
+                "SELECT rowid, size FROM day_payloads ORDER BY accessed_at"
+            ).fetchall()
+            doomed = []
+
+            for rowid, size in rows:
+                if total <= target:
+                    break
+
+                doomed.append((rowid,))
+                total -= size
+                evicted += 1
+
+            connection.executemany("DELETE FROM day_payloads WHERE rowid = ?", doomed)
+            connection.execute("COMMIT")
+
+        return evicted
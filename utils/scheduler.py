@@ -0,0 +1,181 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+from utils.metrics import write_json
+
+logger = get_logger(__name__)
+
+CATCH_UP_POLICIES = ("skip", "once")
+
+@dataclass
+class ScheduledJob:
+    name: str
+    interval: float
+    func: Callable[[], Any]
+    jitter: float = 0.0
+    deadline: float = 0.0
+    fire_at: float = 0.0
+    running: bool = False
+    runs: int = 0
+    skipped: int = 0
+
+class Scheduler:
+    """Runs jobs at fixed intervals measured against monotonic deadlines.
+
+    Deadlines advance by exactly one interval from the previous deadline, not from when a
+    run finished, so runs do not drift by the job's duration. A job whose previous run is
+    still going is skipped for that deadline rather than stacked, and deadlines missed
+    while a run overran are coalesced into the next one. Each run after the first is delayed
+    by a random 0..jitter seconds so jobs with equal intervals do not fire together. Between runs the
+    scheduler sleeps until the earliest fire time instead of polling.
+
+    With a state_path, each job's last start (wall-clock time) is persisted, so after a
+    restart the schedule keeps its phase. A job that missed runs during the downtime is
+    run immediately with catch_up="once", or waits for its next slot with catch_up="skip".
+    """
+
+    def __init__(self, state_path: Optional[str] = None, catch_up: str = "once"):
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy {catch_up!r}, expected one of {', '.join(CATCH_UP_POLICIES)}")
+
+        self.state_path = state_path
+        self.catch_up = catch_up
+        self.jobs: List[ScheduledJob] = []
+
+        self._state = self._load_state()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _load_state(self) -> Dict[str, float]:
+        if not self.state_path or not os.path.exists(self.state_path):
+
+            return {}
+
+        try:
+            with open(self.state_path) as state_file:
+
+                return {name: float(started) for name, started in json.load(state_file).items()}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable scheduler state {self.state_path}: {str(e)}")
+
+            return {}
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+
+        write_json(self.state_path, self._state)
+
+    def _first_deadline(self, job: ScheduledJob, now: float) -> float:
+        last_started = self._state.get(job.name)
+
+        if last_started is None:
+
+            return now
+
+        elapsed = max(0.0, time.time() - last_started)
+
+        if elapsed < job.interval:
+
+            return now + job.interval - elapsed
+
+        missed = int(elapsed // job.interval)
+
+        if self.catch_up == "once":
+            logger.info(f"Job {job.name} missed {missed} run(s) while stopped, catching up once")
+
+            return now
+
+        logger.info(f"Job {job.name} missed {missed} run(s) while stopped, resuming at its next slot")
+
+        return now + job.interval - elapsed % job.interval
+
+    def _schedule(self, job: ScheduledJob) -> None:
+        job.fire_at = job.deadline + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+
+    def add_job(self, name: str, interval: float, func: Callable[[], Any], jitter: float = 0.0) -> ScheduledJob:
+        if interval <= 0:
+            raise ValueError(f"Interval for job {name} must be positive")
+
+        # Jitter is capped below the interval so it can never push a run past the next deadline.
+        job = ScheduledJob(name=name, interval=interval, func=func, jitter=min(jitter, interval / 2))
+        job.deadline = self._first_deadline(job, time.monotonic())
+        # The first run is not jittered, so starting the scheduler runs due jobs right away.
+        job.fire_at = job.deadline
+        self.jobs.append(job)
+
+        return job
+
+    def _execute(self, job: ScheduledJob) -> None:
+        started = time.monotonic()
+
+        try:
+            job.func()
+        except Exception as e:
+            logger.error(f"Scheduled job {job.name} failed: {str(e)}")
+        finally:
+            duration = time.monotonic() - started
+
+            with self._lock:
+                job.running = False
+
+            if duration > job.interval:
+                logger.warning(f"Job {job.name} took {duration:.1f}s, longer than its {job.interval:g}s interval")
+
+    def _fire(self, job: ScheduledJob, now: float) -> None:
+        with self._lock:
+            if job.running:
+                job.skipped += 1
+                logger.warning(f"Job {job.name} is still running, skipping this run")
+            else:
+                job.running = True
+                job.runs += 1
+                self._state[job.name] = time.time()
+                self._save_state()
+                self._executor.submit(self._execute, job)
+
+        job.deadline += job.interval
+
+        if job.deadline <= now:
+            missed = int((now - job.deadline) // job.interval) + 1
+            job.deadline += missed * job.interval
+            job.skipped += missed
+            logger.warning(f"Job {job.name} fell {missed} run(s) behind, coalescing them into the next one")
+
+        self._schedule(job)
+
+    def run_pending(self) -> float:
+        """Fire every job that is due; returns the seconds until the next fire time."""
+
+        now = time.monotonic()
+
+        for job in self.jobs:
+            if job.fire_at <= now:
+                self._fire(job, now)
+
+        return max(0.0, min(job.fire_at for job in self.jobs) - time.monotonic())
+
+    def run(self) -> None:
+        """Block, running jobs until stop() is called."""
+
+        if not self.jobs:
+            raise ValueError("No jobs scheduled")
+
+        self._executor = ThreadPoolExecutor(max_workers=len(self.jobs), thread_name_prefix="scheduler")
+
+        try:
+            while not self._stop.is_set():
+                self._stop.wait(self.run_pending())
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def stop(self) -> None:
+        self._stop.set()